@@ -225,11 +225,21 @@ class CustomUserStatusFilter(admin.SimpleListFilter):
             return queryset
 
         if self.value() == models.User.Status.ONLINE:
-            return queryset.filter(status__in=models.User.online_statuses)
-        elif self.value() == 'available':
-            return queryset.filter(status=models.User.Status.ONLINE)
+            return queryset.filter(id__in=models.Presence.online_ids())
+        elif self.value() == models.User.Status.OFFLINE:
+            return queryset.exclude(id__in=models.Presence.online_ids())
+
+        if self.value() == 'available':
+            status = models.User.Status.ONLINE
         else:
-            return queryset.filter(status=self.value())
+            status = self.value()
+
+        ids = [
+            user_id
+            for user_id, user_status in models.Presence.get_all().items()
+            if user_status == status
+        ]
+        return queryset.filter(id__in=ids)
 
 
 class CustomUserRestrictedFilter(admin.SimpleListFilter):
@@ -1,4 +1,5 @@
 import logging
+from typing import List
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -7,6 +8,7 @@ from django.db.models import Q
 from django.db.utils import IntegrityError
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django.utils.translation import gettext as _
 from ninja.errors import HttpError
 
@@ -16,9 +18,8 @@ from appsettings.services import (
     check_invite_required,
     maintenance_window,
 )
-from core.redis import redis_client_instance as cache
 from core.utils import generate_random_string, get_ip_address
-from friends.websocket import ws_friends_add
+from friends.websocket import ws_friends_add_global
 from lobbies.api.controller import handle_player_move
 from lobbies.models import Lobby, LobbyException
 from lobbies.websocket import ws_expire_player_invites
@@ -94,30 +95,43 @@ def login(request, token: str) -> Auth:
     If a User with the token exists and the request is verified exempt or the user is verified,
     an UserLogin is updated or created for the user with the request's IP address.
 
+    Tokens of active and verified users have their identity cached for a short time,
+    so the common path costs a single Redis round-trip and the user is only loaded
+    when the view uses it. The `UserLogin` update and the token TTL refresh happen
+    at most once per `Auth.Config.LOGIN_THROTTLE_TTL` for each token and IP address.
+
     Returns an Auth object if successful, otherwise None.
     """
-    auth = Auth.load(token)
-
-    if not auth:
-        return None
-
-    try:
-        user = User.objects.get(pk=auth.user_id)
-    except User.DoesNotExist:
-        return None
-
-    if not hasattr(request, "verified_exempt") and (
-        not is_verified(user) or not user.is_active
-    ):
-        return None
+    ip_address = get_ip_address(request)
+    identity, login_recorded = Auth.get_identity(token, ip_address)
 
-    UserLogin.objects.update_or_create(
-        user=user,
-        ip_address=get_ip_address(request),
-        defaults={"timestamp": timezone.now()},
-    )
+    if identity:
+        auth = Auth(user_id=identity["user_id"], token=token)
+        user = SimpleLazyObject(
+            lambda: User.objects.select_related("account").get(pk=auth.user_id)
+        )
+    else:
+        auth = Auth.load(token)
+        if not auth:
+            return None
+
+        user = User.objects.select_related("account").filter(pk=auth.user_id).first()
+        if not user:
+            return None
+
+        if is_verified(user) and user.is_active:
+            auth.set_identity()
+        elif not hasattr(request, "verified_exempt"):
+            return None
+
+    if not login_recorded and auth.throttle_login(ip_address):
+        UserLogin.objects.update_or_create(
+            user_id=auth.user_id,
+            ip_address=ip_address,
+            defaults={"timestamp": timezone.now()},
+        )
+        auth.refresh_token()
 
-    user.refresh_from_db()
     request.user = user
 
     return auth
@@ -147,9 +161,6 @@ def logout(user: User) -> dict:
     # Send websocket logout message
     websocket.ws_user_logout(user.id)
 
-    # Deleting user from friend list cache
-    cache.delete(f"__friendlist:user:{user.id}")
-
     return {"detail": "Logout successful."}
 
 
@@ -233,8 +244,7 @@ def verify_account(user: User, verification_token: str) -> User:
             user.useritem_set.create(item=item, in_use=item.is_starter)
 
         if settings.APP_GLOBAL_FRIENDSHIP:
-            for user in User.active_verified_users([account.user.id]):
-                ws_friends_add(account.user, user)
+            ws_friends_add_global(account.user)
 
         # create user store
         UserStore.populate(user)
@@ -306,9 +316,11 @@ def update_email(user: User, email: str) -> User:
     return user
 
 
-def user_matches(user_id: int) -> Match:
+def user_matches(user_id: int) -> List[Match]:
     account = get_object_or_404(Account, user__id=user_id)
-    return account.get_matches_played()
+    return list(account.get_matches_played()) + list(
+        account.get_archived_matches_played()
+    )
 
 
 def delete_account(user: User) -> dict:
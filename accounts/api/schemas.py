@@ -50,6 +50,7 @@ class UserSchema(ModelSchema):
     account: Optional[AccountSchema] = None
     email: Optional[pydantic.EmailStr] = None
     is_online: bool = None
+    status: str = None
     lobby_id: int = None
     match_id: int = None
     pre_match_id: int = None
@@ -72,6 +73,7 @@ class UserSchema(ModelSchema):
             "reason_inactivated",
             "date_email_update",
             "is_beta",
+            "last_status",
         ]
 
     @staticmethod
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from accounts.tasks import decr_level_from_inactivity
+
+
+class Command(BaseCommand):
+    help = "Decrease the level of inactive players (see decr_level_from_inactivity)."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many accounts would be affected.",
+        )
+        parser.add_argument("--inactivity-days", type=int, default=None)
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        result = decr_level_from_inactivity(
+            dry_run=options["dry_run"],
+            inactivity_days=options["inactivity_days"],
+            chunk_size=options["chunk_size"],
+        )
+        prefix = "[dry run] " if result["dry_run"] else ""
+        self.stdout.write(
+            f"{prefix}{result['accounts']} inactive accounts decayed, "
+            f"{result['level_decreased']} of them lost a level."
+        )
@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0018_account_accounts_ac_level_b8b1d4_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="user",
+            name="accounts_us_status_6bbe13_idx",
+        ),
+        # The column keeps its name, only the model field is renamed, so there is
+        # no table rewrite: presence now lives on Redis and this column is write-behind.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name="user",
+                    old_name="status",
+                    new_name="last_status",
+                ),
+                migrations.AlterField(
+                    model_name="user",
+                    name="last_status",
+                    field=models.CharField(
+                        choices=[
+                            ("online", "Online"),
+                            ("offline", "Offline"),
+                            ("teaming", "Teaming"),
+                            ("queued", "Queued"),
+                            ("in_game", "In Game"),
+                        ],
+                        db_column="status",
+                        default="offline",
+                        editable=False,
+                        max_length=16,
+                    ),
+                ),
+            ],
+        ),
+    ]
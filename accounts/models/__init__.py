@@ -1,4 +1,5 @@
 from .user import User, UserLogin, IdentityManager, SteamUser, UserBan
 from .account import Account, Invite
 from .auth import Auth
+from .presence import Presence
 from .restriction import AccountReport
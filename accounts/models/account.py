@@ -5,9 +5,11 @@ from typing import List
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.core.validators import MinLengthValidator
 from django.db import models
+from django.db.models.functions import Upper
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.templatetags.static import static
@@ -15,14 +17,15 @@ from django.utils.translation import gettext as _
 
 from core.redis import redis_client_instance as cache
 from core.utils import generate_random_string
-from friends.models import Friendship
+from friends.models import FriendList, Friendship
 from lobbies.models import Lobby, LobbyInvite
-from matches.models import Match, MatchPlayer
+from matches.models import ArchivedMatch, ArchivedPlayerSummary, Match, MatchPlayer
 from notifications.models import Notification
 from pre_matches.models import PreMatch
 from steam import Steam
 
 from ..utils import calc_level_and_points, create_social_auth
+from .presence import Presence
 
 User = get_user_model()
 
@@ -78,6 +81,11 @@ class Account(models.Model):
             models.Index(fields=["steamid"]),
             models.Index(fields=["level"]),
             models.Index(fields=["level_points"]),
+            models.Index(fields=["username"]),
+            GinIndex(
+                OpClass(Upper("username"), name="gin_trgm_ops"),
+                name="accounts_username_trgm_idx",
+            ),
         ]
 
     def get_avatar_url(self, size: str = "small"):
@@ -86,14 +94,18 @@ class Account(models.Model):
             None if size == "small" else size,
         )
 
-    @property
-    def avatar_dict(self):
+    @staticmethod
+    def build_avatar_dict(avatarhash: str) -> dict:
         return {
-            "small": self.get_avatar_url("small"),
-            "medium": self.get_avatar_url("medium"),
-            "large": self.get_avatar_url("full"),
+            "small": Steam.build_avatar_url(avatarhash, None),
+            "medium": Steam.build_avatar_url(avatarhash, "medium"),
+            "large": Steam.build_avatar_url(avatarhash, "full"),
         }
 
+    @property
+    def avatar_dict(self):
+        return Account.build_avatar_dict(self.user.steam_user.avatarhash)
+
     @property
     def lobby(self) -> Lobby:
         return Lobby.get_current(self.user.id)
@@ -133,7 +145,8 @@ class Account(models.Model):
             if match.winner and match.winner.has_player(self.user)
         )
 
-        return victories
+        archived = ArchivedPlayerSummary.get_by_user_id(self.user.id)
+        return victories + (archived.get_totals().get("matches_won") or 0)
 
     @property
     def highest_win_streak(self) -> int:
@@ -144,9 +157,10 @@ class Account(models.Model):
         # Get all matches played by the user in ascending order
         played_matches = self.get_matches_played(asc=True)
 
-        # Initialize counters
-        max_streak = 0
-        current_streak = 0
+        # Initialize counters, carrying on from the archived matches
+        archived = ArchivedPlayerSummary.get_by_user_id(self.user.id)
+        max_streak = archived.highest_win_streak
+        current_streak = archived.win_streak
 
         # Go through all matches
         for match in played_matches:
@@ -170,18 +184,16 @@ class Account(models.Model):
                 user__is_staff=False,
             ).exclude(id=self.id)
         else:
-            friendships = Friendship.objects.filter(
-                models.Q(user_from=self.user) | models.Q(user_to=self.user),
-                accept_date__isnull=False,
-            )
-            friends = []
-            for friendship in friendships:
-                friends.append(
-                    friendship.user_from.account
-                    if friendship.user_from != self.user
-                    else friendship.user_to.account
-                )
-            return friends
+            return Account.objects.filter(
+                user_id__in=FriendList(user_id=self.user.id).ids
+            ).select_related("user")
+
+    @property
+    def friends_ids(self) -> List[int]:
+        if settings.APP_GLOBAL_FRIENDSHIP:
+            return list(self.friends.values_list("user_id", flat=True))
+
+        return FriendList(user_id=self.user.id).ids
 
     def __str__(self):
         return self.user.email
@@ -254,7 +266,10 @@ class Account(models.Model):
         Returns a list with the last `amount` results.
         List item can be "V" for victory, "D" for defeat or "N/A" for not available.
         """
-        matches = self.get_matches_played().order_by("-end_date")[:amount]
+        matches = list(self.get_matches_played().order_by("-end_date")[:amount])
+        if len(matches) < amount:
+            matches += self.get_archived_matches_played()[: amount - len(matches)]
+
         played_results = [
             (
                 Account.MatchResults.WIN
@@ -301,11 +316,30 @@ class Account(models.Model):
             status=Match.Status.FINISHED,
         ).order_by("-end_date" if not asc else "end_date")
 
+    def get_archived_matches_played(self) -> List[ArchivedMatch]:
+        return ArchivedMatch.objects.filter(
+            matchteam__matchplayer__user=self.user,
+            status=Match.Status.FINISHED,
+        ).order_by("-end_date")
+
     def get_matches_played_count(self, asc=False) -> List[Match]:
-        return self.get_matches_played().count()
+        return (
+            self.get_matches_played().count()
+            + ArchivedPlayerSummary.get_by_user_id(self.user.id).matches_played
+        )
 
     def get_online_friends(self) -> list:
-        return [friend for friend in self.friends if friend.user.is_online]
+        if settings.APP_GLOBAL_FRIENDSHIP:
+            online_ids = Presence.online_ids()
+        else:
+            online_ids = FriendList(user_id=self.user.id).online_ids
+
+        return list(
+            self.friends.filter(
+                user_id__in=online_ids,
+                is_verified=True,
+            ).select_related("user")
+        )
 
     def get_friendship(self, friend: User) -> Friendship:
         return Friendship.objects.filter(
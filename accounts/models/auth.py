@@ -1,4 +1,5 @@
 import secrets
+from typing import List, Tuple
 
 from pydantic import BaseModel
 
@@ -19,6 +20,17 @@ class Auth(BaseModel):
     [key] __auth:sessions:[user_id] <int>
     User sessions count. If there isn't a session for a user, it means an offline user.
     When this counter reaches 0, it got a TTL defined by the model config.
+
+    [key] __auth:user_token:[user_id] <token>
+    Latest token created for a user, so it can be found without scanning all tokens.
+
+    [hash] __auth:identity:[token] <{user_id: int}>
+    Short lived cache of a token that belongs to an active and verified user, so
+    authenticated requests don't hit the db to check that. It's cleared whenever
+    the user or its account is saved.
+
+    [key] __auth:login:[token]:[ip_address] <1>
+    Throttles `UserLogin` updates and the token TTL refresh for a token and IP.
     """
 
     user_id: int
@@ -33,6 +45,11 @@ class Auth(BaseModel):
         SESSION_PREFIX: str = '__auth:sessions:'
         TOKEN_PREFIX: str = '__auth:token:'
         TOKEN_SIZE: int = 6
+        USER_TOKEN_PREFIX: str = '__auth:user_token:'
+        IDENTITY_PREFIX: str = '__auth:identity:'
+        IDENTITY_TTL: int = 60
+        LOGIN_PREFIX: str = '__auth:login:'
+        LOGIN_THROTTLE_TTL: int = 60 * 5
 
     def __init__(self, **data):
         """
@@ -68,22 +85,38 @@ class Auth(BaseModel):
         """
         self.sessions_cache_key = f'{Auth.Config.SESSION_PREFIX}{self.user_id}'
 
+    @property
+    def user_token_cache_key(self) -> str:
+        return f'{Auth.Config.USER_TOKEN_PREFIX}{self.user_id}'
+
     def create_token(self):
         """
         Save the token key on Redis.
         """
-        cache.set(self.token_cache_key, self.user_id, Auth.Config.SESSION_TTL)
+        with cache.pipeline(transaction=False) as pipe:
+            pipe.set(self.token_cache_key, self.user_id, Auth.Config.SESSION_TTL)
+            pipe.set(self.user_token_cache_key, self.token)
+            pipe.execute()
 
     def get_token(self) -> str:
         """
-        Searchs for `user_id` value in all token keys on Redis.
+        Get the latest token created for `user_id`, if it's still valid.
+        Tokens created before the user token key existed are searched in all token
+        keys on Redis, once, as they're indexed when found.
         """
+        token = cache.get(self.user_token_cache_key)
+        if token:
+            user_id = cache.get(f'{Auth.Config.TOKEN_PREFIX}{token}')
+            return token if user_id and int(user_id) == self.user_id else None
+
         keys = list(cache.scan_keys(f'{Auth.Config.TOKEN_PREFIX}*'))
         values = cache.mget(keys)
 
         for key, value in zip(keys, values):
             if key and value and int(value) == self.user_id:
-                return key.split(':')[-1:][0]
+                token = key.split(':')[-1:][0]
+                cache.set(self.user_token_cache_key, token)
+                return token
 
     def refresh_token(self, seconds: int = Config.SESSION_TTL):
         """
@@ -133,6 +166,75 @@ class Auth(BaseModel):
 
         return None
 
+    @staticmethod
+    def get_identity(token: str, ip_address: str) -> Tuple[dict, bool]:
+        """
+        Fetch the cached identity of a token and whether a login from the given
+        IP address was recorded recently, in a single round-trip.
+
+        :return: A tuple with the identity (empty if not cached) and the login flag.
+        """
+        with cache.pipeline(transaction=False) as pipe:
+            pipe.hgetall(f'{Auth.Config.IDENTITY_PREFIX}{token}')
+            pipe.exists(f'{Auth.Config.LOGIN_PREFIX}{token}:{ip_address}')
+            identity, login_recorded = pipe.execute()
+
+        return (identity, bool(login_recorded))
+
+    def set_identity(self):
+        """
+        Cache the identity of this token. Should only be called for active and
+        verified users.
+        """
+        identity_cache_key = f'{Auth.Config.IDENTITY_PREFIX}{self.token}'
+        with cache.pipeline(transaction=False) as pipe:
+            pipe.hset(identity_cache_key, 'user_id', self.user_id)
+            pipe.expire(identity_cache_key, Auth.Config.IDENTITY_TTL)
+            pipe.execute()
+
+    @staticmethod
+    def clear_identity(user_id: int):
+        token = cache.get(f'{Auth.Config.USER_TOKEN_PREFIX}{user_id}')
+        if token:
+            cache.delete(f'{Auth.Config.IDENTITY_PREFIX}{token}')
+
+    @staticmethod
+    def expire_many(user_ids: List[int]):
+        """
+        Expire sessions, tokens and cached identities of many users at once,
+        with two pipelined round-trips (one to read the user tokens, one to expire).
+        """
+        if not user_ids:
+            return
+
+        tokens = cache.mget(
+            [f'{Auth.Config.USER_TOKEN_PREFIX}{user_id}' for user_id in user_ids]
+        )
+        with cache.pipeline(transaction=False) as pipe:
+            for user_id, token in zip(user_ids, tokens):
+                pipe.delete(f'{Auth.Config.SESSION_PREFIX}{user_id}')
+                if token:
+                    pipe.delete(
+                        f'{Auth.Config.TOKEN_PREFIX}{token}',
+                        f'{Auth.Config.IDENTITY_PREFIX}{token}',
+                    )
+            pipe.execute()
+
+    def throttle_login(self, ip_address: str) -> bool:
+        """
+        Flag that a login from the given IP address was recorded for this token.
+
+        :return: Whether it wasn't flagged yet, meaning the login should be recorded.
+        """
+        return bool(
+            cache.set(
+                f'{Auth.Config.LOGIN_PREFIX}{self.token}:{ip_address}',
+                1,
+                ex=Auth.Config.LOGIN_THROTTLE_TTL,
+                nx=True,
+            )
+        )
+
     @staticmethod
     def load(token: str):
         """
@@ -143,8 +245,6 @@ class Auth(BaseModel):
         # TODO change to getex() when a new release (4.0) of redis-py comes out
         user_id = cache.get(f'{Auth.Config.TOKEN_PREFIX}{token}')
         if user_id:
-            auth = Auth(user_id=user_id, token=token)
-            auth.refresh_token()
-            return auth
+            return Auth(user_id=user_id, token=token)
 
         return None
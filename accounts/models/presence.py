@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+from core.redis import redis_client_instance as cache
+
+
+# Pop due entries atomically, so concurrent sweepers never process the same user twice.
+POP_DISCONNECTED_SCRIPT = cache.register_script(
+    """
+    local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+    if #ids > 0 then
+        redis.call('ZREM', KEYS[1], unpack(ids))
+    end
+    return ids
+    """
+)
+
+
+class Presence(BaseModel):
+    """
+    This class holds users presence (online, teaming, queued, in_game) on Redis cache db,
+    so presence churn (connects, lobby moves, queues) doesn't become write load on the
+    primary db. Offline users have no entry at all.
+
+    Every change is flagged as dirty so the `accounts.tasks.persist_presence` task can
+    write it behind to the `User.last_status` column, which is meant for analytics only.
+    Application code should always read presence from here.
+
+    The Redis db keys from this model are described below:
+
+    [hash] __presence:status <user_id: status>
+    Current status of each online user.
+
+    [set] __presence:online <(user_id,...)>
+    Online users, so it can be intersected with other sets (eg. friend lists).
+
+    [set] __presence:dirty <(user_id,...)>
+    Users with presence changes that weren't persisted to the db yet.
+
+    [zset] __presence:disconnected <(user_id: timestamp,...)>
+    Users that lost their last websocket session and when it happened. Those are
+    picked by the `accounts.tasks.sweep_disconnected_users` task once the grace
+    period is over. Repeated disconnects (eg. multiple tabs) just bump the timestamp.
+    """
+
+    user_id: int
+
+    class Config:
+        CACHE_KEY: str = '__presence:status'
+        DIRTY_KEY: str = '__presence:dirty'
+        DISCONNECTED_KEY: str = '__presence:disconnected'
+        DISCONNECT_GRACE_PERIOD: int = 15
+        ONLINE_KEY: str = '__presence:online'
+        OFFLINE: str = 'offline'
+        PERSIST_BATCH_SIZE: int = 500
+        SWEEP_BATCH_SIZE: int = 100
+
+    @property
+    def status(self) -> str:
+        """
+        Retrieve the user current status.
+        """
+        status = cache.hget(Presence.Config.CACHE_KEY, self.user_id)
+        return status or Presence.Config.OFFLINE
+
+    def set(self, status: str, pipe=None):
+        """
+        Change the user current status.
+        """
+        Presence.set_many([self.user_id], status, pipe=pipe)
+
+    @staticmethod
+    def set_many(user_ids: List[int], status: str, pipe=None):
+        """
+        Change the status of all received users at once. If a pipeline is received,
+        the commands are queued on it and the caller is in charge of executing it.
+        """
+        if not user_ids:
+            return
+
+        commands = pipe or cache.pipeline()
+        if status == Presence.Config.OFFLINE:
+            commands.hdel(Presence.Config.CACHE_KEY, *user_ids)
+            commands.srem(Presence.Config.ONLINE_KEY, *user_ids)
+        else:
+            commands.hset(
+                Presence.Config.CACHE_KEY,
+                mapping=dict.fromkeys(user_ids, str(status)),
+            )
+            commands.sadd(Presence.Config.ONLINE_KEY, *user_ids)
+
+        commands.sadd(Presence.Config.DIRTY_KEY, *user_ids)
+
+        if not pipe:
+            commands.execute()
+
+    @staticmethod
+    def get_many(user_ids: List[int]) -> Dict[int, str]:
+        """
+        Bulk lookup for users statuses with a single round-trip.
+
+        :return: A dict mapping each received user_id to its status.
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+
+        statuses = cache.hmget(Presence.Config.CACHE_KEY, user_ids)
+        return {
+            int(user_id): status or Presence.Config.OFFLINE
+            for user_id, status in zip(user_ids, statuses)
+        }
+
+    @staticmethod
+    def get_all() -> Dict[int, str]:
+        """
+        Retrieve statuses from all online users.
+        """
+        statuses = cache.hgetall(Presence.Config.CACHE_KEY)
+        return {int(user_id): status for user_id, status in statuses.items()}
+
+    @staticmethod
+    def online_ids() -> List[int]:
+        """
+        Retrieve the id of all online users.
+        """
+        return [int(user_id) for user_id in cache.smembers(Presence.Config.ONLINE_KEY)]
+
+    @staticmethod
+    def pop_dirty(count: int = Config.PERSIST_BATCH_SIZE) -> Dict[int, str]:
+        """
+        Pop up to `count` users with unpersisted changes from the dirty set.
+
+        :return: A dict mapping each popped user_id to its current status.
+        """
+        user_ids = cache.spop(Presence.Config.DIRTY_KEY, count)
+        return Presence.get_many([int(user_id) for user_id in user_ids or []])
+
+    @staticmethod
+    def add_disconnected(user_ids: List[int], timestamp: float = None, pipe=None):
+        """
+        Flag users as disconnected at `timestamp` (defaults to now).
+        """
+        if not user_ids:
+            return
+
+        timestamp = time.time() if timestamp is None else timestamp
+        (pipe or cache).zadd(
+            Presence.Config.DISCONNECTED_KEY,
+            dict.fromkeys(user_ids, timestamp),
+        )
+
+    @staticmethod
+    def pop_disconnected(count: int = Config.SWEEP_BATCH_SIZE) -> List[int]:
+        """
+        Pop up to `count` users that got disconnected before the grace period.
+        """
+        threshold = time.time() - Presence.Config.DISCONNECT_GRACE_PERIOD
+        user_ids = POP_DISCONNECTED_SCRIPT(
+            keys=[Presence.Config.DISCONNECTED_KEY],
+            args=[threshold, count],
+        )
+        return [int(user_id) for user_id in user_ids]
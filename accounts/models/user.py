@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import json
+from typing import Dict, List
 
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import PermissionsMixin
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
-from django.db.models import Q
+from django.db.models.functions import Upper
 from django.utils import timezone
 from pydantic import BaseModel, Field
 from social_django.models import UserSocialAuth
@@ -14,6 +16,7 @@ from social_django.models import UserSocialAuth
 from core.redis import redis_client_instance as cache
 
 from .auth import Auth
+from .presence import Presence
 
 
 class UserManager(BaseUserManager):
@@ -63,6 +66,23 @@ class SteamUser(BaseModel):
         if result:
             return SteamUser(**result)
 
+    @staticmethod
+    def load_many(user_ids: List[int]) -> Dict[int, SteamUser]:
+        """
+        Load all cached steam users at once, with a single pipelined round-trip.
+        Users that aren't cached yet are left out.
+        """
+        with cache.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.hgetall(f"{SteamUser.Config.CACHE_KEY}:{user_id}")
+            results = pipe.execute()
+
+        return {
+            user_id: SteamUser(**result)
+            for user_id, result in zip(user_ids, results)
+            if result
+        }
+
 
 class User(AbstractBaseUser, PermissionsMixin):
     class Status(models.TextChoices):
@@ -99,10 +119,12 @@ class User(AbstractBaseUser, PermissionsMixin):
         blank=True,
         null=True,
     )
-    status = models.CharField(
+    last_status = models.CharField(
         max_length=16,
         choices=Status.choices,
         default="offline",
+        db_column="status",
+        editable=False,
     )
     is_alpha = models.BooleanField(default=False)
     is_beta = models.BooleanField(default=False)
@@ -120,7 +142,10 @@ class User(AbstractBaseUser, PermissionsMixin):
             models.Index(fields=["is_active"]),
             models.Index(fields=["is_staff"]),
             models.Index(fields=["is_superuser"]),
-            models.Index(fields=["status"]),
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                name="accounts_user_email_trgm_idx",
+            ),
         ]
 
     @property
@@ -148,6 +173,18 @@ class User(AbstractBaseUser, PermissionsMixin):
     def auth(self):
         return Auth(user_id=self.id)
 
+    @property
+    def presence(self):
+        return Presence(user_id=self.id)
+
+    @property
+    def status(self):
+        return self.presence.status
+
+    @status.setter
+    def status(self, value):
+        self.presence.set(value)
+
     @property
     def is_online(self):
         return self.is_verified() and self.status != User.Status.OFFLINE
@@ -205,22 +242,19 @@ class User(AbstractBaseUser, PermissionsMixin):
         sessions = self.auth.add_session()
         if sessions == 1:
             self.status = User.Status.ONLINE
-            self.save()
 
     def remove_session(self):
         sessions = self.auth.remove_session()
         if sessions is None:
             self.status = User.Status.OFFLINE
-            self.save()
 
     def logout(self):
         self.auth.expire_session(seconds=0)
         self.status = User.Status.OFFLINE
-        self.save()
 
     @staticmethod
     def online_users():
-        return User.objects.filter(~Q(status=User.Status.OFFLINE))
+        return User.objects.filter(id__in=Presence.online_ids())
 
     @staticmethod
     def active_verified_users(exclude_ids=[]):
@@ -4,7 +4,7 @@ from django.dispatch import receiver
 from django.utils import timezone
 
 from . import websocket
-from .models import UserBan
+from .models import Account, Auth, UserBan
 
 User = get_user_model()
 
@@ -24,3 +24,9 @@ def inactivate_upon_ban(sender, instance: UserBan, created: bool, **kwargs):
     instance.user.save()
     websocket.ws_update_user(instance.user)
     websocket.ws_update_status_on_friendlist(instance.user)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Account)
+def clear_auth_identity(sender, instance, **kwargs):
+    Auth.clear_identity(instance.id if sender is User else instance.user_id)
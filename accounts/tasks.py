@@ -1,10 +1,17 @@
 import datetime
+from typing import Dict, List, Set
 
 from celery import shared_task
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
+from core.db import chunked_delete
 from core.redis import redis_client_instance as cache
+from core.utils import chunked
 from lobbies.api.controller import handle_player_move
 from lobbies.models import Lobby, LobbyException
 from lobbies.websocket import ws_expire_player_invites, ws_update_lobby
@@ -12,7 +19,7 @@ from pre_matches.api.controller import cancel_pre_match
 from pre_matches.models import PreMatch, Team
 
 from . import utils, websocket
-from .models import UserLogin
+from .models import Account, Auth, Presence
 
 User = get_user_model()
 
@@ -58,34 +65,63 @@ def watch_user_status_change(user_id: int):
         # Send websocket logout message
         websocket.ws_user_logout(user.id)
 
-        # Deleting user from friend list cache
-        cache.delete(f'__friendlist:user:{user.id}')
+
+def get_inactive_accounts(inactivity_days: int = None):
+    """
+    Verified accounts of active users whose last login is older than
+    `inactivity_days`, with their last activity computed in a single grouped query.
+    Accounts with nothing left to decay (level and points at 0) are left out.
+    """
+    inactivity_days = inactivity_days or settings.PLAYER_INACTIVITY_DAYS
+    inactivity_limit = timezone.now() - timezone.timedelta(days=inactivity_days)
+    return (
+        Account.objects.filter(is_verified=True, user__is_active=True)
+        .filter(Q(level__gt=0) | Q(level_points__gt=0))
+        .annotate(last_login=Max('user__userlogin__timestamp'))
+        .filter(last_login__lt=inactivity_limit)
+    )
 
 
 @shared_task
-def decr_level_from_inactivity():
+def decr_level_from_inactivity(
+    dry_run: bool = False,
+    inactivity_days: int = None,
+    chunk_size: int = None,
+) -> dict:
     """
-    Task that checks daily for all inactive users
-    and decr their level based on how many days
-    he is inactive.
+    Task that checks weekly for all inactive users and decreases their level by one,
+    resetting their level points. Accounts are updated in chunks with bulk UPDATEs,
+    so the ranking (that is ordered by the indexed level and level points) is in
+    sync as soon as each chunk is written.
+
+    :params dry_run bool: Only count the accounts that would be affected.
+    :return: How many accounts were (or would be) decayed, and how many of those
+    lost a level.
     """
-    last_login = (
-        UserLogin.objects.filter(
-            user__is_active=True,
+    accounts = get_inactive_accounts(inactivity_days)
+    chunk_size = chunk_size or settings.PLAYER_INACTIVITY_DECAY_CHUNK_SIZE
+    result = {'accounts': 0, 'level_decreased': 0, 'dry_run': dry_run}
+
+    if dry_run:
+        result.update(
+            accounts.aggregate(
+                accounts=Count('id'),
+                level_decreased=Count('id', filter=Q(level__gt=0)),
+            )
         )
-        .order_by('timestamp')
-        .last()
-    )
+        return result
 
-    inactivity_limit = timezone.now() - timezone.timedelta(days=90)
-    if last_login and last_login.timestamp < inactivity_limit:
-        user = last_login.user
-        if hasattr(user, 'account'):
-            if user.account.is_verified:
-                if user.account.level > 0:
-                    user.account.level -= 1
-                user.account.level_points = 0
-                user.account.save()
+    account_ids = accounts.order_by('id').values_list('id', flat=True)
+    for chunk in chunked(account_ids.iterator(chunk_size=chunk_size), chunk_size):
+        with transaction.atomic():
+            qs = Account.objects.filter(id__in=chunk)
+            result['level_decreased'] += qs.filter(level__gt=0).count()
+            result['accounts'] += qs.update(
+                level=Greatest(F('level') - 1, 0),
+                level_points=0,
+            )
+
+    return result
 
 
 @shared_task
@@ -112,30 +148,156 @@ def send_invite_mail(email_to: str, from_username: str):
     utils.send_invite_mail(email_to, from_username)
 
 
+def _cleanup_user_lobby(
+    user: User,
+    lobby_ids: Dict[int, int],
+    pre_matches: Dict[int, PreMatch],
+    teams: Dict[int, Team],
+    cancelled: Set[int],
+):
+    """
+    Take a logged out user out of its pre match, team and lobby, using the
+    pre matches, teams and lobbies fetched once by `logout_users`.
+
+    :params cancelled set: Ids of pre matches already cancelled on the batch,
+    updated with the ones cancelled here.
+    """
+    lobby_id = lobby_ids.get(user.id)
+    if lobby_id:
+        pre_match = pre_matches.get(user.id)
+        if pre_match and pre_match.id not in cancelled:
+            cancel_pre_match(pre_match, 'lock_in')
+            cancelled.add(pre_match.id)
+
+        # Teams may have changed meanwhile (eg. a cancelled pre match).
+        team = teams.get(lobby_id)
+        if team and lobby_id in team.lobbies_ids:
+            team.remove_lobby(lobby_id)
+
+    try:
+        handle_player_move(user, user.id, delete_lobby=True)
+    except LobbyException:
+        if user.account.lobby:
+            ws_update_lobby(user.account.lobby)
+            Lobby.delete(user.account.lobby.id)
+
+
+def logout_users(user_ids: List[int]):
+    """
+    Batched `watch_user_status_change` for users whose sessions were just expired.
+    Lobbies, teams and pre matches are resolved for the given users only, with an
+    MGET each, statuses are set with a single pipeline and the logout websocket is
+    published once for all users.
+    """
+    users = list(User.objects.filter(id__in=user_ids).select_related('account'))
+    if not users:
+        return
+
+    user_ids = [user.id for user in users]
+    lobby_ids = Lobby.get_current_ids(user_ids)
+    teams = Team.get_by_lobby_ids([id for id in lobby_ids.values() if id])
+    teams_pre_matches = PreMatch.get_by_team_ids([team.id for team in teams.values()])
+    pre_matches = {
+        user_id: teams_pre_matches[teams[lobby_id].id]
+        for user_id, lobby_id in lobby_ids.items()
+        if lobby_id in teams and teams[lobby_id].id in teams_pre_matches
+    }
+    cancelled_pre_match_ids = set()
+
+    for user in users:
+        ws_expire_player_invites(user)
+        if hasattr(user, 'account'):
+            _cleanup_user_lobby(
+                user,
+                lobby_ids,
+                pre_matches,
+                teams,
+                cancelled_pre_match_ids,
+            )
+
+    Presence.set_many(user_ids, User.Status.OFFLINE)
+    for user in users:
+        websocket.ws_update_status_on_friendlist(user)
+
+    websocket.ws_users_logout(user_ids)
+
+
 @shared_task
 def logout_inactive_users():
+    """
+    Log out online users whose latest login is older than a day. Stale users are
+    resolved with a single grouped query, their sessions and tokens are expired
+    with a pipeline and they are cleaned up as a batch (see `logout_users`).
+    """
     date_from = timezone.now() - datetime.timedelta(days=1)
-    logins = (
-        UserLogin.objects.filter(
-            timestamp__lte=date_from,
-            user__status__in=User.online_statuses,
-            user__is_staff=False,
-        )
-        .select_related('user')
-        .distinct()
+    user_ids = list(
+        User.objects.filter(id__in=Presence.online_ids(), is_staff=False)
+        .annotate(latest_login=Max('userlogin__timestamp'))
+        .filter(latest_login__lte=date_from)
+        .values_list('id', flat=True)
     )
-    for login in logins:
-        login.user.auth.expire_session(0)
-        login.user.auth.refresh_token(0)
-        watch_user_status_change(login.user.id)
+    if not user_ids:
+        return
+
+    Auth.expire_many(user_ids)
+    logout_users(user_ids)
+
+
+@shared_task
+def sweep_disconnected_users():
+    """
+    Task that checks disconnected users once their grace period is over. Users that
+    reconnected meanwhile are skipped, the others go through `watch_user_status_change`.
+    """
+    while True:
+        user_ids = Presence.pop_disconnected()
+        if not user_ids:
+            break
+
+        with cache.pipeline() as pipe:
+            for user_id in user_ids:
+                pipe.exists(f'{Auth.Config.SESSION_PREFIX}{user_id}')
+            has_sessions = pipe.execute()
+
+        for user_id, connected in zip(user_ids, has_sessions):
+            if connected:
+                continue
+
+            try:
+                watch_user_status_change(user_id)
+            except User.DoesNotExist:
+                pass
 
 
 @shared_task
 def delete_not_registered_users():
     date_limit = timezone.now() - datetime.timedelta(days=1)
-    User.objects.filter(
-        account__isnull=True,
-        is_staff=False,
-        is_superuser=False,
-        date_joined__lte=date_limit,
-    ).delete()
+    # Users have many relations (and signals), so batches go through the ORM delete.
+    return chunked_delete(
+        User.objects.filter(
+            account__isnull=True,
+            is_staff=False,
+            is_superuser=False,
+            date_joined__lte=date_limit,
+        ),
+        label='delete_not_registered_users',
+    )
+
+
+@shared_task
+def persist_presence():
+    """
+    Write behind users presence changes from Redis to the `User.last_status` column,
+    so presence churn turns into a few batched updates instead of a write per change.
+    """
+    while True:
+        statuses = Presence.pop_dirty()
+        if not statuses:
+            break
+
+        users_by_status = {}
+        for user_id, status in statuses.items():
+            users_by_status.setdefault(status, []).append(user_id)
+
+        for status, user_ids in users_by_status.items():
+            User.objects.filter(id__in=user_ids).update(last_status=status)
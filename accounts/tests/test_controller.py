@@ -56,6 +56,38 @@ class AccountsControllerTestCase(mixins.AccountOneMixin, TestCase):
         self.assertTrue(logins.exists())
         self.assertEqual(logins[0].ip_address, '111.111.111.111')
 
+    def test_login_identity_cache(self):
+        self.user.account.is_verified = True
+        self.user.account.save()
+        auth = Auth(user_id=self.user.id, force_token_create=True)
+        request = RequestSchema()
+        controller.login(request, auth.token)
+        self.assertEqual(request.user.id, self.user.id)
+
+        with self.assertNumQueries(0):
+            request = RequestSchema()
+            loaded = controller.login(request, auth.token)
+        self.assertEqual(loaded.user_id, self.user.id)
+        self.assertEqual(request.user.id, self.user.id)
+
+        self.user.account.is_verified = False
+        self.user.account.save()
+        self.assertIsNone(controller.login(RequestSchema(), auth.token))
+
+    def test_login_throttle(self):
+        self.user.account.is_verified = True
+        self.user.account.save()
+        auth = Auth(user_id=self.user.id, force_token_create=True)
+        controller.login(RequestSchema(), auth.token)
+        timestamp = UserLogin.objects.get(user=self.user).timestamp
+
+        controller.login(RequestSchema(), auth.token)
+        self.assertEqual(UserLogin.objects.get(user=self.user).timestamp, timestamp)
+
+        request = RequestSchema(META={'HTTP_X_FORWARDED_FOR': '222.222.222.222'})
+        controller.login(request, auth.token)
+        self.assertEqual(UserLogin.objects.filter(user=self.user).count(), 2)
+
     def test_create_fake_user(self):
         user = controller.create_fake_user(email='fake-tester@email.com')
         self.assertIsNotNone(user)
@@ -293,9 +325,8 @@ class AccountsControllerTestCase(mixins.AccountOneMixin, TestCase):
         controller.update_email(self.user, 'new@email.com')
         mocker.assert_called_once()
 
-    @mock.patch('accounts.api.controller.cache.delete')
     @mock.patch('accounts.api.controller.websocket.ws_user_logout')
-    def test_logout(self, mock_user_logout, mock_cache_delete):
+    def test_logout(self, mock_user_logout):
         self.user.add_session()
         self.user.account.is_verified = True
         self.user.account.save()
@@ -306,7 +337,6 @@ class AccountsControllerTestCase(mixins.AccountOneMixin, TestCase):
 
         self.assertIsNone(self.user.account.lobby)
         self.assertFalse(self.user.is_online)
-        mock_cache_delete.assert_called_with(f'__friendlist:user:{self.user.id}')
         mock_user_logout.assert_called_once()
 
     def test_logout_other_lobby(self):
@@ -490,6 +490,37 @@ class AccountsUserModelTestCase(mixins.VerifiedAccountMixin, TestCase):
         self.assertEqual(len(models.User.online_users()), 1)
 
 
+class AccountsPresenceModelTestCase(mixins.VerifiedAccountsMixin, TestCase):
+    def test_status(self):
+        presence = models.Presence(user_id=self.user_1.id)
+        self.assertEqual(presence.status, models.User.Status.OFFLINE)
+        presence.set(models.User.Status.TEAMING)
+        self.assertEqual(presence.status, models.User.Status.TEAMING)
+        presence.set(models.User.Status.OFFLINE)
+        self.assertEqual(presence.status, models.User.Status.OFFLINE)
+        self.assertEqual(models.Presence.online_ids(), [])
+
+    def test_set_many(self):
+        models.Presence.set_many(
+            [self.user_1.id, self.user_2.id],
+            models.User.Status.QUEUED,
+        )
+        self.assertEqual(
+            models.Presence.get_many([self.user_1.id, self.user_2.id, self.user_3.id]),
+            {
+                self.user_1.id: models.User.Status.QUEUED,
+                self.user_2.id: models.User.Status.QUEUED,
+                self.user_3.id: models.User.Status.OFFLINE,
+            },
+        )
+
+    def test_does_not_write_db(self):
+        self.user_1.status = models.User.Status.ONLINE
+        self.user_1.refresh_from_db()
+        self.assertEqual(self.user_1.status, models.User.Status.ONLINE)
+        self.assertEqual(self.user_1.last_status, models.User.Status.OFFLINE)
+
+
 class AccountsAuthModelTestCase(mixins.AccountOneMixin, TestCase):
     def test_token_init(self):
         auth = models.Auth(user_id=self.user.id)
@@ -506,6 +537,17 @@ class AccountsAuthModelTestCase(mixins.AccountOneMixin, TestCase):
         auth = models.Auth(user_id=self.user.id, force_token_create=True)
         self.assertIsNotNone(cache.get(auth.token_cache_key))
 
+    def test_get_token(self):
+        created = models.Auth(user_id=self.user.id, force_token_create=True)
+        self.assertEqual(models.Auth(user_id=self.user.id).token, created.token)
+
+        cache.delete(created.user_token_cache_key)
+        self.assertEqual(created.get_token(), created.token)
+        self.assertEqual(cache.get(created.user_token_cache_key), created.token)
+
+        cache.delete(created.token_cache_key)
+        self.assertIsNone(created.get_token())
+
     def test_token_load(self):
         created = models.Auth(user_id=self.user.id, force_token_create=True)
         loaded = models.Auth.load(created.token)
@@ -6,7 +6,7 @@ from django.test import override_settings
 from django.utils import timezone
 from model_bakery import baker
 
-from core.tests import TestCase
+from core.tests import TestCase, cache
 from lobbies.models import Lobby
 from lobbies.tasks import queue
 from pre_matches.models import Team
@@ -94,6 +94,45 @@ class AccountsTasksTestCase(mixins.UserWithFriendsMixin, TestCase):
         self.assertEqual(self.user.account.level, 34)
         self.assertEqual(self.user.account.level_points, 0)
 
+    def test_decr_level_from_inactivity_bulk(self):
+        old_login_date = timezone.now() - timezone.timedelta(days=91)
+        for user, level, level_points in [
+            (self.user, 10, 20),
+            (self.friend1, 0, 50),
+            (self.friend2, 5, 0),
+        ]:
+            user.is_active = True
+            user.save()
+            user.account.level = level
+            user.account.level_points = level_points
+            user.account.save()
+            login = user.userlogin_set.create(ip_address='1.1.1.1')
+            login.timestamp = old_login_date
+            login.save()
+
+        result = tasks.decr_level_from_inactivity(dry_run=True)
+        self.assertEqual(
+            result,
+            {'accounts': 3, 'level_decreased': 2, 'dry_run': True},
+        )
+        self.user.account.refresh_from_db()
+        self.assertEqual(self.user.account.level, 10)
+
+        result = tasks.decr_level_from_inactivity(chunk_size=2)
+        self.assertEqual(
+            result,
+            {'accounts': 3, 'level_decreased': 2, 'dry_run': False},
+        )
+
+        for user, level in [(self.user, 9), (self.friend1, 0), (self.friend2, 4)]:
+            user.account.refresh_from_db()
+            self.assertEqual(user.account.level, level)
+            self.assertEqual(user.account.level_points, 0)
+
+        # Accounts with nothing left to decay are skipped.
+        result = tasks.decr_level_from_inactivity(dry_run=True)
+        self.assertEqual(result['accounts'], 2)
+
     @override_settings(TEAM_READY_PLAYERS_MIN=1)
     @mock.patch('pre_matches.models.Team.remove_lobby')
     @mock.patch('accounts.tasks.cancel_pre_match')
@@ -152,6 +191,29 @@ class AccountsTasksTestCase(mixins.UserWithFriendsMixin, TestCase):
         mock_expire_invites.assert_called_once()
         mock_lobby_move.assert_called_once()
 
+    @override_settings(TEAM_READY_PLAYERS_MIN=1)
+    @mock.patch('accounts.tasks.Team.get_all')
+    @mock.patch('accounts.tasks.PreMatch.get_all')
+    @mock.patch('accounts.tasks.handle_player_move')
+    def test_logout_users_with_team(
+        self,
+        mock_lobby_move,
+        mock_pre_match_get_all,
+        mock_team_get_all,
+    ):
+        self.friend1.add_session()
+        lobby = Lobby.create(owner_id=self.friend1.id)
+        lobby.start_queue()
+        team = Team.create([lobby.id])
+
+        self.friend1.logout()
+        tasks.logout_users([self.friend1.id, self.friend2.id])
+
+        self.assertIsNone(Team.get_by_id(team.id))
+        mock_pre_match_get_all.assert_not_called()
+        mock_team_get_all.assert_not_called()
+        self.assertEqual(mock_lobby_move.call_count, 2)
+
     def test_logout_inactive_users(self):
         self.user.add_session()
         self.user.status = User.Status.ONLINE
@@ -163,11 +225,71 @@ class AccountsTasksTestCase(mixins.UserWithFriendsMixin, TestCase):
         login.refresh_from_db()
 
         tasks.logout_inactive_users()
+        tasks.sweep_disconnected_users()
         self.user.refresh_from_db()
         self.assertEqual(self.user.status, User.Status.OFFLINE)
         self.assertFalse(self.user.is_online)
         self.assertFalse(self.user.has_sessions)
 
+    @mock.patch('accounts.tasks.websocket.ws_users_logout')
+    def test_logout_inactive_users_batch(self, mock_users_logout):
+        yesterday = timezone.now() - datetime.timedelta(days=1, hours=1)
+        tokens = {}
+        for user in [self.user, self.friend1, self.friend2]:
+            auth = user.auth
+            auth.create_token()
+            tokens[user.id] = auth.token
+            user.add_session()
+            login = UserLogin.objects.create(user=user, ip_address='1.1.1.1')
+            login.timestamp = yesterday
+            login.save()
+
+        # A recent login from another IP keeps the user logged in.
+        UserLogin.objects.create(user=self.friend2, ip_address='2.2.2.2')
+        Lobby.create(owner_id=self.user.id)
+
+        tasks.logout_inactive_users()
+
+        mock_users_logout.assert_called_once()
+        self.assertCountEqual(
+            mock_users_logout.call_args[0][0],
+            [self.user.id, self.friend1.id],
+        )
+        for user in [self.user, self.friend1]:
+            self.assertFalse(user.has_sessions)
+            self.assertIsNone(tasks.Auth.load(tokens[user.id]))
+            self.assertEqual(user.status, User.Status.OFFLINE)
+
+        self.assertTrue(self.friend2.has_sessions)
+        self.assertIsNotNone(tasks.Auth.load(tokens[self.friend2.id]))
+        self.assertIsNone(self.user.account.lobby)
+
+    @mock.patch('accounts.tasks.watch_user_status_change')
+    def test_sweep_disconnected_users(self, mock_watch):
+        self.user.add_session()
+        self.friend1.add_session()
+        self.friend1.auth.expire_session(0)
+        tasks.Presence.add_disconnected([self.user.id, self.friend1.id], timestamp=0)
+        tasks.Presence.add_disconnected([self.friend2.id])
+
+        tasks.sweep_disconnected_users()
+        mock_watch.assert_called_once_with(self.friend1.id)
+        self.assertEqual(
+            cache.zrange(tasks.Presence.Config.DISCONNECTED_KEY, 0, -1),
+            [str(self.friend2.id)],
+        )
+
+    def test_persist_presence(self):
+        self.user.status = User.Status.ONLINE
+        self.friend1.status = User.Status.TEAMING
+        tasks.persist_presence()
+
+        self.user.refresh_from_db()
+        self.friend1.refresh_from_db()
+        self.assertEqual(self.user.last_status, User.Status.ONLINE)
+        self.assertEqual(self.friend1.last_status, User.Status.TEAMING)
+        self.assertEqual(tasks.Presence.pop_dirty(), {})
+
     def test_delete_not_registered_users(self):
         user = baker.make(User, email='not_registered@reloadclub.gg')
         tasks.delete_not_registered_users()
@@ -28,7 +28,6 @@ class AdminLogin(LoginView):
         auth_login(self.request, form.get_user())
         if self.request.user.is_authenticated:
             self.request.user.status = User.Status.ONLINE
-            self.request.user.save()
 
         return HttpResponseRedirect(self.get_success_url())
 
@@ -40,12 +39,10 @@ class AdminLogout(LogoutView):
             and self.request.user.status != User.Status.OFFLINE
         ):
             self.request.user.status = User.Status.OFFLINE
-            self.request.user.save()
         return super().get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
         self.request.user.status = User.Status.OFFLINE
-        self.request.user.save()
         return super().post(request, *args, **kwargs)
 
 
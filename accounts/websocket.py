@@ -1,7 +1,8 @@
 from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
 
-from friends.api.schemas import FriendSchema
+from friends.models import FriendList
+from friends.tasks import send_friend_status_updates
 from websocket.utils import ws_send
 
 from .api import schemas
@@ -44,10 +45,32 @@ def ws_user_logout(user_id: int):
     return async_to_sync(ws_send)('user/logout', None, groups=[user_id])
 
 
+def ws_users_logout(user_ids: list):
+    """
+    Triggered when many users are logged out at once, with a single message
+    published to all their groups.
+
+    Cases:
+    - Users with stale sessions are logged out.
+
+    Payload:
+    null
+
+    Actions:
+    - user/logout
+    """
+    if not user_ids:
+        return None
+
+    return async_to_sync(ws_send)('user/logout', None, groups=user_ids)
+
+
 def ws_update_status_on_friendlist(user: User):
     """
-    Triggered everytime a user change its state. This sends an update
-    about the user state to his online friends.
+    Triggered everytime a user change its state. This queues an update about
+    the user state to his online friends. Updates are coalesced over a short window,
+    so each friend gets a single message with all updates from that window
+    (see `friends.websocket.ws_friends_update_many`).
 
     Cases:
     - User logs in.
@@ -59,12 +82,14 @@ def ws_update_status_on_friendlist(user: User):
     - User friend just signup, verified and became online.
 
     Payload:
-    friends.api.schemas.FriendSchema: object
+    friends.api.schemas.FriendSchema: list
 
     Actions:
-    - friends/update
+    - friends/update_many
     """
 
-    groups = [account.user.id for account in user.account.get_online_friends()]
-    payload = FriendSchema.from_orm(user.account).dict()
-    return async_to_sync(ws_send)('friends/update', payload, groups=groups)
+    if FriendList.queue_status_update(user.id):
+        send_friend_status_updates.apply_async(
+            countdown=FriendList.Config.STATUS_UPDATES_WINDOW,
+            serializer='json',
+        )
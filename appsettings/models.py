@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import json
+
 from django.db import models
 from django.utils.translation import gettext as _
 
+from core.redis import redis_client_instance as cache
+
 
 class AppSettings(models.Model):
     TEXT = 'text'
     INTEGER = 'integer'
     BOOLEAN = 'boolean'
 
+    CACHE_KEY = '__appsettings:cached'
+
     KIND_CHOICES = (
         (TEXT, _('Text')),
         (INTEGER, _('Integer')),
@@ -42,5 +48,23 @@ class AppSettings(models.Model):
 
         return default
 
+    @staticmethod
+    def get_cached(name, default=None):
+        """
+        Same as `get`, but the resolved value is kept on Redis until the setting
+        is saved or deleted again, so hot paths don't query the db on every call.
+        """
+        cached = cache.hget(AppSettings.CACHE_KEY, name)
+        if cached is not None:
+            return json.loads(cached)
+
+        value = AppSettings.get(name, default)
+        cache.hset(AppSettings.CACHE_KEY, name, json.dumps(value))
+        return value
+
+    @staticmethod
+    def clear_cached(name):
+        cache.hdel(AppSettings.CACHE_KEY, name)
+
     def __str__(self):
         return self.name
@@ -30,7 +30,7 @@ def player_max_losing_level_points() -> int:
 
 
 def max_notification_history_count_per_player() -> int:
-    return AppSettings.get(
+    return AppSettings.get_cached(
         'Max Notification Count Per Player',
         settings.MAX_NOTIFICATION_HISTORY_COUNT_PER_PLAYER,
     )
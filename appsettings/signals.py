@@ -1,4 +1,4 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils.translation import gettext as _
 
@@ -46,3 +46,9 @@ def update_maintanence(sender, instance: AppSettings, created: bool, **kwargs):
             handle_start_maintanence()
         else:
             handle_stop_maintanence()
+
+
+@receiver(post_save, sender=AppSettings)
+@receiver(post_delete, sender=AppSettings)
+def clear_cached_setting(sender, instance: AppSettings, **kwargs):
+    AppSettings.clear_cached(instance.name)
@@ -9,6 +9,27 @@ from pre_matches.tests.mixins import LobbiesMixin
 
 
 class AppSettingsTestCase(LobbiesMixin, TestCase):
+    def test_get_cached(self):
+        self.assertEqual(AppSettings.get_cached('name', 1), 1)
+
+        config = AppSettings.objects.create(
+            name='name',
+            kind=AppSettings.INTEGER,
+            value='5',
+        )
+        self.assertEqual(AppSettings.get_cached('name', 1), 5)
+
+        with mock.patch('appsettings.models.AppSettings.get') as mock_get:
+            self.assertEqual(AppSettings.get_cached('name', 1), 5)
+            mock_get.assert_not_called()
+
+        config.value = '7'
+        config.save()
+        self.assertEqual(AppSettings.get_cached('name', 1), 7)
+
+        config.delete()
+        self.assertEqual(AppSettings.get_cached('name', 1), 1)
+
     def test_get_str(self):
         config = AppSettings(name='name', kind=AppSettings.TEXT, value='test')
         config.save()
@@ -1,12 +1,25 @@
+import base64
 import math
-from typing import Any, List
+from typing import Any, Callable, List, Sequence
 
+import orjson
 from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, OrderBy, Q
 from ninja import Field, Schema
+from ninja.errors import HttpError
 from ninja.pagination import PaginationBase
 
+from core.utils import json_default
+
 
 class Pagination(PaginationBase):
+    """
+    Page number pagination. The queryset is counted once and only the requested
+    page is sliced, so lazy sequences (eg. `ranking.api.controller.RankingList`)
+    only hydrate the rows on that page.
+    """
+
     class Input(Schema):
         page: int = Field(1, ge=1)
 
@@ -27,15 +40,16 @@ class Pagination(PaginationBase):
 
     def paginate_queryset(self, queryset: Any, pagination: Input, **params: Any) -> Any:
         offset = (pagination.page - 1) * self.page_size
-        total_pages = math.ceil(self._items_count(queryset) / self.page_size)
+        count = self._items_count(queryset)
+        total_pages = math.ceil(count / self.page_size)
         prev_page = pagination.page - 1 if pagination.page > 1 else None
         next_page = pagination.page + 1 if pagination.page < total_pages else None
         paginated = offset + self.page_size
-        results = queryset[offset:paginated]
+        results = queryset[offset:paginated] if offset < count else []
 
         return {
             'results': results,
-            'count': self._items_count(queryset),
+            'count': count,
             'page_size': self.page_size,
             'total_pages': total_pages,
             'prev_page': prev_page,
@@ -44,3 +58,254 @@ class Pagination(PaginationBase):
         }
 
     items_attribute: str = "results"
+
+
+class CursorPagination(PaginationBase):
+    """
+    Keyset pagination for deep lists. Instead of an OFFSET, each page filters rows
+    after (or before) the sort key of the last (or first) row of the previous page,
+    so fetching page 1000 costs the same as fetching page 1.
+
+    The cursor is an opaque string encoding the sort key values of the boundary row
+    and the navigation direction. The ordering must be unique, so it should end with
+    the primary key (eg. `('-end_date', '-id')`); if it doesn't, `id` is appended.
+    When no ordering is given, the queryset (or model) ordering is used. Only model
+    fields (names, `F()` or their `asc()`/`desc()`) can be ordered by, and nullable
+    ones follow the Postgres defaults: NULLs last ascending and first descending.
+
+    Rows are paginated as they come from the queryset, and only the page is passed
+    to `serialize` (when given), so the cursor is still built from the rows.
+
+    A list of querysets (tiers) can be paginated as a single list, when each tier
+    holds the rows that come after the previous one on the ordering (eg. hot and
+    archived rows). A tier is only queried when the previous ones can't fill the
+    page, and the cursor carries the tier of its boundary row.
+
+    The total count is optional (`?count=true`), since it is the only part of a
+    page that still grows with the table size.
+
+    Usage::
+
+        @router.get('/', response=List[ItemSchema])
+        @paginate(CursorPagination, ordering=('-end_date', '-id'))
+        def list_items(request):
+            return Item.objects.all()
+
+    See `matches.api.routes.history` for a route using it.
+    """
+
+    class Input(Schema):
+        cursor: str = None
+        count: bool = False
+
+    class Output(Schema):
+        results: List[Any]
+        page_size: int
+        count: int = None
+        next_cursor: str = None
+        prev_cursor: str = None
+
+    items_attribute: str = "results"
+
+    def __init__(
+        self,
+        ordering: Sequence[str] = None,
+        page_size: int = settings.PAGINATION_PER_PAGE,
+        serialize: Callable[[List[Any]], List[Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self.ordering = tuple(ordering) if ordering else None
+        self.page_size = page_size
+        self.serialize = serialize
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def encode_cursor(values: list, reverse: bool = False, tier: int = 0) -> str:
+        # Not `json_dumps`, which truncates datetimes to milliseconds: the values
+        # must match the boundary row exactly.
+        payload = orjson.dumps(
+            {'v': values, 'r': reverse, 't': tier}, default=json_default
+        )
+        return base64.urlsafe_b64encode(payload).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        try:
+            payload = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return payload['v'], payload['r'], payload.get('t', 0)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise HttpError(400, 'Invalid cursor.')
+
+    @staticmethod
+    def get_value(item: Any, field: str) -> Any:
+        for attr in field.split('__'):
+            item = item[attr] if isinstance(item, dict) else getattr(item, attr)
+
+        return item
+
+    @staticmethod
+    def reverse_ordering(ordering: Sequence[str]) -> List[str]:
+        return [
+            field[1:] if field.startswith('-') else f'-{field}' for field in ordering
+        ]
+
+    @staticmethod
+    def get_field_ordering(field: Any) -> str:
+        """
+        Normalize an ordering entry to a `[-]field` string.
+
+        :raises ValueError: If it isn't a model field (eg. `?` or an expression).
+        """
+        if isinstance(field, F):
+            return field.name
+
+        if (
+            isinstance(field, OrderBy)
+            and isinstance(field.expression, F)
+            and not field.nulls_first
+            and not field.nulls_last
+        ):
+            prefix = '-' if field.descending else ''
+            return f'{prefix}{field.expression.name}'
+
+        if isinstance(field, str) and field.lstrip('-').replace('_', '').isalnum():
+            return field
+
+        raise ValueError(f'CursorPagination can only order by model fields, not {field}.')
+
+    def get_ordering(self, queryset: Any) -> List[str]:
+        ordering = [
+            self.get_field_ordering(field)
+            for field in (
+                self.ordering
+                or queryset.query.order_by
+                or queryset.model._meta.ordering
+                or ['-id']
+            )
+        ]
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+
+        return ordering
+
+    @staticmethod
+    def is_nullable(model: Any, name: str) -> bool:
+        """
+        Whether a field (or lookup path, eg. `team__match__end_date`) can be NULL.
+        """
+        field = None
+        try:
+            for attr in name.split('__'):
+                if field is not None:
+                    model = field.related_model
+                field = model._meta.get_field('pk' if attr == 'pk' else attr)
+        except (AttributeError, FieldDoesNotExist):
+            return True
+
+        return field.null
+
+    @staticmethod
+    def get_keyset_filter(model: Any, ordering: Sequence[str], values: list) -> Q:
+        """
+        Rows strictly after `values` on the given ordering, expanded as
+        `(a > x) OR (a = x AND b > y) OR ...` so it works for mixed directions.
+        NULLs sort last ascending and first descending (Postgres defaults), so
+        nullable fields get `IS NULL` branches accordingly.
+        """
+        keyset = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-')
+            if value is None:
+                # Non NULL rows only come after NULLs on descending order.
+                after = Q(**{f'{name}__isnull': False}) if descending else None
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                after = Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+                if not descending and CursorPagination.is_nullable(model, name):
+                    after |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+
+            if after is not None:
+                keyset |= equal & after
+            equal &= same
+
+        return keyset
+
+    def get_cursor(
+        self, ordering: Sequence[str], item: Any, reverse: bool, tier: int = 0
+    ) -> str:
+        values = [self.get_value(item, field.lstrip('-')) for field in ordering]
+        return self.encode_cursor(values, reverse, tier)
+
+    def fetch_page(
+        self,
+        tiers: Sequence[Any],
+        ordering: Sequence[str],
+        values: list,
+        tier: int,
+        reverse: bool,
+    ) -> List[tuple]:
+        """
+        Up to `page_size + 1` `(tier, row)` pairs after `values` on `ordering`,
+        starting on `tier` and moving to the next ones (previous ones when going
+        backwards) only while the page isn't full.
+        """
+        rows = []
+        while 0 <= tier < len(tiers) and len(rows) <= self.page_size:
+            page = tiers[tier].order_by(*ordering)
+            if values is not None:
+                page = page.filter(
+                    self.get_keyset_filter(tiers[tier].model, ordering, values)
+                )
+
+            rows += [(tier, row) for row in page[: self.page_size + 1 - len(rows)]]
+            values = None
+            tier += -1 if reverse else 1
+
+        return rows
+
+    def paginate_queryset(self, queryset: Any, pagination: Input, **params: Any) -> Any:
+        tiers = queryset if isinstance(queryset, (list, tuple)) else [queryset]
+        ordering = self.get_ordering(tiers[0])
+        values, reverse, tier = None, False, 0
+        if pagination.cursor:
+            values, reverse, tier = self.decode_cursor(pagination.cursor)
+            if (
+                not isinstance(values, list)
+                or len(values) != len(ordering)
+                or tier not in range(len(tiers))
+            ):
+                raise HttpError(400, 'Invalid cursor.')
+
+        page_ordering = self.reverse_ordering(ordering) if reverse else ordering
+        rows = self.fetch_page(tiers, page_ordering, values, tier, reverse)
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else values is not None
+        has_prev = has_more if reverse else values is not None
+        results = [row for _, row in rows]
+
+        return {
+            'results': self.serialize(results) if self.serialize else results,
+            'page_size': self.page_size,
+            'count': (
+                sum(self._items_count(tier) for tier in tiers)
+                if pagination.count
+                else None
+            ),
+            'next_cursor': (
+                self.get_cursor(ordering, rows[-1][1], reverse=False, tier=rows[-1][0])
+                if rows and has_next
+                else None
+            ),
+            'prev_cursor': (
+                self.get_cursor(ordering, rows[0][1], reverse=True, tier=rows[0][0])
+                if rows and has_prev
+                else None
+            ),
+        }
@@ -0,0 +1,10 @@
+from ninja.renderers import BaseRenderer
+
+from core.utils import json_dumps
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+
+    def render(self, request, data, *, response_status):
+        return json_dumps(data)
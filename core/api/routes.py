@@ -25,9 +25,13 @@ from support.api.routes import router as support_router
 
 from . import schemas
 from .pagination import Pagination
+from .renderers import ORJSONRenderer
 
 local_env = settings.ENVIRONMENT == settings.LOCAL
-api = NinjaAPI(openapi_url=local_env and '/openapi.json' or '')
+api = NinjaAPI(
+    openapi_url=local_env and '/openapi.json' or '',
+    renderer=ORJSONRenderer(),
+)
 
 
 @api.exception_handler(ValidationError)
@@ -27,6 +27,10 @@ app.conf.beat_schedule = {
         "task": "matches.tasks.delete_old_cancelled_matches",
         "schedule": crontab(minute=0, hour=0),
     },
+    "archive_matches": {
+        "task": "matches.tasks.archive_matches",
+        "schedule": crontab(minute=0, hour=4),
+    },
     "keep_alive": {
         "task": "websocket.tasks.keep_alive",
         "schedule": 7.0,
@@ -43,6 +47,14 @@ app.conf.beat_schedule = {
         "task": "matches.tasks.remove_pending_loading_matches",
         "schedule": 10.0,
     },
+    "sweep_disconnected_users": {
+        "task": "accounts.tasks.sweep_disconnected_users",
+        "schedule": 5.0,
+    },
+    "persist_presence": {
+        "task": "accounts.tasks.persist_presence",
+        "schedule": 60.0,
+    },
     "expire_friend_requests": {
         "task": "friends.tasks.expire_friend_request",
         "schedule": 30.0,
@@ -0,0 +1,88 @@
+import logging
+import time
+from typing import Dict, Sequence, Tuple
+
+from django.conf import settings
+from django.db import models, router, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def chunked_delete(
+    queryset: models.QuerySet,
+    batch_size: int = None,
+    raw_cascade: Sequence[Tuple[models.Model, str]] = None,
+    label: str = None,
+) -> Dict[str, int]:
+    """
+    Delete all rows of `queryset` in bounded batches, walking the primary keys in
+    ascending order (keyset) and committing each batch on its own transaction, so
+    a big cleanup never holds long locks nor loads every row (and its cascades)
+    into memory at once.
+
+    By default, each batch goes through the regular `QuerySet.delete()`, so signals
+    and cascades keep working. When none of the models involved need signals,
+    `raw_cascade` can list the dependent models as `(model, lookup to the deleted
+    pk)` pairs, children first, and every batch is deleted with plain DELETE
+    statements instead, eg.::
+
+        chunked_delete(
+            Match.objects.filter(status=Match.Status.CANCELLED),
+            raw_cascade=[
+                (MatchPlayerStats, 'player__team__match'),
+                (MatchPlayer, 'team__match'),
+                (MatchTeam, 'match'),
+            ],
+        )
+
+    :return: Deleted rows (`deleted`, including raw cascades), `batches`
+    and elapsed `ms`.
+    """
+    batch_size = batch_size or settings.CHUNKED_DELETE_BATCH_SIZE
+    label = label or queryset.model._meta.label
+    model = queryset.model
+    db = router.db_for_write(model)
+    metrics = {'deleted': 0, 'batches': 0, 'ms': 0}
+    last_pk = None
+    start = time.perf_counter()
+
+    while True:
+        batch = queryset.order_by('pk')
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+
+        pks = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+
+        batch_start = time.perf_counter()
+        with transaction.atomic(using=db):
+            if raw_cascade is None:
+                deleted, _ = model.objects.filter(pk__in=pks).delete()
+            else:
+                deleted = 0
+                for dependent, lookup in raw_cascade:
+                    deleted += dependent.objects.filter(
+                        **{f'{lookup}__in': pks}
+                    )._raw_delete(db)
+                deleted += model.objects.filter(pk__in=pks)._raw_delete(db)
+
+        last_pk = pks[-1]
+        metrics['deleted'] += deleted
+        metrics['batches'] += 1
+        logger.info(
+            f'[chunked_delete] {label}: batch {metrics["batches"]} deleted '
+            f'{deleted} rows in {(time.perf_counter() - batch_start) * 1000:.0f}ms'
+        )
+
+        if len(pks) < batch_size:
+            break
+
+    metrics['ms'] = int((time.perf_counter() - start) * 1000)
+    if metrics['batches']:
+        logger.info(
+            f'[chunked_delete] {label}: {metrics["deleted"]} rows deleted on '
+            f'{metrics["batches"]} batches in {metrics["ms"]}ms'
+        )
+
+    return metrics
@@ -1,17 +1,22 @@
+import asyncio
+import weakref
 from collections.abc import Callable
 
 from django.conf import settings
 from redis import ConnectionPool, Redis, exceptions
+from redis import asyncio as aioredis
 
-pool = ConnectionPool(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    username=settings.REDIS_USERNAME,
-    password=settings.REDIS_PASSWORD,
-    db=settings.REDIS_TEST_DB if settings.TEST_MODE else settings.REDIS_APP_DB,
-    decode_responses=True,
-    socket_timeout=2,
-)
+POOL_KWARGS = {
+    'host': settings.REDIS_HOST,
+    'port': settings.REDIS_PORT,
+    'username': settings.REDIS_USERNAME,
+    'password': settings.REDIS_PASSWORD,
+    'db': settings.REDIS_TEST_DB if settings.TEST_MODE else settings.REDIS_APP_DB,
+    'decode_responses': True,
+    'socket_timeout': 2,
+}
+
+pool = ConnectionPool(**POOL_KWARGS)
 
 
 class RedisClient(Redis):
@@ -63,3 +68,22 @@ class RedisClient(Redis):
 
 
 redis_client_instance = RedisClient()
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def async_redis_client() -> aioredis.Redis:
+    """
+    Retrieve the asyncio Redis client for the running event loop. Async connections
+    are bound to the loop that created them, so each loop gets a single client with
+    its own pool, shared by every coroutine running on it.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis(
+            connection_pool=aioredis.ConnectionPool(**POOL_KWARGS),
+        )
+        _async_clients[loop] = client
+
+    return client
@@ -348,15 +348,30 @@ PLAYER_MAX_LOSE_LEVEL_POINTS = config(
 # Other App Settings
 APP_INVITE_REQUIRED = config("APP_INVITE_REQUIRED", default=False, cast=bool)
 APP_GLOBAL_FRIENDSHIP = config("APP_GLOBAL_FRIENDSHIP", default=False, cast=bool)
+GLOBAL_FRIENDSHIP_PAGE_SIZE = config(
+    "GLOBAL_FRIENDSHIP_PAGE_SIZE",
+    default=50,
+    cast=int,
+)
 FRIEND_REQUEST_MAX_AGE = config("FRIEND_REQUEST_MAX_AGE", default=1, cast=int)  # hours
 PLAYER_MAX_LEVEL = config("PLAYER_MAX_LEVEL", default=30, cast=int)
 PLAYER_MAX_LEVEL_POINTS = config("PLAYER_MAX_LEVEL_POINTS", default=100, cast=int)
+PLAYER_INACTIVITY_DAYS = config("PLAYER_INACTIVITY_DAYS", default=90, cast=int)
+PLAYER_INACTIVITY_DECAY_CHUNK_SIZE = config(
+    "PLAYER_INACTIVITY_DECAY_CHUNK_SIZE",
+    default=1000,
+    cast=int,
+)
 MAX_NOTIFICATION_HISTORY_COUNT_PER_PLAYER = config(
     "MAX_NOTIFICATION_HISTORY_COUNT_PER_PLAYER",
     default=10,
     cast=int,
 )
 RANKING_LIMIT = config("RANKING_LIMIT", default=100, cast=int)
+PROFILES_SEARCH_PAGE_SIZE = config("PROFILES_SEARCH_PAGE_SIZE", default=20, cast=int)
+CHUNKED_DELETE_BATCH_SIZE = config("CHUNKED_DELETE_BATCH_SIZE", default=500, cast=int)
+MATCHES_ARCHIVE_AFTER_DAYS = config("MATCHES_ARCHIVE_AFTER_DAYS", default=90, cast=int)
+MATCHES_ARCHIVE_BATCH_SIZE = config("MATCHES_ARCHIVE_BATCH_SIZE", default=200, cast=int)
 
 
 # Ninja Settings
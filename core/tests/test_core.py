@@ -1,8 +1,14 @@
+from datetime import timedelta
+
 from django.conf import settings
-from django.utils import translation
+from django.db.models import F
+from django.utils import timezone, translation
+from ninja.errors import HttpError
 
-from accounts.tests.mixins import UserOneMixin
+from accounts.models import Account
+from accounts.tests.mixins import UserOneMixin, VerifiedAccountsMixin
 
+from ..api.pagination import CursorPagination
 from . import APIClient, TestCase, cache
 
 
@@ -103,3 +109,139 @@ class CoreAPIPaginationTestCase(TestCase):
         self.assertIsNone(r.json().get('prev_page'))
         self.assertEqual(r.json().get('current_page'), 1)
         self.assertEqual(r.json().get('next_page'), 2)
+
+
+class CoreAPICursorPaginationTestCase(VerifiedAccountsMixin, TestCase):
+    def test_cursor_pagination(self):
+        paginator = CursorPagination(ordering=('-level', 'id'), page_size=10)
+        queryset = Account.objects.filter(is_verified=True)
+        ids = list(queryset.order_by('-level', 'id').values_list('id', flat=True))
+        self.assertEqual(len(ids), 26)
+
+        page = paginator.paginate_queryset(queryset, CursorPagination.Input())
+        self.assertEqual([account.id for account in page['results']], ids[:10])
+        self.assertIsNone(page['prev_cursor'])
+        self.assertIsNone(page['count'])
+
+        page = paginator.paginate_queryset(
+            queryset,
+            CursorPagination.Input(cursor=page['next_cursor']),
+        )
+        self.assertEqual([account.id for account in page['results']], ids[10:20])
+
+        last_page = paginator.paginate_queryset(
+            queryset,
+            CursorPagination.Input(cursor=page['next_cursor']),
+        )
+        self.assertEqual([account.id for account in last_page['results']], ids[20:])
+        self.assertIsNone(last_page['next_cursor'])
+
+        page = paginator.paginate_queryset(
+            queryset,
+            CursorPagination.Input(cursor=last_page['prev_cursor']),
+        )
+        self.assertEqual([account.id for account in page['results']], ids[10:20])
+        self.assertIsNotNone(page['prev_cursor'])
+        self.assertIsNotNone(page['next_cursor'])
+
+    def test_cursor_pagination_count_and_default_ordering(self):
+        paginator = CursorPagination(page_size=10)
+        queryset = Account.objects.filter(is_verified=True)
+        ids = list(queryset.order_by('-id').values_list('id', flat=True))
+
+        page = paginator.paginate_queryset(
+            queryset,
+            CursorPagination.Input(count=True),
+        )
+        self.assertEqual(page['count'], 26)
+        self.assertEqual([account.id for account in page['results']], ids[:10])
+
+    def test_cursor_pagination_invalid_cursor(self):
+        paginator = CursorPagination(page_size=10)
+        with self.assertRaises(HttpError):
+            paginator.paginate_queryset(
+                Account.objects.all(),
+                CursorPagination.Input(cursor='invalid'),
+            )
+
+    def walk_pages(self, paginator, queryset):
+        ids = []
+        page = paginator.paginate_queryset(queryset, CursorPagination.Input())
+        ids += [account.id for account in page['results']]
+        while page['next_cursor']:
+            page = paginator.paginate_queryset(
+                queryset,
+                CursorPagination.Input(cursor=page['next_cursor']),
+            )
+            ids += [account.id for account in page['results']]
+
+        back_ids = [account.id for account in page['results']]
+        while page['prev_cursor']:
+            page = paginator.paginate_queryset(
+                queryset,
+                CursorPagination.Input(cursor=page['prev_cursor']),
+            )
+            back_ids = [account.id for account in page['results']] + back_ids
+
+        self.assertEqual(ids, back_ids)
+        return ids
+
+    def test_cursor_pagination_nullable_ordering(self):
+        now = timezone.now()
+        for idx, account in enumerate(Account.objects.filter(is_verified=True)[:12]):
+            account.user.date_inactivation = now - timedelta(days=idx % 4)
+            account.user.save()
+
+        queryset = Account.objects.filter(is_verified=True)
+        for ordering in (
+            ('user__date_inactivation', 'id'),
+            ('-user__date_inactivation', 'id'),
+            ('-user__date_inactivation', '-id'),
+        ):
+            paginator = CursorPagination(ordering=ordering, page_size=4)
+            expected = list(queryset.order_by(*ordering).values_list('id', flat=True))
+            self.assertEqual(len(expected), 26)
+            self.assertEqual(self.walk_pages(paginator, queryset), expected)
+
+    def test_cursor_pagination_tiers(self):
+        queryset = Account.objects.filter(is_verified=True)
+        expected = list(queryset.order_by('-id').values_list('id', flat=True))
+        pivot = expected[9]
+        tiers = [queryset.filter(id__gte=pivot), queryset.filter(id__lt=pivot)]
+        paginator = CursorPagination(ordering=('-id',), page_size=4)
+
+        # The latter tier is only read when the page reaches it.
+        with self.assertNumQueries(1):
+            page = paginator.paginate_queryset(tiers, CursorPagination.Input())
+        self.assertEqual([account.id for account in page['results']], expected[:4])
+
+        page = paginator.paginate_queryset(
+            tiers,
+            CursorPagination.Input(count=True, cursor=page['next_cursor']),
+        )
+        self.assertEqual(page['count'], len(expected))
+        self.assertEqual(self.walk_pages(paginator, tiers), expected)
+
+        with self.assertRaises(HttpError):
+            paginator.paginate_queryset(
+                tiers,
+                CursorPagination.Input(
+                    cursor=CursorPagination.encode_cursor([pivot], tier=2)
+                ),
+            )
+
+    def test_cursor_pagination_expression_ordering(self):
+        queryset = Account.objects.filter(is_verified=True)
+        expected = list(queryset.order_by('-level', 'id').values_list('id', flat=True))
+
+        paginator = CursorPagination(ordering=(F('level').desc(), F('id')), page_size=10)
+        self.assertEqual(paginator.get_ordering(queryset), ['-level', 'id'])
+        self.assertEqual(self.walk_pages(paginator, queryset), expected)
+
+        paginator = CursorPagination(ordering=(F('level').asc(nulls_first=True),))
+        with self.assertRaises(ValueError):
+            paginator.get_ordering(queryset)
+
+        paginator = CursorPagination(ordering=('?',))
+        with self.assertRaises(ValueError):
+            paginator.get_ordering(queryset)
@@ -0,0 +1,45 @@
+from model_bakery import baker
+
+from accounts.tests.mixins import VerifiedAccountsMixin
+from matches.models import Match, MatchPlayer, MatchPlayerStats, MatchTeam, Server
+from matches.tasks import MATCH_RAW_CASCADE
+
+from ..db import chunked_delete
+from . import TestCase
+
+
+class CoreDBTestCase(VerifiedAccountsMixin, TestCase):
+    def create_matches(self, amount: int):
+        server = baker.make(Server)
+        for _ in range(amount):
+            match = baker.make(Match, server=server, status=Match.Status.CANCELLED)
+            team = match.matchteam_set.create(name='team_a', side=1)
+            match.matchteam_set.create(name='team_b', side=2)
+            baker.make(MatchPlayer, team=team, user=self.user_1)
+
+    def test_chunked_delete(self):
+        self.create_matches(5)
+        metrics = chunked_delete(Match.objects.all(), batch_size=2)
+
+        self.assertEqual(metrics['batches'], 3)
+        self.assertEqual(Match.objects.count(), 0)
+        self.assertEqual(MatchTeam.objects.count(), 0)
+        self.assertEqual(MatchPlayer.objects.count(), 0)
+        self.assertEqual(MatchPlayerStats.objects.count(), 0)
+
+    def test_chunked_delete_raw_cascade(self):
+        self.create_matches(5)
+        kept = Match.objects.order_by('id').last()
+        metrics = chunked_delete(
+            Match.objects.exclude(id=kept.id),
+            batch_size=3,
+            raw_cascade=MATCH_RAW_CASCADE,
+        )
+
+        self.assertEqual(metrics['batches'], 2)
+        # 4 matches, each with 2 teams, 1 player and its stats.
+        self.assertEqual(metrics['deleted'], 4 * 5)
+        self.assertEqual(list(Match.objects.all()), [kept])
+        self.assertEqual(MatchTeam.objects.count(), 2)
+        self.assertEqual(MatchPlayer.objects.count(), 1)
+        self.assertEqual(MatchPlayerStats.objects.count(), 1)
@@ -1,3 +1,9 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 from ninja import Schema
 
 from .. import utils
@@ -63,3 +69,18 @@ class CoreUtilsTestCase(TestCase):
             utils.get_full_file_path(file),
             'http://localhost:8000/media/image.jpg',
         )
+
+    def test_json_dumps(self):
+        now = timezone.now()
+        data = {
+            'date': now,
+            'decimal': Decimal('1.50'),
+            'duration': timedelta(minutes=5),
+            'schema': RequestSchema2(),
+            1: 'non str key',
+        }
+        expected = json.dumps(
+            {**data, 'schema': data['schema'].dict()},
+            cls=DjangoJSONEncoder,
+        )
+        self.assertEqual(json.loads(utils.json_dumps(data)), json.loads(expected))
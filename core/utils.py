@@ -3,15 +3,20 @@ import random
 import re
 import string
 from datetime import datetime
-from typing import Union
+from itertools import islice
+from typing import Iterable, Iterator, Union
 from urllib import parse
 
+import orjson
 import redis
 from django.conf import settings
 from django.core import mail
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils.html import strip_tags
+from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
+django_json_encoder = DjangoJSONEncoder()
 
 
 def generate_random_string(length: int = 6, allowed_chars: str = 'all') -> str:
@@ -28,6 +33,15 @@ def generate_random_string(length: int = 6, allowed_chars: str = 'all') -> str:
     return ''.join(random.choice(chars) for _ in range(length))
 
 
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Split `items` into lists of at most `size` items, lazily.
+    """
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
 def redis_client():
     """
     Open a connection with the Redis cache database.
@@ -106,3 +120,26 @@ def is_email(email):
         return True
     else:
         return False
+
+
+def json_default(obj):
+    """
+    Fallback for types orjson doesn't encode natively (eg. Decimal, timedelta,
+    lazy translations and pydantic models). Datetimes are handled here as well,
+    so they keep the same format as Django and django-ninja default encoders.
+    """
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+
+    return django_json_encoder.default(obj)
+
+
+def json_dumps(obj) -> bytes:
+    """
+    Encode `obj` to JSON using orjson.
+    """
+    return orjson.dumps(
+        obj,
+        default=json_default,
+        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+    )
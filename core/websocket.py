@@ -2,7 +2,7 @@ from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext as _
 
-from websocket.utils import ws_send
+from websocket.utils import ws_send, ws_send_many
 
 from .api import schemas
 
@@ -36,6 +36,32 @@ def ws_create_toast(content: str, variant: str = 'info', user_id: int = None):
     return async_to_sync(ws_send)('toasts/create', payload, groups=groups)
 
 
+def ws_create_toasts(toasts: list, variant: str = 'info'):
+    """
+    Sends many toasts at once, each one to its user, concurrently.
+
+    Cases:
+    - Friend requests expired.
+
+    Payload:
+    core.api.schemas.ToastSchema: object
+
+    Actions:
+    - toasts/create
+    """
+    payloads = [
+        (
+            user_id,
+            schemas.ToastSchema.from_orm(
+                {'content': content, 'variant': variant}
+            ).dict(),
+        )
+        for user_id, content in toasts
+    ]
+
+    return async_to_sync(ws_send_many)('toasts/create', payloads)
+
+
 def ws_maintenance(status: str):
     """
     Sends a websocket to all online users so they know that system is about to
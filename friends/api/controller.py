@@ -2,13 +2,13 @@ import logging
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import F, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.translation import gettext as _
 from ninja.errors import HttpError
 
-from accounts.models import Account
+from accounts.models import Account, Presence
 from core.utils import is_email
 from notifications.websocket import ws_new_notification
 
@@ -18,20 +18,45 @@ from . import schemas
 User = get_user_model()
 
 
-def list(user: User) -> dict:
-    online_friends, offline_friends = [], []
+def list_global(user: User, page: int = 1) -> dict:
+    """
+    List a window of the global friend list: online users come first,
+    followed by the most recently logged in ones. Both windows are sliced from
+    the friends queryset, so staff, unverified and inactive users never take
+    room on a page.
+    """
+    page_size = settings.GLOBAL_FRIENDSHIP_PAGE_SIZE
+    offset = (max(page, 1) - 1) * page_size
+    friends = user.account.friends.select_related('user')
+
+    online_ids = Presence.online_ids()
+    online_friends = friends.filter(user_id__in=online_ids).order_by('user_id')
+    online_count = online_friends.count()
+    online_page = online_friends[offset:offset + page_size] if offset < online_count else []
+
+    offline_friends = []
+    remaining = page_size - max(min(online_count - offset, page_size), 0)
+    if remaining > 0:
+        offline_offset = max(offset - online_count, 0)
+        offline_friends = friends.exclude(user_id__in=online_ids).order_by(
+            F('user__last_login').desc(nulls_last=True), 'user_id'
+        )[offline_offset:offline_offset + remaining]
+
+    return {
+        'requests': list_requests(user),
+        'online': schemas.prefetch_friends(online_page),
+        'offline': schemas.prefetch_friends(offline_friends),
+    }
+
 
+def list(user: User, page: int = 1) -> dict:
     if settings.APP_GLOBAL_FRIENDSHIP:
-        friends = Account.objects.filter(
-            user__is_active=True,
-            is_verified=True,
-            user__is_staff=False,
-        ).exclude(id=user.account.id)
-    else:
-        friends = user.account.friends
+        return list_global(user, page)
 
+    online_friends, offline_friends = [], []
+    friends = schemas.prefetch_friends(user.account.friends.select_related('user'))
     for friend in friends:
-        if friend.user.is_online:
+        if friend._friend_prefetch['status'] != User.Status.OFFLINE:
             online_friends.append(friend)
         else:
             offline_friends.append(friend)
@@ -109,8 +134,16 @@ def refuse_request(user: User, friendship_id: int):
 
 
 def list_requests(user: User):
-    sent = models.Friendship.objects.filter(user_from=user, accept_date__isnull=True)
-    received = models.Friendship.objects.filter(user_to=user, accept_date__isnull=True)
+    friendships = models.Friendship.objects.filter(
+        accept_date__isnull=True,
+    ).select_related('user_from__account', 'user_to__account')
+    sent = [friendship for friendship in friendships.filter(user_from=user)]
+    received = [friendship for friendship in friendships.filter(user_to=user)]
+    schemas.prefetch_friends(
+        account
+        for friendship in sent + received
+        for account in (friendship.user_from.account, friendship.user_to.account)
+    )
 
     return {
         'sent': [schemas.FriendshipSchema.from_orm(friendship) for friendship in sent],
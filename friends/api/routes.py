@@ -55,5 +55,5 @@ def friends_refuse(request, friendship_id: int):
 
 @router.get("/", auth=VerifiedRequiredAuth(), response={200: schemas.FriendListSchema})
 @feat_available(feat_name="friends")
-def friends_list(request):
-    return controller.list(request.user)
+def friends_list(request, page: int = 1):
+    return controller.list(request.user, page)
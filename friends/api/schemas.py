@@ -3,13 +3,41 @@ from typing import List
 from django.contrib.auth import get_user_model
 from ninja import ModelSchema, Schema
 
-from accounts.models import Account
+from accounts.models import Account, Presence, SteamUser
+from lobbies.models import Lobby
 
 from .. import models
 
 User = get_user_model()
 
 
+def prefetch_friends(accounts) -> List[Account]:
+    """
+    Precompute what `FriendSchema` needs for all accounts at once (steam users with a
+    pipelined HGETALL, lobbies with a MGET and statuses with a HMGET), so serializing
+    a friend list doesn't cost a few round-trips per friend. Accounts should come with
+    their users already selected.
+    """
+    accounts = list(accounts)
+    user_ids = [account.user_id for account in accounts]
+    steam_users = SteamUser.load_many(user_ids)
+    lobby_ids = Lobby.get_current_ids(user_ids)
+    statuses = Presence.get_many(user_ids)
+
+    for account in accounts:
+        account._friend_prefetch = {
+            'steam_user': steam_users.get(account.user_id),
+            'lobby_id': lobby_ids[account.user_id],
+            'status': statuses[account.user_id],
+        }
+
+    return accounts
+
+
+def get_prefetched(obj, key: str, default=None):
+    return getattr(obj, '_friend_prefetch', {}).get(key, default)
+
+
 class FriendSchema(ModelSchema):
     user_id: int
     steamid: str
@@ -31,24 +59,31 @@ class FriendSchema(ModelSchema):
             'coins',
         ]
 
+    @staticmethod
+    def get_steam_user(obj) -> SteamUser:
+        return get_prefetched(obj, 'steam_user') or obj.user.steam_user
+
     @staticmethod
     def resolve_user_id(obj):
-        return obj.user.id
+        return obj.user_id
 
     @staticmethod
     def resolve_avatar(obj):
-        return obj.avatar_dict
+        return Account.build_avatar_dict(FriendSchema.get_steam_user(obj).avatarhash)
 
     @staticmethod
     def resolve_status(obj):
-        return obj.user.status
+        return get_prefetched(obj, 'status') or obj.user.status
 
     @staticmethod
     def resolve_steam_url(obj):
-        return obj.user.steam_user.profileurl
+        return FriendSchema.get_steam_user(obj).profileurl
 
     @staticmethod
     def resolve_lobby_id(obj):
+        if hasattr(obj, '_friend_prefetch'):
+            return obj._friend_prefetch['lobby_id']
+
         if obj.lobby:
             return obj.lobby.id
         return None
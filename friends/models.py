@@ -1,12 +1,22 @@
+from typing import List
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext as _
+from pydantic import BaseModel
+
+from accounts.models.presence import Presence
+from core.redis import redis_client_instance as cache
 
 User = get_user_model()
 
 
 class Friendship(models.Model):
+    EXPIRE_BATCH_SIZE = 500
+
     user_from = models.ForeignKey(
         User,
         related_name='sent_friend_requests',
@@ -50,3 +60,139 @@ class Friendship(models.Model):
 
     def __str__(self):
         return f'{self.user_from.account.username} and {self.user_to.account.username} friendship'
+
+
+class FriendList(BaseModel):
+    """
+    This class holds the friend graph on Redis cache db, so friends lookups don't need
+    to go through every `Friendship` row. A user friend list is built from the db on
+    first use and then kept in sync by the `Friendship` signals below.
+
+    The Redis db keys from this model are described below:
+
+    [set] __friends:user:[user_id] <(friend_id,...)>
+    Ids from all user friends (accepted friendships only).
+
+    [set] __friends:loaded <(user_id,...)>
+    Users which friend list was already built from the db.
+
+    [set] __friends:status_updates <(user_id,...)>
+    Users which status changed and their friends weren't notified yet. Updates are
+    coalesced over a short window, so a burst of changes goes out as one message.
+
+    [key] __friends:status_updates:scheduled <1>
+    Set while a delivery of the pending status updates is scheduled.
+    """
+
+    user_id: int
+
+    class Config:
+        CACHE_PREFIX: str = '__friends:user:'
+        LOADED_KEY: str = '__friends:loaded'
+        STATUS_UPDATES_KEY: str = '__friends:status_updates'
+        STATUS_UPDATES_WINDOW: float = 0.25  # seconds
+
+    @property
+    def cache_key(self) -> str:
+        return f'{FriendList.Config.CACHE_PREFIX}{self.user_id}'
+
+    @property
+    def ids(self) -> List[int]:
+        """
+        Retrieve the id of all user friends.
+        """
+        self.ensure_loaded()
+        return [int(friend_id) for friend_id in cache.smembers(self.cache_key)]
+
+    @property
+    def online_ids(self) -> List[int]:
+        """
+        Retrieve the id of all online user friends.
+        """
+        self.ensure_loaded()
+        friends_ids = cache.sinter(self.cache_key, Presence.Config.ONLINE_KEY)
+        return [int(friend_id) for friend_id in friends_ids]
+
+    def ensure_loaded(self):
+        if not cache.sismember(FriendList.Config.LOADED_KEY, self.user_id):
+            self.load()
+
+    def load(self):
+        """
+        Build the user friend list from the db.
+        """
+        friendships = Friendship.objects.filter(
+            models.Q(user_from_id=self.user_id) | models.Q(user_to_id=self.user_id),
+            accept_date__isnull=False,
+        ).values_list('user_from_id', 'user_to_id')
+        friends_ids = [
+            user_to_id if user_from_id == self.user_id else user_from_id
+            for user_from_id, user_to_id in friendships
+        ]
+
+        with cache.pipeline() as pipe:
+            pipe.delete(self.cache_key)
+            if friends_ids:
+                pipe.sadd(self.cache_key, *friends_ids)
+            pipe.sadd(FriendList.Config.LOADED_KEY, self.user_id)
+            pipe.execute()
+
+    @staticmethod
+    def queue_status_update(user_id: int) -> bool:
+        """
+        Queue a status update of the user to its friends.
+
+        :return: Whether the caller should schedule the delivery of pending updates,
+        which happens only once per window.
+        """
+        with cache.pipeline() as pipe:
+            pipe.sadd(FriendList.Config.STATUS_UPDATES_KEY, user_id)
+            pipe.set(
+                f'{FriendList.Config.STATUS_UPDATES_KEY}:scheduled',
+                1,
+                px=int(FriendList.Config.STATUS_UPDATES_WINDOW * 1000),
+                nx=True,
+            )
+            _, schedule = pipe.execute()
+
+        return bool(schedule)
+
+    @staticmethod
+    def pop_status_updates() -> List[int]:
+        """
+        Pop all pending status updates. The scheduled flag is cleared beforehand,
+        so updates queued meanwhile schedule a new delivery instead of getting lost.
+        """
+        cache.delete(f'{FriendList.Config.STATUS_UPDATES_KEY}:scheduled')
+        with cache.pipeline() as pipe:
+            pipe.smembers(FriendList.Config.STATUS_UPDATES_KEY)
+            pipe.delete(FriendList.Config.STATUS_UPDATES_KEY)
+            user_ids, _ = pipe.execute()
+
+        return sorted(int(user_id) for user_id in user_ids)
+
+    @staticmethod
+    def add(user_id: int, friend_id: int):
+        with cache.pipeline() as pipe:
+            pipe.sadd(f'{FriendList.Config.CACHE_PREFIX}{user_id}', friend_id)
+            pipe.sadd(f'{FriendList.Config.CACHE_PREFIX}{friend_id}', user_id)
+            pipe.execute()
+
+    @staticmethod
+    def remove(user_id: int, friend_id: int):
+        with cache.pipeline() as pipe:
+            pipe.srem(f'{FriendList.Config.CACHE_PREFIX}{user_id}', friend_id)
+            pipe.srem(f'{FriendList.Config.CACHE_PREFIX}{friend_id}', user_id)
+            pipe.execute()
+
+
+@receiver(post_save, sender=Friendship)
+def friendship_save_signal(sender, instance, created, **kwargs):
+    if instance.accept_date:
+        FriendList.add(instance.user_from_id, instance.user_to_id)
+
+
+@receiver(post_delete, sender=Friendship)
+def friendship_delete_signal(sender, instance, **kwargs):
+    if instance.accept_date:
+        FriendList.remove(instance.user_from_id, instance.user_to_id)
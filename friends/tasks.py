@@ -6,8 +6,7 @@ from django.conf import settings
 from django.utils.translation import activate, gettext as _
 from django.utils import timezone
 
-from core.redis import redis_client_instance as cache
-from core.websocket import ws_create_toast
+from core.websocket import ws_create_toasts
 from notifications.websocket import ws_new_notification
 
 from . import models, websocket
@@ -28,32 +27,47 @@ def notify_friends_about_signup(user_id: int, lang: str = None):
         ws_new_notification(notification)
 
 
-@shared_task
-def add_user_to_friends_friendlist(user_id: int):
-    user = User.objects.get(pk=user_id)
-    for friend in user.account.get_online_friends():
-        cache.sadd(f"__friendlist:user:{friend.user.id}", user.id)
-
-
 @shared_task
 def expire_friend_request():
     max_age = timezone.now() - timedelta(hours=settings.FRIEND_REQUEST_MAX_AGE)
-    expiring_requests = models.Friendship.objects.filter(
-        accept_date__isnull=True,
-        create_date__lte=max_age,
+    expiring_requests = (
+        models.Friendship.objects.filter(
+            accept_date__isnull=True,
+            create_date__lte=max_age,
+        )
+        .select_related('user_from__account', 'user_to__account')
+        .order_by('id')
     )
 
-    for request in expiring_requests:
-        ws_create_toast(
-            _(
-                f"The friend request from {request.user_from.account.username} has expired."
-            ),
-            user_id=request.user_to.id,
-        )
-        ws_create_toast(
-            _(f"The friend request to {request.user_to.account.username} has expired."),
-            user_id=request.user_from.id,
-        )
-        websocket.ws_friend_request_expire(request)
+    while True:
+        requests = list(expiring_requests[: models.Friendship.EXPIRE_BATCH_SIZE])
+        if not requests:
+            break
+
+        toasts = []
+        for request in requests:
+            from_username = request.user_from.account.username
+            to_username = request.user_to.account.username
+            toasts += [
+                (
+                    request.user_to_id,
+                    _("The friend request from {} has expired.").format(from_username),
+                ),
+                (
+                    request.user_from_id,
+                    _("The friend request to {} has expired.").format(to_username),
+                ),
+            ]
 
-    expiring_requests.delete()
+        ws_create_toasts(toasts)
+        websocket.ws_friend_request_expire(requests)
+        models.Friendship.objects.filter(
+            id__in=[request.id for request in requests]
+        ).delete()
+
+
+@shared_task
+def send_friend_status_updates():
+    user_ids = models.FriendList.pop_status_updates()
+    if user_ids:
+        websocket.ws_friends_update_many(user_ids)
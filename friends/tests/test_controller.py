@@ -0,0 +1,46 @@
+from django.test import override_settings
+
+from accounts.tests.mixins import VerifiedAccountsMixin
+from core.tests import TestCase
+from friends.api import controller
+
+
+class FriendsControllerTestCase(VerifiedAccountsMixin, TestCase):
+    @override_settings(APP_GLOBAL_FRIENDSHIP=True, GLOBAL_FRIENDSHIP_PAGE_SIZE=3)
+    def test_list_global(self):
+        self.user_1.add_session()
+        self.user_3.add_session()
+        self.user_5.add_session()
+
+        results = controller.list(self.user_1)
+        self.assertEqual(
+            list(results['online']),
+            [self.user_3.account, self.user_5.account],
+        )
+        self.assertEqual(list(results['offline']), [self.user_2.account])
+
+        results = controller.list(self.user_1, page=2)
+        self.assertEqual(list(results['online']), [])
+        self.assertEqual(
+            list(results['offline']),
+            [self.user_4.account, self.user_6.account, self.user_7.account],
+        )
+
+    @override_settings(APP_GLOBAL_FRIENDSHIP=True, GLOBAL_FRIENDSHIP_PAGE_SIZE=3)
+    def test_list_global_online_staff(self):
+        self.user_2.is_staff = True
+        self.user_2.save()
+        for user in [self.user_1, self.user_2, self.user_3, self.user_4, self.user_5]:
+            user.add_session()
+
+        results = controller.list(self.user_1)
+        self.assertEqual(
+            list(results['online']),
+            [self.user_3.account, self.user_4.account, self.user_5.account],
+        )
+        self.assertEqual(list(results['offline']), [])
+
+        results = controller.list(self.user_1, page=2)
+        self.assertEqual(list(results['online']), [])
+        self.assertNotIn(self.user_2.account, list(results['offline']))
+        self.assertEqual(len(results['offline']), 3)
@@ -0,0 +1,78 @@
+from django.utils import timezone
+
+from accounts.tests.mixins import VerifiedAccountsMixin
+from core.tests import TestCase, cache
+from friends.models import FriendList, Friendship
+
+
+class FriendsFriendListModelTestCase(VerifiedAccountsMixin, TestCase):
+    def test_ids(self):
+        Friendship.objects.create(
+            user_from=self.user_1,
+            user_to=self.user_2,
+            accept_date=timezone.now(),
+        )
+        Friendship.objects.create(user_from=self.user_3, user_to=self.user_1)
+
+        self.assertEqual(FriendList(user_id=self.user_1.id).ids, [self.user_2.id])
+        self.assertEqual(FriendList(user_id=self.user_2.id).ids, [self.user_1.id])
+        self.assertEqual(FriendList(user_id=self.user_3.id).ids, [])
+
+    def test_load(self):
+        Friendship.objects.create(
+            user_from=self.user_1,
+            user_to=self.user_2,
+            accept_date=timezone.now(),
+        )
+        cache.flushdb()
+
+        self.assertEqual(FriendList(user_id=self.user_1.id).ids, [self.user_2.id])
+
+    def test_accept_and_delete(self):
+        friendship = Friendship.objects.create(
+            user_from=self.user_1,
+            user_to=self.user_2,
+        )
+        self.assertEqual(FriendList(user_id=self.user_1.id).ids, [])
+
+        friendship.accept_date = timezone.now()
+        friendship.save()
+        self.assertEqual(FriendList(user_id=self.user_1.id).ids, [self.user_2.id])
+
+        friendship.delete()
+        self.assertEqual(FriendList(user_id=self.user_1.id).ids, [])
+        self.assertEqual(FriendList(user_id=self.user_2.id).ids, [])
+
+    def test_online_ids(self):
+        Friendship.objects.create(
+            user_from=self.user_1,
+            user_to=self.user_2,
+            accept_date=timezone.now(),
+        )
+        Friendship.objects.create(
+            user_from=self.user_1,
+            user_to=self.user_3,
+            accept_date=timezone.now(),
+        )
+        self.user_2.add_session()
+
+        self.assertEqual(
+            FriendList(user_id=self.user_1.id).online_ids,
+            [self.user_2.id],
+        )
+        self.assertEqual(
+            self.user_1.account.get_online_friends(),
+            [self.user_2.account],
+        )
+
+    def test_status_updates(self):
+        self.assertTrue(FriendList.queue_status_update(self.user_1.id))
+        self.assertFalse(FriendList.queue_status_update(self.user_1.id))
+        self.assertFalse(FriendList.queue_status_update(self.user_2.id))
+
+        self.assertEqual(
+            FriendList.pop_status_updates(),
+            [self.user_1.id, self.user_2.id],
+        )
+        self.assertEqual(FriendList.pop_status_updates(), [])
+        self.assertTrue(FriendList.queue_status_update(self.user_1.id))
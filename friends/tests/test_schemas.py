@@ -1,8 +1,10 @@
 from django.test import override_settings
 
+from accounts.models import Account
 from accounts.tests.mixins import VerifiedAccountsMixin
 from core.tests import TestCase
-from friends.api.schemas import FriendListSchema, FriendSchema
+from friends.api.schemas import FriendListSchema, FriendSchema, prefetch_friends
+from lobbies.models import Lobby
 
 
 class FriendsSchemasTestCase(VerifiedAccountsMixin, TestCase):
@@ -23,6 +25,25 @@ class FriendsSchemasTestCase(VerifiedAccountsMixin, TestCase):
         }
         self.assertEqual(payload, expected_payload)
 
+    def test_friend_schema_prefetched(self):
+        self.user_1.add_session()
+        self.user_2.add_session()
+        Lobby.create(self.user_2.id)
+        accounts = [self.user_1.account, self.user_2.account, self.user_3.account]
+        expected_payloads = [
+            FriendSchema.from_orm(account).dict() for account in accounts
+        ]
+
+        accounts = prefetch_friends(
+            Account.objects.filter(
+                user_id__in=[account.user_id for account in accounts]
+            ).select_related('user').order_by('user_id')
+        )
+        with self.assertNumQueries(0):
+            payloads = [FriendSchema.from_orm(account).dict() for account in accounts]
+
+        self.assertEqual(payloads, expected_payloads)
+
     def test_friend_list_schema(self):
         payload = FriendListSchema.from_orm(
             {
@@ -0,0 +1,91 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import override_settings
+from django.utils import timezone
+
+from accounts.tests.mixins import VerifiedAccountsMixin
+from core.tests import TestCase
+from friends import tasks
+from friends.models import FriendList, Friendship
+
+
+class FriendsTasksTestCase(VerifiedAccountsMixin, TestCase):
+    @mock.patch('friends.websocket.ws_send_many')
+    def test_send_friend_status_updates(self, mock_ws_send_many):
+        for friend in [self.user_2, self.user_3]:
+            Friendship.objects.create(
+                user_from=self.user_1,
+                user_to=friend,
+                accept_date=timezone.now(),
+            )
+        self.user_1.add_session()
+        self.user_2.add_session()
+        self.user_3.add_session()
+
+        FriendList.queue_status_update(self.user_2.id)
+        FriendList.queue_status_update(self.user_3.id)
+        FriendList.queue_status_update(self.user_2.id)
+        tasks.send_friend_status_updates()
+
+        mock_ws_send_many.assert_called_once()
+        action, payloads = mock_ws_send_many.call_args.args
+        self.assertEqual(action, 'friends/update_many')
+        self.assertEqual(
+            [payload['user_id'] for payload in payloads[self.user_1.id]],
+            [self.user_2.id, self.user_3.id],
+        )
+        self.assertNotIn(self.user_2.id, payloads)
+
+    @override_settings(APP_GLOBAL_FRIENDSHIP=True)
+    @mock.patch('friends.websocket.ws_send_many')
+    @mock.patch('friends.websocket.ws_send')
+    def test_send_friend_status_updates_global(self, mock_ws_send, mock_ws_send_many):
+        FriendList.queue_status_update(self.user_2.id)
+        FriendList.queue_status_update(self.user_3.id)
+        tasks.send_friend_status_updates()
+
+        mock_ws_send.assert_called_once()
+        action, payloads = mock_ws_send.call_args.args
+        self.assertEqual(action, 'friends/update_many')
+        self.assertEqual(mock_ws_send.call_args.kwargs['groups'], ['verified'])
+        self.assertCountEqual(
+            mock_ws_send.call_args.kwargs['exclude'],
+            [self.user_2.id, self.user_3.id],
+        )
+        self.assertCountEqual(
+            [payload['user_id'] for payload in payloads],
+            [self.user_2.id, self.user_3.id],
+        )
+
+        action, user_payloads = mock_ws_send_many.call_args.args
+        user_payloads = dict(user_payloads)
+        self.assertEqual(
+            [payload['user_id'] for payload in user_payloads[self.user_2.id]],
+            [self.user_3.id],
+        )
+        self.assertEqual(
+            [payload['user_id'] for payload in user_payloads[self.user_3.id]],
+            [self.user_2.id],
+        )
+
+    @override_settings(FRIEND_REQUEST_MAX_AGE=1)
+    @mock.patch('friends.tasks.websocket.ws_friend_request_expire')
+    @mock.patch('friends.tasks.ws_create_toasts')
+    def test_expire_friend_request(self, mock_toasts, mock_expire):
+        expiring = Friendship.objects.create(user_from=self.user_1, user_to=self.user_2)
+        Friendship.objects.filter(id=expiring.id).update(
+            create_date=timezone.now() - timedelta(hours=2)
+        )
+        pending = Friendship.objects.create(user_from=self.user_1, user_to=self.user_3)
+
+        with mock.patch.object(Friendship, 'EXPIRE_BATCH_SIZE', 1):
+            tasks.expire_friend_request()
+
+        mock_toasts.assert_called_once()
+        self.assertEqual(
+            [user_id for user_id, _ in mock_toasts.call_args.args[0]],
+            [self.user_2.id, self.user_1.id],
+        )
+        mock_expire.assert_called_once_with([expiring])
+        self.assertEqual(list(Friendship.objects.all()), [pending])
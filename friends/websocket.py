@@ -1,7 +1,13 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List
+
 from asgiref.sync import async_to_sync
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
-from websocket.utils import ws_send
+from accounts.models import Account
+from websocket.utils import ws_send, ws_send_many
 
 from . import models
 from .api import schemas
@@ -34,6 +40,31 @@ def ws_friends_add(user: User, friend: User):
     return results
 
 
+def ws_friends_add_global(user: User):
+    """
+    Triggered when a user joins the global friend list (APP_GLOBAL_FRIENDSHIP on).
+    It goes out as a single broadcast to the verified group (players only, no staff)
+    instead of one message per user. The new user doesn't get it.
+
+    Cases:
+    - User verifies its account.
+
+    Payload:
+    friends.api.schemas.FriendSchema: object
+
+    Actions:
+    - friends/create
+    """
+
+    payload = schemas.FriendSchema.from_orm(user.account).dict()
+    return async_to_sync(ws_send)(
+        "friends/create",
+        payload,
+        groups=["verified"],
+        exclude=[user.id],
+    )
+
+
 def ws_friend_request_refuse(friendship: models.Friendship):
     """
     Triggered when a friend request is refused.
@@ -107,9 +138,9 @@ def ws_friend_remove(user: User, friend: User):
     return results
 
 
-def ws_friend_request_expire(friendship: models.Friendship):
+def ws_friend_request_expire(friendships: List[models.Friendship]):
     """
-    Triggered when a friend request expires.
+    Triggered when friend requests expire. All events are sent concurrently.
 
     Cases:
     - User does not accept the request in time.
@@ -121,17 +152,71 @@ def ws_friend_request_expire(friendship: models.Friendship):
     - friends/request/expire
     """
 
-    results = [
-        async_to_sync(ws_send)(
-            "friends/request/expire",
-            {"user_id": friendship.user_from.id},
-            groups=[friendship.user_to.id],
+    payloads = []
+    for friendship in friendships:
+        payloads.append((friendship.user_to_id, {"user_id": friendship.user_from_id}))
+        payloads.append((friendship.user_from_id, {"user_id": friendship.user_to_id}))
+
+    return async_to_sync(ws_send_many)("friends/request/expire", payloads)
+
+
+async def _send_global_updates(payloads: Dict[int, dict]):
+    """
+    The verified group gets all updates, except for the users that changed state,
+    so nobody gets its own status as a friend update. Those users get the other
+    updates on their own groups.
+    """
+    user_payloads = [
+        (user_id, [payload for key, payload in payloads.items() if key != user_id])
+        for user_id in payloads
+    ]
+    return await asyncio.gather(
+        ws_send(
+            "friends/update_many",
+            [*payloads.values()],
+            groups=["verified"],
+            exclude=[*payloads],
         ),
-        async_to_sync(ws_send)(
-            "friends/request/expire",
-            {"user_id": friendship.user_to.id},
-            groups=[friendship.user_from.id],
+        ws_send_many(
+            "friends/update_many",
+            [(user_id, updates) for user_id, updates in user_payloads if updates],
         ),
-    ]
+    )
 
-    return results
+
+def ws_friends_update_many(user_ids: List[int]):
+    """
+    Delivers coalesced status updates. Each online friend gets a single message
+    with the updates from all its friends that changed state in the last window.
+    With APP_GLOBAL_FRIENDSHIP on, they go out as one broadcast to the verified group,
+    and users that changed state get the updates from everyone but themselves.
+
+    Cases:
+    - User friends changed their state (see `ws_update_status_on_friendlist`).
+
+    Payload:
+    friends.api.schemas.FriendSchema: list
+
+    Actions:
+    - friends/update_many
+    """
+
+    accounts = schemas.prefetch_friends(
+        Account.objects.filter(user_id__in=user_ids).select_related('user')
+    )
+    payloads = {
+        account.user_id: schemas.FriendSchema.from_orm(account).dict()
+        for account in accounts
+    }
+    if not payloads:
+        return []
+
+    if settings.APP_GLOBAL_FRIENDSHIP:
+        return async_to_sync(_send_global_updates)(payloads)
+
+    payloads_by_friend = defaultdict(list)
+    for user_id, payload in payloads.items():
+        for friend_id in models.FriendList(user_id=user_id).online_ids:
+            payloads_by_friend[friend_id].append(payload)
+
+    return async_to_sync(ws_send_many)("friends/update_many", payloads_by_friend)
@@ -1,21 +1,96 @@
 from typing import List, Optional, Tuple
 
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 from django.utils.translation import gettext as _
 from ninja import ModelSchema, Schema
 from pydantic import root_validator, validator
 
-from accounts.models import Account
+from accounts.models import Account, Presence, SteamUser
 from core.utils import get_full_file_path
 from matches.api.schemas import MapSchema
-from matches.models import Map
-from store.models import Item
+from matches.models import ArchivedPlayerSummary, Map, MapCatalog, Match, MatchPlayer
+from store.models import Item, UserItem
 
 from ..models import Lobby, LobbyInvite
 
 User = get_user_model()
 
 
+def prefetch_lobby_players(accounts) -> List[Account]:
+    """
+    Precompute what `LobbyPlayerSchema` needs for all accounts at once (steam users,
+    statuses, active cards and matches played count), so serializing a lobby doesn't
+    cost a few queries per player. Accounts should come with their users selected.
+    """
+    accounts = list(accounts)
+    user_ids = [account.user_id for account in accounts]
+    steam_users = SteamUser.load_many(user_ids)
+    statuses = Presence.get_many(user_ids)
+
+    cards = UserItem.objects.filter(
+        user_id__in=user_ids,
+        item__item_type=Item.ItemType.DECORATIVE,
+        item__subtype=Item.SubType.CARD,
+        in_use=True,
+    ).select_related('item')
+    cards = {card.user_id: card for card in cards}
+
+    matches_played = (
+        MatchPlayer.objects.filter(
+            user_id__in=user_ids,
+            team__match__status=Match.Status.FINISHED,
+        )
+        .values('user_id')
+        .annotate(count=Count('team__match', distinct=True))
+    )
+    matches_played = {item['user_id']: item['count'] for item in matches_played}
+    archived = ArchivedPlayerSummary.objects.filter(user_id__in=user_ids).values_list(
+        'user_id', 'matches_played'
+    )
+    for user_id, count in archived:
+        matches_played[user_id] = matches_played.get(user_id, 0) + count
+
+    for account in accounts:
+        card = cards.get(account.user_id)
+        account._lobby_player_prefetch = {
+            'steam_user': steam_users.get(account.user_id),
+            'status': statuses[account.user_id],
+            'card': get_full_file_path(card.item.decorative_image) if card else None,
+            'matches_played': matches_played.get(account.user_id, 0),
+        }
+
+    return accounts
+
+
+def get_prefetched(obj, key: str, default=None):
+    return getattr(obj, '_lobby_player_prefetch', {}).get(key, default)
+
+
+class HydratedLobby:
+    """
+    Lobby wrapper used while serializing a `LobbySchema`, that reads the players ids
+    and loads all member accounts once, so the players and each side lists are
+    derived from the same result.
+    """
+
+    def __init__(self, lobby: Lobby):
+        self._lobby = lobby
+        self.players_ids = lobby.players_ids
+        accounts = prefetch_lobby_players(
+            Account.objects.filter(user__id__in=self.players_ids).select_related(
+                'user'
+            )
+        )
+        self.accounts = {account.user_id: account for account in accounts}
+
+    def __getattr__(self, name):
+        return getattr(self._lobby, name)
+
+    def get_accounts(self, user_ids: List[int]) -> List[Account]:
+        return [self.accounts[id] for id in user_ids if id in self.accounts]
+
+
 class LobbyPlayerSchema(ModelSchema):
     user_id: int
     avatar: dict
@@ -34,12 +109,21 @@ class LobbyPlayerSchema(ModelSchema):
     def resolve_user_id(obj):
         return obj.user.id
 
+    @staticmethod
+    def get_steam_user(obj) -> SteamUser:
+        return get_prefetched(obj, 'steam_user') or obj.user.steam_user
+
     @staticmethod
     def resolve_avatar(obj):
-        return obj.avatar_dict
+        return Account.build_avatar_dict(
+            LobbyPlayerSchema.get_steam_user(obj).avatarhash
+        )
 
     @staticmethod
     def resolve_matches_played(obj):
+        if hasattr(obj, '_lobby_player_prefetch'):
+            return obj._lobby_player_prefetch['matches_played']
+
         return obj.get_matches_played_count()
 
     @staticmethod
@@ -48,14 +132,17 @@ class LobbyPlayerSchema(ModelSchema):
 
     @staticmethod
     def resolve_steam_url(obj):
-        return obj.user.steam_user.profileurl
+        return LobbyPlayerSchema.get_steam_user(obj).profileurl
 
     @staticmethod
     def resolve_status(obj):
-        return obj.user.status
+        return get_prefetched(obj, 'status') or obj.user.status
 
     @staticmethod
     def resolve_card(obj):
+        if hasattr(obj, '_lobby_player_prefetch'):
+            return obj._lobby_player_prefetch['card']
+
         active_card = obj.user.useritem_set.filter(
             item__item_type=Item.ItemType.DECORATIVE,
             item__subtype=Item.SubType.CARD,
@@ -67,7 +154,7 @@ class LobbyPlayerSchema(ModelSchema):
 
     @staticmethod
     def resolve_friends_ids(obj):
-        return [friend.user.id for friend in obj.friends]
+        return obj.friends_ids
 
 
 class LobbySchema(Schema):
@@ -95,30 +182,37 @@ class LobbySchema(Schema):
     class Config:
         model = Lobby
 
+    @classmethod
+    def from_orm(cls, obj, **kwargs):
+        if isinstance(obj, Lobby):
+            obj = HydratedLobby(obj)
+
+        return super().from_orm(obj, **kwargs)
+
     @staticmethod
     def resolve_queue(obj):
         return obj.queue.isoformat() if obj.queue else None
 
     @staticmethod
     def resolve_players(obj):
-        return Account.objects.filter(user__id__in=obj.players_ids)
+        return obj.get_accounts(obj.players_ids)
 
     @staticmethod
     def resolve_def_players(obj):
-        return Account.objects.filter(user__id__in=obj.def_players_ids)
+        return obj.get_accounts(obj.def_players_ids)
 
     @staticmethod
     def resolve_atk_players(obj):
-        return Account.objects.filter(user__id__in=obj.atk_players_ids)
+        return obj.get_accounts(obj.atk_players_ids)
 
     @staticmethod
     def resolve_spec_players(obj):
-        return Account.objects.filter(user__id__in=obj.spec_players_ids)
+        return obj.get_accounts(obj.spec_players_ids)
 
     @staticmethod
     def resolve_map_choices(obj):
         if obj.mode == Lobby.ModeChoices.CUSTOM:
-            return Map.objects.filter(map_type=obj.match_type)
+            return MapCatalog.filter(map_type=obj.match_type)
 
     @staticmethod
     def resolve_match_type_choices(obj):
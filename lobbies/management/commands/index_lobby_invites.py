@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from lobbies.models import LobbyInvite
+
+
+class Command(BaseCommand):
+    help = "Index existing lobby invites by sender and recipient (run once on deploy)."
+
+    def handle(self, *args, **options):
+        count = LobbyInvite.index_all()
+        self.stdout.write(f"{count} lobby invites indexed.")
@@ -20,6 +20,14 @@ class LobbyInvite(BaseModel):
     the from_user_id and the to_user_id in a set of lobby invites list:
 
     [zset] __mm:lobby:[lobby_id]:invites <from_player_id:to_player_id, timezone>
+
+    Invites are also indexed by sender and recipient, so looking up the invites of
+    a user doesn't scan all lobbies. The lobby zsets are the source of truth: index
+    entries are checked against them when read and stale ones are dropped. Index keys
+    expire `INDEX_TTL` seconds after the user last sent or got an invite.
+
+    [zset] __mm:invites:from:[from_player_id] <lobby_id:from_id:to_id, timezone>
+    [zset] __mm:invites:to:[to_player_id] <lobby_id:from_id:to_id, timezone>
     """
 
     from_id: int
@@ -28,6 +36,8 @@ class LobbyInvite(BaseModel):
 
     class Config:
         CACHE_PREFIX: str = '__mm:lobby'
+        INDEX_PREFIX: str = '__mm:invites'
+        INDEX_TTL: int = 60 * 60 * 24
 
     @property
     def id(self):
@@ -85,29 +95,104 @@ class LobbyInvite(BaseModel):
         return invites
 
     @staticmethod
-    def get_by_to_user_id(to_user_id: int) -> List[LobbyInvite]:
-        all_invites = LobbyInvite.get_all()
-        to_invites = []
-        for invite in all_invites:
-            if to_user_id == invite.to_id:
-                to_invites.append(invite)
+    def get_index_keys(from_id: int, to_id: int) -> List[str]:
+        return [
+            f'{LobbyInvite.Config.INDEX_PREFIX}:from:{from_id}',
+            f'{LobbyInvite.Config.INDEX_PREFIX}:to:{to_id}',
+        ]
 
-        return to_invites
+    @staticmethod
+    def index(pipe, lobby_id: int, invite_id: str, timestamp: float):
+        """
+        Add an invite to its sender and recipient indexes, on the given pipeline.
+        """
+        from_id, to_id = invite_id.split(':')
+        for key in LobbyInvite.get_index_keys(from_id, to_id):
+            pipe.zadd(key, {f'{lobby_id}:{invite_id}': timestamp})
+            pipe.expire(key, LobbyInvite.Config.INDEX_TTL)
 
     @staticmethod
-    def get_by_from_user_id(from_user_id: int) -> List[LobbyInvite]:
-        all_invites = LobbyInvite.get_all()
-        from_invites = []
-        for invite in all_invites:
-            if from_user_id == invite.from_id:
-                from_invites.append(invite)
+    def index_all() -> int:
+        """
+        Index every existing invite, eg. the ones created before the indexes existed.
+        This scans all lobbies, so it's meant to run once on deploy
+        (see the `index_lobby_invites` command).
 
-        return from_invites
+        :return: How many invites were indexed.
+        """
+        keys = list(cache.scan_keys(f'{LobbyInvite.Config.CACHE_PREFIX}:*:invites'))
+        if not keys:
+            return 0
+
+        with cache.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.zrange(key, 0, -1, withscores=True)
+            results = pipe.execute()
+
+        count = 0
+        with cache.pipeline(transaction=False) as pipe:
+            for key, lobby_invites in zip(keys, results):
+                lobby_id = key.split(':')[2]
+                for invite_id, timestamp in lobby_invites:
+                    LobbyInvite.index(pipe, lobby_id, invite_id, timestamp)
+                    count += 1
+            pipe.execute()
+
+        return count
+
+    @staticmethod
+    def unindex(pipe, lobby_id: int, invite_id: str):
+        """
+        Remove an invite from its sender and recipient indexes, on the given pipeline.
+        """
+        from_id, to_id = invite_id.split(':')
+        for key in LobbyInvite.get_index_keys(from_id, to_id):
+            pipe.zrem(key, f'{lobby_id}:{invite_id}')
+
+    @staticmethod
+    def get_indexed(index_key: str) -> List[LobbyInvite]:
+        """
+        Load the invites from an index, checking them against the lobbies invites
+        in a single pipeline and dropping the stale entries.
+        """
+        entries = cache.zrange(index_key, 0, -1)
+        if not entries:
+            return []
+
+        invites = []
+        for entry in entries:
+            lobby_id, from_id, to_id = entry.split(':')
+            invites.append(
+                LobbyInvite(from_id=int(from_id), to_id=int(to_id), lobby_id=lobby_id)
+            )
+
+        with cache.pipeline(transaction=False) as pipe:
+            for invite in invites:
+                pipe.zscore(invite.cache_key, invite.id)
+            scores = pipe.execute()
+
+        stale = [entry for entry, score in zip(entries, scores) if score is None]
+        if stale:
+            cache.zrem(index_key, *stale)
+
+        return [invite for invite, score in zip(invites, scores) if score is not None]
+
+    @staticmethod
+    def get_by_to_user_id(to_user_id: int) -> List[LobbyInvite]:
+        return LobbyInvite.get_indexed(
+            f'{LobbyInvite.Config.INDEX_PREFIX}:to:{to_user_id}'
+        )
+
+    @staticmethod
+    def get_by_from_user_id(from_user_id: int) -> List[LobbyInvite]:
+        return LobbyInvite.get_indexed(
+            f'{LobbyInvite.Config.INDEX_PREFIX}:from:{from_user_id}'
+        )
 
     @staticmethod
     def get_by_id(invite_id: str) -> LobbyInvite:
-        all_invites = LobbyInvite.get_all()
-        for invite in all_invites:
+        from_id = invite_id.split(':')[0]
+        for invite in LobbyInvite.get_by_from_user_id(from_id):
             if invite_id == invite.id:
                 return invite
 
@@ -127,6 +212,7 @@ class LobbyInvite(BaseModel):
 
         def transaction_operations(pipe, pre_result):
             pipe.zrem(f'__mm:lobby:{invite.lobby_id}:invites', invite.id)
+            LobbyInvite.unindex(pipe, invite.lobby_id, invite.id)
 
         cache.protected_handler(
             transaction_operations,
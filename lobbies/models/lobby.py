@@ -9,9 +9,10 @@ from django.utils import timezone
 from django.utils.translation import gettext as _
 from pydantic import BaseModel
 
+from accounts.models.presence import Presence
 from core.redis import redis_client_instance as cache
 from core.utils import str_to_timezone
-from matches.models import Map
+from matches.models import Map, MapCatalog
 
 from .invite import LobbyInvite
 from .player import PlayerRestriction
@@ -298,6 +299,22 @@ class Lobby(BaseModel):
             return None
         return Lobby(owner_id=lobby_id)
 
+    @staticmethod
+    def get_current_ids(player_ids: list) -> dict:
+        """
+        Get the current lobby id of all given players with a single MGET.
+        """
+        if not player_ids:
+            return {}
+
+        lobby_ids = cache.mget(
+            [f"{Lobby.Config.CACHE_PREFIX}:{player_id}" for player_id in player_ids]
+        )
+        return {
+            player_id: int(lobby_id) if lobby_id else None
+            for player_id, lobby_id in zip(player_ids, lobby_ids)
+        }
+
     @staticmethod
     def create(owner_id: int) -> Lobby:
         """
@@ -415,6 +432,7 @@ class Lobby(BaseModel):
                 if invite:
                     logging.info(f"[lobby_move] invite: {invite.id}")
                     pipe.zrem(f"{to_lobby.cache_key}:invites", invite.id)
+                    LobbyInvite.unindex(pipe, to_lobby.id, invite.id)
 
             if len(from_lobby.non_owners_ids) > 0 and from_lobby.owner_id == player_id:
                 new_owner_id = min(from_lobby.non_owners_ids)
@@ -461,7 +479,8 @@ class Lobby(BaseModel):
                     invite = new_lobby.get_invite_by_to_player_id(other_player_id)
                     if invite:
                         logging.info(f"[lobby_move] invite: {invite.id}")
-                        pipe.zrem(f"{new_lobby.cache_key}:invites", invite)
+                        pipe.zrem(f"{new_lobby.cache_key}:invites", invite.id)
+                        LobbyInvite.unindex(pipe, new_lobby.id, invite.id)
 
                     if new_lobby.mode == Lobby.ModeChoices.CUSTOM:
                         new_lobby.__move_player_to_custom_side(
@@ -477,6 +496,7 @@ class Lobby(BaseModel):
                 logging.info(f"[lobby_move] invites {invites_to_player}")
                 for invite in invites_to_player:
                     pipe.zrem(f"__mm:lobby:{invite.lobby_id}:invites", invite.id)
+                    LobbyInvite.unindex(pipe, invite.lobby_id, invite.id)
 
             if from_lobby.mode == Lobby.ModeChoices.CUSTOM:
                 if player_id != from_lobby.owner_id:
@@ -509,14 +529,12 @@ class Lobby(BaseModel):
             status = User.Status.TEAMING
         else:
             status = User.Status.ONLINE
-        User.objects.filter(id__in=to_lobby.players_ids).update(status=status)
+        Presence.set_many(to_lobby.players_ids, status)
         if to_lobby.players_ids:
             logging.info(f"[lobby_move] to_lobby: {to_lobby.players_ids} -> {status}")
 
         if from_lobby.players_count <= 1:
-            User.objects.filter(id__in=from_lobby.players_ids).update(
-                status=User.Status.ONLINE
-            )
+            Presence.set_many(from_lobby.players_ids, User.Status.ONLINE)
             if from_lobby.players_count > 0:
                 logging.info(
                     f"[lobby_move] from_lobby: {from_lobby.players_ids} -> online"
@@ -524,9 +542,7 @@ class Lobby(BaseModel):
 
         if remnant_lobby:
             if remnant_lobby.players_count <= 1:
-                User.objects.filter(id__in=remnant_lobby.players_ids).update(
-                    status=User.Status.ONLINE
-                )
+                Presence.set_many(remnant_lobby.players_ids, User.Status.ONLINE)
                 if remnant_lobby.players_count > 0:
                     logging.info(
                         f"[lobby_move] remnant_lobby: {remnant_lobby.players_ids} -> online"
@@ -603,10 +619,10 @@ class Lobby(BaseModel):
             if not invited.is_online:
                 raise LobbyException(_("Offline user."))
 
-            pipe.zadd(
-                f"{self.cache_key}:invites",
-                {f"{from_player_id}:{to_player_id}": timezone.now().timestamp()},
-            )
+            invite_id = f"{from_player_id}:{to_player_id}"
+            timestamp = timezone.now().timestamp()
+            pipe.zadd(f"{self.cache_key}:invites", {invite_id: timestamp})
+            LobbyInvite.index(pipe, self.id, invite_id, timestamp)
 
         cache.protected_handler(
             transaction_operations,
@@ -646,6 +662,7 @@ class Lobby(BaseModel):
 
         def transaction_operations(pipe, pre_result):
             pipe.zrem(f"{self.cache_key}:invites", invite_id)
+            LobbyInvite.unindex(pipe, self.id, invite_id)
 
         cache.protected_handler(transaction_operations, f"{self.cache_key}:invites")
 
@@ -672,7 +689,7 @@ class Lobby(BaseModel):
             f"{self.cache_key}:invites",
         )
 
-        User.objects.filter(id__in=self.players_ids).update(status=User.Status.QUEUED)
+        Presence.set_many(self.players_ids, User.Status.QUEUED)
 
     def cancel_queue(self):
         """
@@ -680,13 +697,9 @@ class Lobby(BaseModel):
         """
         cache.delete(f"{self.cache_key}:queue")
         if self.players_count > 1:
-            User.objects.filter(id__in=self.players_ids).update(
-                status=User.Status.TEAMING
-            )
+            Presence.set_many(self.players_ids, User.Status.TEAMING)
         else:
-            User.objects.filter(id__in=self.players_ids).update(
-                status=User.Status.ONLINE
-            )
+            Presence.set_many(self.players_ids, User.Status.ONLINE)
 
     def set_public(self):
         """
@@ -776,15 +789,7 @@ class Lobby(BaseModel):
         if mode == Lobby.ModeChoices.CUSTOM:
             self.__move_comp_players_to_custom_sides()
             cache.set(f"{self.cache_key}:match_type", Map.MapTypeChoices.DEFAULT)
-            cache.set(
-                f"{self.cache_key}:map_id",
-                Map.objects.filter(map_type=self.match_type)
-                .values_list(
-                    "id",
-                    flat=True,
-                )
-                .first(),
-            )
+            self.__set_default_map_id(Map.MapTypeChoices.DEFAULT)
         else:
             self.__reset_to_comp_mode()
 
@@ -804,25 +809,21 @@ class Lobby(BaseModel):
             raise LobbyException(_("The given type is not valid."))
 
         cache.set(f"{self.cache_key}:match_type", match_type)
-        cache.set(
-            f"{self.cache_key}:map_id",
-            Map.objects.filter(map_type=match_type)
-            .values_list(
-                "id",
-                flat=True,
-            )
-            .first(),
-        )
+        self.__set_default_map_id(match_type)
+
+    def __set_default_map_id(self, match_type: str):
+        maps = MapCatalog.filter(map_type=match_type)
+        if maps:
+            cache.set(f"{self.cache_key}:map_id", maps[0].id)
+        else:
+            cache.delete(f"{self.cache_key}:map_id")
 
     def set_map_id(self, map_id: int):
         if self.mode != Lobby.ModeChoices.CUSTOM:
             raise LobbyException(_("Cannot restrict map in this mode."))
 
-        available_map_ids = Map.objects.filter(map_type=self.match_type).values_list(
-            "id",
-            flat=True,
-        )
-        if map_id not in available_map_ids:
+        map = MapCatalog.get(map_id)
+        if not map or map.map_type != self.match_type:
             raise LobbyException(_("Invalid map id."))
         cache.set(f"{self.cache_key}:map_id", map_id)
 
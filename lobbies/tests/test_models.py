@@ -946,6 +946,61 @@ class LobbyInviteModelTestCase(VerifiedAccountsMixin, TestCase):
             ],
         )
 
+    def test_get_by_from_user_id(self):
+        self.lobby1.invite(self.user_1.id, self.user_2.id)
+        self.lobby1.invite(self.user_1.id, self.user_3.id)
+        self.lobby4.invite(self.user_4.id, self.user_1.id)
+
+        self.assertCountEqual(
+            [invite.id for invite in LobbyInvite.get_by_from_user_id(self.user_1.id)],
+            [
+                f"{self.user_1.id}:{self.user_2.id}",
+                f"{self.user_1.id}:{self.user_3.id}",
+            ],
+        )
+        self.assertEqual(LobbyInvite.get_by_from_user_id(self.user_2.id), [])
+
+    def test_indexes_stale_entries(self):
+        self.lobby1.invite(self.user_1.id, self.user_2.id)
+        self.lobby3.invite(self.user_3.id, self.user_2.id)
+        index_key = f"{LobbyInvite.Config.INDEX_PREFIX}:to:{self.user_2.id}"
+        self.assertGreater(cache.ttl(index_key), 0)
+
+        Lobby.delete(self.lobby1.id)
+        self.assertEqual(
+            LobbyInvite.get_by_to_user_id(self.user_2.id),
+            [
+                LobbyInvite(
+                    from_id=self.user_3.id,
+                    to_id=self.user_2.id,
+                    lobby_id=self.lobby3.id,
+                )
+            ],
+        )
+        self.assertEqual(cache.zcard(index_key), 1)
+
+        self.lobby3.delete_invite(f"{self.user_3.id}:{self.user_2.id}")
+        self.assertEqual(cache.zcard(index_key), 0)
+
+    def test_index_all(self):
+        self.lobby1.invite(self.user_1.id, self.user_2.id)
+        self.lobby3.invite(self.user_3.id, self.user_2.id)
+        cache.delete(
+            *LobbyInvite.get_index_keys(self.user_1.id, self.user_2.id),
+            *LobbyInvite.get_index_keys(self.user_3.id, self.user_2.id),
+        )
+        self.assertEqual(LobbyInvite.get_by_to_user_id(self.user_2.id), [])
+
+        self.assertEqual(LobbyInvite.index_all(), 2)
+        self.assertCountEqual(
+            [invite.id for invite in LobbyInvite.get_by_to_user_id(self.user_2.id)],
+            [f"{self.user_1.id}:{self.user_2.id}", f"{self.user_3.id}:{self.user_2.id}"],
+        )
+        self.assertEqual(
+            LobbyInvite.get_by_id(f"{self.user_3.id}:{self.user_2.id}").lobby_id,
+            self.lobby3.id,
+        )
+
     def test_create_date(self):
         timestamp = timezone.now().timestamp()
         cache.zadd(
@@ -1,3 +1,4 @@
+from accounts.models import Account
 from accounts.tests.mixins import VerifiedAccountsMixin
 from core.tests import TestCase
 from core.utils import get_full_file_path
@@ -36,6 +37,24 @@ class LobbySchemaTestCase(VerifiedAccountsMixin, TestCase):
         }
         self.assertDictEqual(payload, expected_payload)
 
+    def test_lobby_player_schema_prefetched(self):
+        Lobby.create(self.user_1.id)
+        accounts = schemas.prefetch_lobby_players(
+            [self.user_1.account, self.user_2.account]
+        )
+
+        with self.assertNumQueries(0):
+            prefetched = schemas.LobbyPlayerSchema.get_steam_user(accounts[0])
+        self.assertEqual(prefetched, self.user_1.steam_user)
+
+        for account in accounts:
+            self.assertDictEqual(
+                schemas.LobbyPlayerSchema.from_orm(account).dict(),
+                schemas.LobbyPlayerSchema.from_orm(
+                    Account.objects.get(pk=account.pk)
+                ).dict(),
+            )
+
     def test_lobby_schema(self):
         lobby = Lobby.create(self.user_1.id)
         payload = schemas.LobbySchema.from_orm(lobby).dict()
@@ -1,7 +1,7 @@
 from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
 
-from websocket.utils import ws_send
+from websocket.utils import ws_send, ws_send_nowait
 
 from . import models
 from .api import schemas
@@ -111,11 +111,7 @@ def ws_update_lobby(lobby: models.Lobby):
     - lobbies/update
     """
     payload = schemas.LobbySchema.from_orm(lobby).dict()
-    return async_to_sync(ws_send)(
-        'lobbies/update',
-        payload,
-        groups=lobby.players_ids,
-    )
+    return ws_send_nowait('lobbies/update', payload, groups=lobby.players_ids)
 
 
 def ws_expire_player_invites(user: User, sent: bool = False, received: bool = False):
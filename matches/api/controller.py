@@ -8,7 +8,6 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Q
 from django.db.utils import IntegrityError
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext as _
@@ -176,19 +175,26 @@ def handle_update_players_stats(
     )
 
 
-def get_user_matches(
-    user: User, user_id: int = None
-) -> List[schemas.MatchListItemSchema]:
+MATCH_HISTORY_ORDERING = ("-team__match__end_date", "-id")
+
+
+def get_user_match_players(
+    user: User, user_id: int = None, model=models.MatchPlayer
+):
     search_id = user.id if not user_id else user_id
 
-    match_players = (
-        models.MatchPlayer.objects.filter(
+    return (
+        model.objects.filter(
             user_id=search_id, team__match__status=models.Match.Status.FINISHED
         )
         .select_related("team__match", "stats", "team")
         .order_by("-team__match__end_date")
     )
 
+
+def serialize_match_players(
+    match_players: List[models.MatchPlayer],
+) -> List[schemas.MatchListItemSchema]:
     response = []
     for player in match_players:
         match = player.team.match
@@ -225,12 +231,69 @@ def get_user_matches(
     return response
 
 
+def get_user_match_history(user: User, user_id: int = None) -> list:
+    """
+    The player match history as tiers: the hot match players, then the archived
+    ones, which only have matches older than any hot match
+    (see `matches.tasks.archive_matches`).
+    """
+    return [
+        get_user_match_players(user, user_id),
+        get_user_match_players(user, user_id, model=models.ArchivedMatchPlayer),
+    ]
+
+
+class MatchHistoryList:
+    """
+    Lazy, page-aware match history, read from the tiers given by
+    `get_user_match_history`. Paginators only take its length and slice it, so
+    only match players on the requested page are loaded and serialized, and the
+    archive is only read for pages past the hot matches.
+    """
+
+    def __init__(self, tiers: list):
+        self.tiers = tiers
+        self._counts = None
+
+    @property
+    def counts(self) -> List[int]:
+        if self._counts is None:
+            self._counts = [tier.count() for tier in self.tiers]
+
+        return self._counts
+
+    def __len__(self) -> int:
+        return sum(self.counts)
+
+    def __getitem__(self, key: slice) -> List[schemas.MatchListItemSchema]:
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("Match history can only be sliced, without steps.")
+
+        start, stop, _ = key.indices(len(self))
+        match_players = []
+        for tier, count in zip(self.tiers, self.counts):
+            if start < count and stop > 0:
+                match_players += list(tier[max(start, 0):min(stop, count)])
+
+            start -= count
+            stop -= count
+
+        return serialize_match_players(match_players)
+
+
+def get_user_matches(user: User, user_id: int = None) -> MatchHistoryList:
+    return MatchHistoryList(get_user_match_history(user, user_id))
+
+
 def get_match(user: User, match_id: int) -> models.Match:
-    match = get_object_or_404(
-        models.Match,
-        ~Q(status=models.Match.Status.CANCELLED),
-        id=match_id,
-    )
+    try:
+        match = models.Match.objects.exclude(
+            status=models.Match.Status.CANCELLED
+        ).get(id=match_id)
+    except models.Match.DoesNotExist:
+        # Archived matches are all finished, so anyone can see them.
+        return get_object_or_404(models.ArchivedMatch, id=match_id)
+
     if match.status in [
         models.Match.Status.LOADING,
         models.Match.Status.WARMUP,
@@ -372,9 +435,8 @@ def create_match(payload: schemas.MatchCreationSchema) -> models.Match:
     if not server:
         raise HttpError(400, _("Servers full."))
 
-    try:
-        map = models.Map.objects.get(id=payload.map_id)
-    except models.Map.DoesNotExist:
+    map = models.MapCatalog.get(payload.map_id)
+    if not map:
         raise Http404(_("Map not found."))
 
     match = models.Match.objects.create(
@@ -4,13 +4,28 @@ from ninja import Router
 from ninja.pagination import paginate
 
 from accounts.api.authentication import VerifiedRequiredAuth
-from core.api.pagination import Pagination
+from core.api.pagination import CursorPagination, Pagination
 
 from . import authorization, controller, schemas
 
 router = Router(tags=['matches'])
 
 
+# Registered before `detail`, so `/history/` isn't taken as a match id.
+@router.get(
+    '/history/',
+    auth=VerifiedRequiredAuth(),
+    response={200: List[schemas.MatchListItemSchema]},
+)
+@paginate(
+    CursorPagination,
+    ordering=controller.MATCH_HISTORY_ORDERING,
+    serialize=controller.serialize_match_players,
+)
+def history(request, user_id: int = None):
+    return controller.get_user_match_history(request.user, user_id)
+
+
 @router.get(
     '/{match_id}/', auth=VerifiedRequiredAuth(), response={200: schemas.MatchSchema}
 )
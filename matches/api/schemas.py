@@ -6,7 +6,6 @@ from ninja import Field, ModelSchema, Schema
 from pydantic import root_validator, validator
 
 from accounts.utils import calc_level_and_points, steamid64_to_hex
-from core.utils import get_full_file_path
 from steam import Steam
 from store.models import Item
 
@@ -159,10 +158,7 @@ class MapSchema(ModelSchema):
 
     @staticmethod
     def resolve_thumbnail(obj):
-        if obj.thumbnail:
-            return get_full_file_path(obj.thumbnail)
-
-        return None
+        return obj.thumbnail_url
 
 
 class MatchSchema(ModelSchema):
@@ -302,9 +298,7 @@ class MatchCreationSchema(Schema):
     @validator("map_id")
     def check_map_id(cls, value):
         if value:
-            try:
-                models.Map.objects.get(id=value)
-            except models.Map.DoesNotExist:
+            if not models.MapCatalog.get(value):
                 raise ValueError(_("Invalid map id."))
 
         return value
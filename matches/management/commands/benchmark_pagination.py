@@ -0,0 +1,134 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils import timezone
+
+from core.api.pagination import CursorPagination
+
+from ... import models
+from ...api import controller
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare page number (OFFSET) and cursor (keyset) pagination latency "
+        "on a player match history (as served by /matches/history/), at "
+        "increasing page depths."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1_000_000,
+            help="Minimum amount of history entries. Missing rows are created.",
+        )
+        parser.add_argument(
+            "--depths",
+            type=int,
+            nargs="+",
+            default=[1, 10, 100, 1_000, 10_000, 50_000],
+            help="Pages to fetch on each pagination mode.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="How many times each page is fetched (the best time is shown).",
+        )
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def seed(self, user: User, rows: int, batch_size: int):
+        missing = rows - models.MatchPlayer.objects.filter(user=user).count()
+        if missing <= 0:
+            return
+
+        server, _ = models.Server.objects.get_or_create(
+            ip="123.123.123.123",
+            name="Reload 1",
+        )
+        match = models.Match.objects.create(
+            server=server,
+            status=models.Match.Status.FINISHED,
+            start_date=timezone.now(),
+            end_date=timezone.now(),
+        )
+        team = models.MatchTeam.objects.create(match=match, name="Team A", side=1)
+
+        self.stdout.write(f"Creating {missing} match players...")
+        while missing > 0:
+            size = min(batch_size, missing)
+            models.MatchPlayer.objects.bulk_create(
+                [
+                    models.MatchPlayer(
+                        user=user,
+                        team=team,
+                        match=match,
+                        level=0,
+                        level_points=0,
+                    )
+                    for _ in range(size)
+                ],
+                batch_size=batch_size,
+            )
+            missing -= size
+
+    def best_of(self, repeat: int, fetch) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fetch()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return min(timings)
+
+    def handle(self, *args, **options):
+        if settings.ENVIRONMENT == settings.PRODUCTION:
+            raise CommandError("This command can't run on production.")
+
+        user = User.objects.filter(is_staff=False).first()
+        if not user:
+            raise CommandError("At least one user is needed to seed match players.")
+
+        self.seed(user, options["rows"], options["batch_size"])
+
+        queryset = controller.get_user_match_players(user)
+        ordering = list(controller.MATCH_HISTORY_ORDERING)
+        page_size = settings.PAGINATION_PER_PAGE
+        total = queryset.count()
+        cursor_paginator = CursorPagination(ordering=ordering, page_size=page_size)
+
+        self.stdout.write(f"{total} rows, {page_size} per page (best time, ms)")
+        self.stdout.write(f"{'page':>10} {'offset':>12} {'cursor':>12}")
+
+        for depth in options["depths"]:
+            offset = (depth - 1) * page_size
+            if offset >= total:
+                continue
+
+            # Only the page query (no COUNT), so both modes do the same work.
+            def fetch_offset():
+                list(queryset.order_by(*ordering)[offset:offset + page_size])
+
+            # The cursor a client would hold after walking to the previous page.
+            cursor = None
+            if depth > 1:
+                boundary = queryset.order_by(*ordering)[offset - 1]
+                cursor = cursor_paginator.get_cursor(ordering, boundary, reverse=False)
+
+            def fetch_cursor():
+                cursor_paginator.paginate_queryset(
+                    queryset,
+                    CursorPagination.Input(cursor=cursor),
+                )
+
+            self.stdout.write(
+                f"{depth:>10} "
+                f"{self.best_of(options['repeat'], fetch_offset):>12.2f} "
+                f"{self.best_of(options['repeat'], fetch_cursor):>12.2f}"
+            )
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("matches", "0031_alter_map_sys_id"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                condition=models.Q(("status", "finished")),
+                fields=["-end_date"],
+                name="matches_finished_end_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="matchplayer",
+            index=models.Index(
+                fields=["user", "team"], name="matches_mat_user_id_fb8524_idx"
+            ),
+        ),
+    ]
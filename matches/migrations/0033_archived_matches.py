@@ -0,0 +1,119 @@
+# Generated by Django 4.2 on 2026-10-19 18:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0020_account_username_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('matches', '0032_match_finished_end_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMatch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateTimeField(blank=True, null=True)),
+                ('end_date', models.DateTimeField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('loading', 'Loading'), ('warmup', 'Warmup'), ('running', 'Running'), ('finished', 'Finished'), ('cancelled', 'Cancelled')], default='loading', max_length=16)),
+                ('game_mode', models.CharField(choices=[('custom', 'Custom'), ('competitive', 'Competitive')], default='competitive', max_length=16)),
+                ('chat', models.JSONField(null=True)),
+                ('restricted_weapon', models.CharField(blank=True, choices=[('weapon_appistol', 'Weapon Appistol'), ('weapon_assaultrifle', 'Weapon Assaultrifle'), ('weapon_assaultshotgun', 'Weapon Assaultshotgun'), ('weapon_combatmg', 'Weapon Combatmg'), ('weapon_heavysniper', 'Weapon Heavysniper'), ('weapon_mg', 'Weapon Mg'), ('weapon_microsmg', 'Weapon Microsmg'), ('weapon_pistol', 'Weapon Pistol'), ('weapon_pistol50', 'Weapon Pistol50'), ('weapon_pistol_mk2', 'Weapon Pistol Mk2'), ('weapon_pumpshotgun', 'Weapon Pumpshotgun'), ('weapon_smg', 'Weapon Smg'), ('weapon_sniperrifle', 'Weapon Sniperrifle'), ('weapon_tacticalrifle', 'Weapon Tacticalrifle')], max_length=64, null=True)),
+                ('create_date', models.DateTimeField()),
+                ('map', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='matches.map')),
+                ('server', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='matches.server')),
+            ],
+            options={
+                'ordering': ['-end_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedMatchPlayer',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.IntegerField(editable=False)),
+                ('level_points', models.IntegerField(editable=False)),
+                ('match', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='matchplayer_set', related_query_name='matchplayer', to='matches.archivedmatch')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedPlayerSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archived_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('matches_played', models.IntegerField(default=0)),
+                ('matches_won', models.IntegerField(default=0)),
+                ('totals', models.JSONField(default=dict)),
+                ('win_streak', models.IntegerField(default=0)),
+                ('highest_win_streak', models.IntegerField(default=0)),
+                ('update_date', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedMatchTeam',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32)),
+                ('score', models.IntegerField(blank=True, default=0, null=True)),
+                ('side', models.IntegerField(choices=[(1, 'Def'), (2, 'Atk')])),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matchteam_set', related_query_name='matchteam', to='matches.archivedmatch')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedMatchPlayerStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kills', models.IntegerField(blank=True, default=0, null=True)),
+                ('deaths', models.IntegerField(blank=True, default=0, null=True)),
+                ('assists', models.IntegerField(blank=True, default=0, null=True)),
+                ('damage', models.IntegerField(blank=True, default=0, null=True)),
+                ('hs_kills', models.IntegerField(blank=True, default=0, null=True)),
+                ('afk', models.IntegerField(blank=True, default=0, null=True)),
+                ('plants', models.IntegerField(blank=True, default=0, null=True)),
+                ('defuses', models.IntegerField(blank=True, default=0, null=True)),
+                ('double_kills', models.IntegerField(blank=True, default=0, null=True)),
+                ('triple_kills', models.IntegerField(blank=True, default=0, null=True)),
+                ('quadra_kills', models.IntegerField(blank=True, default=0, null=True)),
+                ('aces', models.IntegerField(blank=True, default=0, null=True)),
+                ('clutch_v1', models.IntegerField(blank=True, default=0, null=True)),
+                ('clutch_v2', models.IntegerField(blank=True, default=0, null=True)),
+                ('clutch_v3', models.IntegerField(blank=True, default=0, null=True)),
+                ('clutch_v4', models.IntegerField(blank=True, default=0, null=True)),
+                ('clutch_v5', models.IntegerField(blank=True, default=0, null=True)),
+                ('firstkills', models.IntegerField(blank=True, default=0, null=True)),
+                ('shots_fired', models.IntegerField(blank=True, default=0, null=True)),
+                ('head_shots', models.IntegerField(blank=True, default=0, null=True)),
+                ('chest_shots', models.IntegerField(blank=True, default=0, null=True)),
+                ('other_shots', models.IntegerField(blank=True, default=0, null=True)),
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='matches.archivedmatchplayer')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedmatchplayer',
+            name='team',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='matchplayer_set', related_query_name='matchplayer', to='matches.archivedmatchteam'),
+        ),
+        migrations.AddField(
+            model_name='archivedmatchplayer',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivedmatchplayer',
+            index=models.Index(fields=['user', 'team'], name='matches_archived_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedmatch',
+            index=models.Index(fields=['-end_date'], name='matches_archived_end_date_idx'),
+        ),
+    ]
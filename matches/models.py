@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import os
 import random
-from typing import List
+import uuid
+from decimal import Decimal
+from functools import cached_property
+from typing import Dict, List
 
 import requests
 from django.conf import settings
@@ -11,16 +14,19 @@ from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.db.models import Q
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import gettext as _
 
+from accounts.models.presence import Presence
 from appsettings.services import (
     matches_limit_per_server,
     matches_limit_per_server_gap,
     player_max_losing_level_points,
 )
+from core.redis import redis_client_instance as cache
+from core.utils import get_full_file_path
 
 User = get_user_model()
 
@@ -126,22 +132,83 @@ class Map(models.Model):
     def __str__(self):
         return self.name
 
+    @cached_property
+    def thumbnail_url(self) -> str:
+        return get_full_file_path(self.thumbnail) if self.thumbnail else None
+
+    @staticmethod
+    def randomize(map_type: str = None) -> Map:
+        maps = MapCatalog.filter(map_type=map_type, is_active=True)
+        if maps:
+            return random.choices(maps, weights=[map.weight for map in maps])[0]
+
+
+class MapCatalog:
+    """
+    In-process catalog of all maps, so lobbies and match creation don't query them.
+    Maps only change through the admin, so each process keeps the loaded maps until
+    the version on Redis changes, which happens when a map is saved or deleted.
+
+    [key] __maps:version <str>
+    """
+
+    VERSION_KEY = '__maps:version'
+
+    version: str = None
+    maps: Dict[int, Map] = {}
+    maps_by_type: Dict[str, List[Map]] = {}
+
     @staticmethod
-    def randomize():
-        maps = Map.objects.filter(is_active=True)
-        maplist = [map for map in maps for _ in range(map.weight)]
-        return random.choice(maplist)
+    def invalidate():
+        cache.set(MapCatalog.VERSION_KEY, uuid.uuid4().hex)
+
+    @staticmethod
+    def load():
+        version = cache.get(MapCatalog.VERSION_KEY)
+        if version and version == MapCatalog.version:
+            return
+
+        if not version:
+            cache.set(MapCatalog.VERSION_KEY, uuid.uuid4().hex, nx=True)
+            version = cache.get(MapCatalog.VERSION_KEY)
+
+        maps = list(Map.objects.order_by('id'))
+        maps_by_type = {}
+        for map in maps:
+            # precompute thumbnail urls, so serializing doesn't resolve them
+            map.thumbnail_url
+            maps_by_type.setdefault(map.map_type, []).append(map)
+
+        MapCatalog.maps = {map.id: map for map in maps}
+        MapCatalog.maps_by_type = maps_by_type
+        MapCatalog.version = version
+
+    @staticmethod
+    def get(map_id: int) -> Map:
+        MapCatalog.load()
+        return MapCatalog.maps.get(map_id)
+
+    @staticmethod
+    def filter(map_type: str = None, is_active: bool = None) -> List[Map]:
+        MapCatalog.load()
+        if map_type:
+            maps = MapCatalog.maps_by_type.get(map_type, [])
+        else:
+            maps = list(MapCatalog.maps.values())
+
+        if is_active is not None:
+            maps = [map for map in maps if map.is_active == is_active]
+
+        return maps
+
 
+class AbstractMatch(models.Model):
+    """
+    Fields and read only behavior shared by `Match` and `ArchivedMatch`.
+    """
 
-class Match(models.Model):
     class Meta:
-        verbose_name_plural = "matches"
-        ordering = ["-end_date"]
-        indexes = [
-            models.Index(fields=["status"]),
-            models.Index(fields=["end_date"]),
-            models.Index(fields=["start_date"]),
-        ]
+        abstract = True
 
     class Status(models.TextChoices):
         LOADING = "loading"
@@ -172,7 +239,6 @@ class Match(models.Model):
 
     server = models.ForeignKey(Server, on_delete=models.CASCADE)
     map = models.ForeignKey(Map, on_delete=models.CASCADE)
-    create_date = models.DateTimeField(auto_now_add=True)
     start_date = models.DateTimeField(blank=True, null=True)
     end_date = models.DateTimeField(blank=True, null=True)
     status = models.CharField(
@@ -247,6 +313,39 @@ class Match(models.Model):
 
         return self.team_b
 
+    def __str__(self):
+        if self.team_a and self.team_b:
+            return f"#{self.id} - {self.team_a.name} vs {self.team_b.name}"
+        return f"#{self.id} - waiting for team creation"
+
+    def get_user_team(self, user_id: int) -> MatchTeam:
+        if user_id in [player.user_id for player in self.team_a.players]:
+            return self.team_a
+        elif user_id in [player.user_id for player in self.team_b.players]:
+            return self.team_b
+        else:
+            return None
+
+
+class Match(AbstractMatch):
+    class Meta:
+        verbose_name_plural = "matches"
+        ordering = ["-end_date"]
+        indexes = [
+            models.Index(fields=["status"]),
+            models.Index(fields=["end_date"]),
+            models.Index(fields=["start_date"]),
+            # Match history and profiles only read finished matches, newest first,
+            # so this index holds just those and grows only with played matches.
+            models.Index(
+                fields=["-end_date"],
+                name="matches_finished_end_date_idx",
+                condition=Q(status="finished"),
+            ),
+        ]
+
+    create_date = models.DateTimeField(auto_now_add=True)
+
     @property
     def players(self) -> List[MatchPlayer]:
         """
@@ -269,11 +368,6 @@ class Match(models.Model):
         """
         return MatchPlayer.objects.filter(team__isnull=True)
 
-    def __str__(self):
-        if self.team_a and self.team_b:
-            return f"#{self.id} - {self.team_a.name} vs {self.team_b.name}"
-        return f"#{self.id} - waiting for team creation"
-
     def finish(self):
         if self.status not in [Match.Status.RUNNING, Match.Status.WARMUP]:
             raise ValidationError(_("Unable to finish match while not running."))
@@ -309,21 +403,19 @@ class Match(models.Model):
         self.end_date = timezone.now()
         self.save()
 
-    def get_user_team(self, user_id: int) -> MatchTeam:
-        if user_id in [player.user_id for player in self.team_a.players]:
-            return self.team_a
-        elif user_id in [player.user_id for player in self.team_b.players]:
-            return self.team_b
-        else:
-            return None
 
+class AbstractMatchTeam(models.Model):
+    """
+    Fields and behavior shared by `MatchTeam` and `ArchivedMatchTeam`.
+    """
+
+    class Meta:
+        abstract = True
 
-class MatchTeam(models.Model):
     class SideChoices(models.IntegerChoices):
         DEF = 1
         ATK = 2
 
-    match = models.ForeignKey(Match, on_delete=models.CASCADE)
     name = models.CharField(max_length=32)
     score = models.IntegerField(default=0, blank=True, null=True)
     side = models.IntegerField(choices=SideChoices.choices)
@@ -333,7 +425,7 @@ class MatchTeam(models.Model):
         """
         Fetch and return all players that are in team.
         """
-        return MatchPlayer.objects.filter(team=self)
+        return self.matchplayer_set.all()
 
     def has_player(self, user):
         """
@@ -351,17 +443,23 @@ class MatchTeam(models.Model):
         return f"#{self.id} - {self.name}"
 
 
-class MatchPlayer(models.Model):
+class MatchTeam(AbstractMatchTeam):
+    match = models.ForeignKey(Match, on_delete=models.CASCADE)
+
+
+class AbstractMatchPlayer(models.Model):
     """
+    Fields and behavior shared by `MatchPlayer` and `ArchivedMatchPlayer`.
     If a player doesn't have a team, it means that this player is spec.
     """
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    team = models.ForeignKey(MatchTeam, on_delete=models.CASCADE, blank=True, null=True)
-    match = models.ForeignKey(Match, on_delete=models.CASCADE, blank=True, null=True)
     level = models.IntegerField(editable=False)
     level_points = models.IntegerField(editable=False)
 
+    class Meta:
+        abstract = True
+
     @property
     def points_base(self):
         """
@@ -412,7 +510,7 @@ class MatchPlayer(models.Model):
         """
         How many level points this player won in a match.
         """
-        if self.team.match.status != Match.Status.FINISHED:
+        if self.team.match.status != AbstractMatch.Status.FINISHED:
             return None
 
         points = self.points_cap
@@ -427,6 +525,17 @@ class MatchPlayer(models.Model):
 
         return points
 
+    def __str__(self):
+        return f"{self.user.steam_user.username}"
+
+
+class MatchPlayer(AbstractMatchPlayer):
+    team = models.ForeignKey(MatchTeam, on_delete=models.CASCADE, blank=True, null=True)
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "team"])]
+
     def save(self, *args, **kwargs):
         adding = True if self._state.adding else False
 
@@ -438,11 +547,15 @@ class MatchPlayer(models.Model):
         else:
             super().save(*args, **kwargs)
 
-    def __str__(self):
-        return f"{self.user.steam_user.username}"
 
+class AbstractMatchPlayerStats(models.Model):
+    """
+    Fields and behavior shared by `MatchPlayerStats` and `ArchivedMatchPlayerStats`.
+    """
+
+    class Meta:
+        abstract = True
 
-class MatchPlayerStats(models.Model):
     PERCENTAGE_STATS = [
         "accuracy",
         "head_accuracy",
@@ -460,11 +573,6 @@ class MatchPlayerStats(models.Model):
 
     ROUND_STATS = [("adr", "damage")]
 
-    player = models.OneToOneField(
-        MatchPlayer,
-        on_delete=models.CASCADE,
-        related_name="stats",
-    )
     kills = models.IntegerField(blank=True, null=True, default=0)
     deaths = models.IntegerField(blank=True, null=True, default=0)
     assists = models.IntegerField(blank=True, null=True, default=0)
@@ -618,6 +726,127 @@ class MatchPlayerStats(models.Model):
         return f"{self.player.user.steam_user.username}"
 
 
+class MatchPlayerStats(AbstractMatchPlayerStats):
+    player = models.OneToOneField(
+        MatchPlayer,
+        on_delete=models.CASCADE,
+        related_name="stats",
+    )
+
+
+class ArchivedMatch(AbstractMatch):
+    """
+    A finished match moved out of the hot tables by `matches.tasks.archive_matches`.
+
+    Archived rows keep their ids and relation names (`matchteam_set`,
+    `matchplayer_set`, `stats`), so they are read just like the hot ones and
+    a history ordered by end date carries on from the hot tables to these.
+    """
+
+    class Meta:
+        ordering = ["-end_date"]
+        indexes = [
+            models.Index(fields=["-end_date"], name="matches_archived_end_date_idx")
+        ]
+
+    create_date = models.DateTimeField()
+
+    @property
+    def players(self) -> List[ArchivedMatchPlayer]:
+        return ArchivedMatchPlayer.objects.filter(Q(match=self) | Q(team__match=self))
+
+
+class ArchivedMatchTeam(AbstractMatchTeam):
+    match = models.ForeignKey(
+        ArchivedMatch,
+        on_delete=models.CASCADE,
+        related_name="matchteam_set",
+        related_query_name="matchteam",
+    )
+
+
+class ArchivedMatchPlayer(AbstractMatchPlayer):
+    team = models.ForeignKey(
+        ArchivedMatchTeam,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="matchplayer_set",
+        related_query_name="matchplayer",
+    )
+    match = models.ForeignKey(
+        ArchivedMatch,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="matchplayer_set",
+        related_query_name="matchplayer",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "team"], name="matches_archived_user_idx")
+        ]
+
+
+class ArchivedMatchPlayerStats(AbstractMatchPlayerStats):
+    player = models.OneToOneField(
+        ArchivedMatchPlayer,
+        on_delete=models.CASCADE,
+        related_name="stats",
+    )
+
+
+class ArchivedPlayerSummary(models.Model):
+    """
+    Totals of a player archived matches, added up by `matches.tasks.archive_matches`
+    as matches are archived, so counters and profiles add these to what they read
+    from the hot tables instead of reading the archive.
+
+    `matches_played` and `matches_won` follow the ranking counters, so a match is
+    won when the team scored `MATCH_ROUNDS_TO_WIN` rounds. `totals` holds the profile
+    aggregates (see `profiles.services.get_totals`), decimals as strings to keep
+    them exact. `win_streak` is the streak the player was on at their latest
+    archived match, so streaks carry on to the hot matches.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="archived_summary",
+    )
+    matches_played = models.IntegerField(default=0)
+    matches_won = models.IntegerField(default=0)
+    totals = models.JSONField(default=dict)
+    win_streak = models.IntegerField(default=0)
+    highest_win_streak = models.IntegerField(default=0)
+    update_date = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.matches_played}"
+
+    @staticmethod
+    def get_by_user_id(user_id: int) -> ArchivedPlayerSummary:
+        """
+        The player summary, or an empty (unsaved) one if nothing was archived yet.
+        """
+        summary = ArchivedPlayerSummary.objects.filter(user_id=user_id).first()
+        return summary or ArchivedPlayerSummary(user_id=user_id)
+
+    def get_totals(self) -> dict:
+        return {
+            key: Decimal(value) if isinstance(value, str) else value
+            for key, value in self.totals.items()
+        }
+
+    def set_totals(self, totals: dict):
+        self.totals = {
+            key: str(value) if isinstance(value, Decimal) else value
+            for key, value in totals.items()
+        }
+
+
 class BetaUser(models.Model):
     steamid_hex = models.CharField(max_length=64, unique=True)
     email = models.EmailField(unique=True)
@@ -648,11 +877,16 @@ class BetaUser(models.Model):
 def match_team_save_signal(sender, instance, created, **kwargs):
     if created:
         instance.user.status = User.Status.IN_GAME
-        instance.user.save()
+
+
+@receiver(post_save, sender=Map)
+@receiver(post_delete, sender=Map)
+def map_catalog_signal(sender, instance, **kwargs):
+    MapCatalog.invalidate()
 
 
 @receiver(post_save, sender=Match)
 def match_update_signal(sender, instance, created, **kwargs):
     if instance.status in [Match.Status.CANCELLED, Match.Status.FINISHED]:
-        players_ids = [player.user.id for player in instance.players]
-        User.objects.filter(id__in=players_ids).update(status=User.Status.ONLINE)
+        players_ids = list(instance.players.values_list("user_id", flat=True))
+        Presence.set_many(players_ids, User.Status.ONLINE)
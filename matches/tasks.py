@@ -1,15 +1,29 @@
 import logging
 from datetime import timedelta
+from typing import Dict, List
 
 import requests
 from celery import shared_task
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
+from core.db import chunked_delete
 from core.utils import send_mail
+from profiles import services
 
 from . import models
 
+# There are no delete signals on matches, so their rows can go with raw deletes.
+MATCH_RAW_CASCADE = [
+    (models.MatchPlayerStats, 'player__match'),
+    (models.MatchPlayerStats, 'player__team__match'),
+    (models.MatchPlayer, 'match'),
+    (models.MatchPlayer, 'team__match'),
+    (models.MatchTeam, 'match'),
+]
+
 
 @shared_task
 def mock_fivem_match_start(match_id: int):
@@ -56,10 +70,151 @@ def mock_fivem_match_cancel(match_id: int):
 def delete_old_cancelled_matches():
     day_ago = timezone.now() - timedelta(days=1)
 
-    return models.Match.objects.filter(
-        status=models.Match.Status.CANCELLED,
-        end_date__lt=day_ago,
-    ).delete()
+    return chunked_delete(
+        models.Match.objects.filter(
+            status=models.Match.Status.CANCELLED,
+            end_date__lt=day_ago,
+        ),
+        raw_cascade=MATCH_RAW_CASCADE,
+        label='delete_old_cancelled_matches',
+    )
+
+
+def copy_to_archive(queryset, archived_model):
+    """
+    Copy the rows of `queryset` to `archived_model`, keeping their ids,
+    so the archive keeps the same relations the hot tables had.
+    """
+    fields = [field.attname for field in queryset.model._meta.concrete_fields]
+    archived_model.objects.bulk_create(
+        [archived_model(**row) for row in queryset.values(*fields)]
+    )
+
+
+def get_archive_summaries(match_ids: List[int]) -> Dict[int, dict]:
+    """
+    The `ArchivedPlayerSummary` of every player on the given matches, with those
+    matches added up. Matches are walked from the oldest to the latest one, so win
+    streaks carry on from the previously archived matches.
+    """
+    totals_by_user = services.get_totals_by_user(match_ids)
+    summaries = {
+        summary.user_id: summary
+        for summary in models.ArchivedPlayerSummary.objects.select_for_update().filter(
+            user_id__in=totals_by_user.keys()
+        )
+    }
+
+    scores = (
+        models.MatchPlayer.objects.filter(team__match_id__in=match_ids)
+        .annotate(
+            opponent_score=services.opponent_score_subquery('team_id', 'team__match_id')
+        )
+        .order_by('team__match__end_date', 'team__match_id')
+        .values_list('user_id', 'team__score', 'opponent_score')
+    )
+    for user_id, own_score, opponent_score in scores:
+        summary = summaries.setdefault(
+            user_id, models.ArchivedPlayerSummary(user_id=user_id)
+        )
+        won = (
+            own_score is not None
+            and opponent_score is not None
+            and own_score > opponent_score
+        )
+        summary.matches_played += 1
+        summary.matches_won += own_score == settings.MATCH_ROUNDS_TO_WIN
+        summary.win_streak = summary.win_streak + 1 if won else 0
+        summary.highest_win_streak = max(
+            summary.highest_win_streak, summary.win_streak
+        )
+
+    for user_id, summary in summaries.items():
+        summary.set_totals(
+            services.merge_totals(
+                summary.get_totals(), totals_by_user.get(user_id, {})
+            )
+        )
+
+    return summaries
+
+
+def archive_matches_batch(match_ids: List[int]):
+    summaries = get_archive_summaries(match_ids).values()
+    models.ArchivedPlayerSummary.objects.bulk_create(
+        [summary for summary in summaries if summary._state.adding]
+    )
+    models.ArchivedPlayerSummary.objects.bulk_update(
+        [summary for summary in summaries if not summary._state.adding],
+        [
+            'matches_played',
+            'matches_won',
+            'totals',
+            'win_streak',
+            'highest_win_streak',
+        ],
+    )
+
+    copy_to_archive(models.Match.objects.filter(id__in=match_ids), models.ArchivedMatch)
+    copy_to_archive(
+        models.MatchTeam.objects.filter(match_id__in=match_ids),
+        models.ArchivedMatchTeam,
+    )
+    copy_to_archive(
+        models.MatchPlayer.objects.filter(
+            Q(match_id__in=match_ids) | Q(team__match_id__in=match_ids)
+        ),
+        models.ArchivedMatchPlayer,
+    )
+    copy_to_archive(
+        models.MatchPlayerStats.objects.filter(
+            Q(player__match_id__in=match_ids)
+            | Q(player__team__match_id__in=match_ids)
+        ),
+        models.ArchivedMatchPlayerStats,
+    )
+
+    chunked_delete(
+        models.Match.objects.filter(id__in=match_ids),
+        batch_size=len(match_ids),
+        raw_cascade=MATCH_RAW_CASCADE,
+        label='archive_matches',
+    )
+
+
+@shared_task
+def archive_matches():
+    """
+    Move finished matches older than `MATCHES_ARCHIVE_AFTER_DAYS` (and all their
+    teams, players and stats) to the archive tables, from the oldest to the latest
+    one, in batches of `MATCHES_ARCHIVE_BATCH_SIZE` matches. Each batch is copied,
+    added up to the players `ArchivedPlayerSummary` and deleted from the hot
+    tables on a single transaction, so a match is never on both or none of them.
+
+    :return: How many matches were archived.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.MATCHES_ARCHIVE_AFTER_DAYS)
+    archived = 0
+
+    while True:
+        with transaction.atomic():
+            match_ids = list(
+                models.Match.objects.select_for_update(skip_locked=True)
+                .filter(status=models.Match.Status.FINISHED, end_date__lt=cutoff)
+                .order_by('end_date', 'id')
+                .values_list('id', flat=True)[: settings.MATCHES_ARCHIVE_BATCH_SIZE]
+            )
+            if match_ids:
+                archive_matches_batch(match_ids)
+
+        archived += len(match_ids)
+        if len(match_ids) < settings.MATCHES_ARCHIVE_BATCH_SIZE:
+            break
+
+    if archived:
+        logging.info(f'[archive_matches] {archived} matches archived')
+
+    return archived
 
 
 @shared_task
@@ -103,8 +258,11 @@ def remove_pending_loading_matches():
         status=models.Match.Status.LOADING,
         create_date__lt=timezone.now() - timedelta(seconds=10),
     )
-    if len(matches) > 0:
-        logging.warning(
-            f'[remove_pending_loading_matches] {[match.id for match in matches]}'
+    match_ids = list(matches.values_list('id', flat=True))
+    if match_ids:
+        logging.warning(f'[remove_pending_loading_matches] {match_ids}')
+        chunked_delete(
+            models.Match.objects.filter(id__in=match_ids),
+            raw_cascade=MATCH_RAW_CASCADE,
+            label='remove_pending_loading_matches',
         )
-        matches.delete()
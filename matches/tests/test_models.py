@@ -5,7 +5,14 @@ from model_bakery import baker
 from appsettings.models import AppSettings
 from appsettings.services import player_max_losing_level_points
 from core.tests import TestCase
-from matches.models import Match, MatchPlayer, MatchPlayerStats, Server, Map
+from matches.models import (
+    Map,
+    MapCatalog,
+    Match,
+    MatchPlayer,
+    MatchPlayerStats,
+    Server,
+)
 from pre_matches.tests.mixins import TeamsMixin
 
 
@@ -482,3 +489,46 @@ class MatchesMatchPlayerStatsModelTestCase(TeamsMixin, TestCase):
         player.stats.save()
 
         self.assertEqual(player.stats.hsk, 20)
+
+
+class MatchesMapCatalogTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        Map.objects.all().delete()
+        self.map_1 = baker.make(Map, map_type=Map.MapTypeChoices.DEFAULT)
+        self.map_2 = baker.make(Map, map_type=Map.MapTypeChoices.SAFEZONE)
+        self.map_3 = baker.make(
+            Map,
+            map_type=Map.MapTypeChoices.DEFAULT,
+            is_active=False,
+        )
+
+    def test_lookups(self):
+        self.assertEqual(MapCatalog.get(self.map_2.id), self.map_2)
+        self.assertIsNone(MapCatalog.get(0))
+        self.assertEqual(
+            MapCatalog.filter(map_type=Map.MapTypeChoices.DEFAULT),
+            [self.map_1, self.map_3],
+        )
+        self.assertEqual(
+            MapCatalog.filter(map_type=Map.MapTypeChoices.DEFAULT, is_active=True),
+            [self.map_1],
+        )
+
+        with self.assertNumQueries(0):
+            MapCatalog.get(self.map_1.id)
+            MapCatalog.filter()
+
+    def test_invalidate(self):
+        self.assertEqual(len(MapCatalog.filter()), 3)
+
+        self.map_1.delete()
+        self.assertEqual(MapCatalog.filter(), [self.map_2, self.map_3])
+
+        self.map_2.name = 'New name'
+        self.map_2.save()
+        self.assertEqual(MapCatalog.get(self.map_2.id).name, 'New name')
+
+    def test_randomize(self):
+        self.assertEqual(Map.randomize(Map.MapTypeChoices.SAFEZONE), self.map_2)
+        self.assertEqual(Map.randomize(Map.MapTypeChoices.DEFAULT), self.map_1)
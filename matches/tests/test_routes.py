@@ -1,8 +1,11 @@
+from datetime import timedelta
+
+from django.test import override_settings
 from django.utils import timezone
 from model_bakery import baker
 
 from core.tests import APIClient, TestCase
-from matches import models
+from matches import models, tasks
 from matches.api import schemas
 from pre_matches.tests.mixins import TeamsMixin
 
@@ -71,6 +74,70 @@ class MatchesRoutesTestCase(TeamsMixin, TestCase):
         )
         self.assertEqual(r.json().get('count'), 1)
 
+    def test_match_history(self):
+        server = baker.make(models.Server)
+        matches = []
+        for _ in range(0, 3):
+            match = baker.make(
+                models.Match,
+                server=server,
+                status=models.Match.Status.FINISHED,
+                start_date=timezone.now(),
+                end_date=timezone.now(),
+            )
+            team1 = match.matchteam_set.create(name=self.team1.name, score=10, side=1)
+            match.matchteam_set.create(name=self.team2.name, score=6, side=2)
+            baker.make(models.MatchPlayer, team=team1, user=self.user_1)
+            matches.append(match)
+
+        r = self.api.call('get', '/history/?count=true', token=self.user_1.auth.token)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json().get('count'), 3)
+        self.assertIsNone(r.json().get('next_cursor'))
+        self.assertEqual(
+            [item['id'] for item in r.json().get('results')],
+            [match.id for match in reversed(matches)],
+        )
+
+    @override_settings(MATCHES_ARCHIVE_AFTER_DAYS=30)
+    def test_match_history_archived(self):
+        server = baker.make(models.Server)
+        matches = []
+        for days in [90, 60, 0]:
+            match = baker.make(
+                models.Match,
+                server=server,
+                status=models.Match.Status.FINISHED,
+                start_date=timezone.now() - timedelta(days=days),
+                end_date=timezone.now() - timedelta(days=days),
+            )
+            team1 = match.matchteam_set.create(name=self.team1.name, score=10, side=1)
+            match.matchteam_set.create(name=self.team2.name, score=6, side=2)
+            baker.make(models.MatchPlayer, team=team1, user=self.user_1)
+            matches.append(match)
+
+        tasks.archive_matches()
+
+        r = self.api.call('get', '/history/?count=true', token=self.user_1.auth.token)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json().get('count'), 3)
+        self.assertEqual(
+            [item['id'] for item in r.json().get('results')],
+            [match.id for match in reversed(matches)],
+        )
+
+        r = self.api.call('get', '/', token=self.user_1.auth.token)
+        self.assertEqual(r.json().get('count'), 3)
+        self.assertEqual(
+            [item['id'] for item in r.json().get('results')],
+            [match.id for match in reversed(matches)],
+        )
+
+        archived = models.ArchivedMatch.objects.get(id=matches[0].id)
+        r = self.api.call('get', f'/{archived.id}', token=self.user_1.auth.token)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json(), schemas.MatchSchema.from_orm(archived).dict())
+
     def test_update(self):
         server = baker.make(models.Server)
         match = baker.make(
@@ -1,10 +1,13 @@
 from datetime import timedelta
 
+from django.conf import settings
+from django.test import override_settings
 from django.utils import timezone
 from model_bakery import baker
 
 from core.tests import TestCase
 from pre_matches.tests.mixins import TeamsMixin
+from profiles import services
 
 from .. import models, tasks
 
@@ -31,3 +34,71 @@ class MatchesTasksTestCase(TeamsMixin, TestCase):
 
         tasks.delete_old_cancelled_matches()
         self.assertEqual(models.Match.objects.all().count(), 0)
+
+    def create_finished_match(self, end_date, score, opponent_score, **stats):
+        match = baker.make(
+            models.Match,
+            server=baker.make(models.Server),
+            status=models.Match.Status.FINISHED,
+            start_date=end_date - timedelta(minutes=30),
+            end_date=end_date,
+        )
+        team = match.matchteam_set.create(name=self.team1.name, score=score, side=1)
+        opponent_team = match.matchteam_set.create(
+            name=self.team2.name,
+            score=opponent_score,
+            side=2,
+        )
+        player = baker.make(models.MatchPlayer, team=team, user=self.user_1)
+        for key, value in stats.items():
+            setattr(player.stats, key, value)
+        player.stats.save()
+        baker.make(models.MatchPlayer, team=opponent_team, user=self.user_2)
+        return match
+
+    @override_settings(MATCHES_ARCHIVE_AFTER_DAYS=30, MATCHES_ARCHIVE_BATCH_SIZE=2)
+    def test_archive_matches(self):
+        rounds_to_win = settings.MATCH_ROUNDS_TO_WIN
+        old = timezone.now() - timedelta(days=60)
+        old_matches = [
+            self.create_finished_match(old, rounds_to_win, 6, kills=10, damage=300),
+            self.create_finished_match(
+                old + timedelta(days=1), rounds_to_win, 8, kills=3, deaths=9
+            ),
+            self.create_finished_match(old + timedelta(days=2), 5, rounds_to_win),
+        ]
+        self.create_finished_match(timezone.now(), rounds_to_win, 2, kills=20)
+        cancelled = baker.make(
+            models.Match,
+            server=baker.make(models.Server),
+            status=models.Match.Status.CANCELLED,
+            end_date=old,
+        )
+
+        account = self.user_1.account
+        profile = services.get_profile_summary(account)
+        latest_results = account.get_latest_matches_results()
+        self.assertEqual(tasks.archive_matches(), 3)
+
+        self.assertEqual(
+            list(models.ArchivedMatch.objects.order_by('id').values_list('id', flat=True)),
+            [match.id for match in old_matches],
+        )
+        self.assertFalse(
+            models.Match.objects.filter(id__in=[m.id for m in old_matches]).exists()
+        )
+        self.assertTrue(models.Match.objects.filter(id=cancelled.id).exists())
+        self.assertEqual(models.ArchivedMatchTeam.objects.count(), 6)
+        self.assertEqual(models.ArchivedMatchPlayerStats.objects.count(), 6)
+
+        summary = models.ArchivedPlayerSummary.objects.get(user=self.user_1)
+        self.assertEqual(summary.matches_played, 3)
+        self.assertEqual(summary.matches_won, 2)
+        self.assertEqual(summary.win_streak, 0)
+        self.assertEqual(summary.highest_win_streak, 2)
+
+        # Profiles and counters read the same data after archiving.
+        self.assertEqual(services.get_profile_summary(account), profile)
+        self.assertEqual(account.get_latest_matches_results(), latest_results)
+        self.assertEqual(account.get_matches_played_count(), 4)
+        self.assertEqual(tasks.archive_matches(), 0)
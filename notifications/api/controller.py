@@ -32,5 +32,9 @@ def read(user, notification_id: int, form: NotificationUpdateSchema) -> Notifica
 
 
 def read_all(user) -> List[Notification]:
-    [item.mark_as_read() for item in user.account.notifications]
+    Notification.mark_many_as_read(user.id)
     return user.account.notifications
+
+
+def unread_count(user) -> dict:
+    return {'count': Notification.get_unread_count(user.id)}
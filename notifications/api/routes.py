@@ -25,6 +25,15 @@ def read_all(request):
     return controller.read_all(user=request.user)
 
 
+@router.get(
+    '/unread-count/',
+    auth=VerifiedRequiredAuth(),
+    response={200: schemas.NotificationUnreadCountSchema},
+)
+def unread_count(request):
+    return controller.unread_count(user=request.user)
+
+
 @router.get(
     '{notification_id}/',
     auth=VerifiedRequiredAuth(),
@@ -4,7 +4,7 @@ from ninja import Schema
 
 class NotificationSchema(Schema):
     id: int
-    to_user_id: int
+    to_user_id: int = None
     content: str
     avatar: str
     create_date: str
@@ -30,3 +30,7 @@ class NotificationSchema(Schema):
 
 class NotificationUpdateSchema(Schema):
     read_date: str = None
+
+
+class NotificationUnreadCountSchema(Schema):
+    count: int
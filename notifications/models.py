@@ -1,8 +1,7 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Tuple
 
-from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.db.models.signals import m2m_changed
@@ -15,13 +14,191 @@ from appsettings.services import (
     max_notification_history_count_per_player as notification_limit,
 )
 from core.redis import redis_client_instance as cache
-from core.utils import str_to_timezone
-from websocket.utils import ws_send
-
-from .api.schemas import NotificationSchema
 
 User = get_user_model()
 
+# Rebuilds the player unread counter (KEYS[2]) from the player history (KEYS[1])
+# when it's missing, eg. for histories created before the counter existed.
+# Must run before the script changes the history or the read dates.
+ENSURE_UNREAD = """
+    local function ensure_unread(prefix, player_id)
+        if redis.call('EXISTS', KEYS[2]) == 1 then
+            return
+        end
+
+        local count = 0
+        for _, id in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+            local key = prefix .. ':' .. id
+            if redis.call('HEXISTS', key, 'system') == 1 then
+                if redis.call('HEXISTS', key .. ':read', player_id) == 0 then
+                    count = count + 1
+                end
+            elseif redis.call('EXISTS', key) == 1
+                and redis.call('HEXISTS', key, 'read_date') == 0 then
+                count = count + 1
+            end
+        end
+        redis.call('SET', KEYS[2], count)
+    end
+"""
+
+# Decrements the player unread counter (KEYS[2]) by `unread`, never below zero.
+DECR_UNREAD = """
+    if unread > 0 and redis.call('DECRBY', KEYS[2], unread) < 0 then
+        redis.call('SET', KEYS[2], 0)
+    end
+"""
+
+# Evicts the oldest entries of a player history (KEYS[1]) above the limit (ARGV[5]),
+# discounting the unread ones from the player counter.
+# System notifications are shared by many histories, so only references are dropped,
+# and they're deleted (along with their read dates) when the last one goes away.
+TRIM_HISTORY = (
+    """
+    local overflow = redis.call('ZCARD', KEYS[1]) - math.max(tonumber(ARGV[5]), 1)
+    local unread = 0
+    if overflow > 0 then
+        local evicted = redis.call('ZPOPMIN', KEYS[1], overflow)
+        for i = 1, #evicted, 2 do
+            local evicted_key = ARGV[1] .. ':' .. evicted[i]
+            if redis.call('HEXISTS', evicted_key, 'system') == 1 then
+                if redis.call('HDEL', evicted_key .. ':read', ARGV[6]) == 0 then
+                    unread = unread + 1
+                end
+                if redis.call('HINCRBY', evicted_key, 'refs', -1) <= 0 then
+                    redis.call('DEL', evicted_key, evicted_key .. ':read')
+                end
+            else
+                if redis.call('HEXISTS', evicted_key, 'read_date') == 0 then
+                    unread = unread + 1
+                end
+                redis.call('DEL', evicted_key)
+            end
+        end
+    end
+"""
+    + DECR_UNREAD
+)
+
+# Saving a notification takes a single round-trip. New entries get an id from the
+# auto id counter (when not given), are added to the player history and the oldest
+# ones above the limit are evicted, along with their hashes.
+#
+# KEYS[1] player history zset, KEYS[2] player unread counter, KEYS[3] auto id counter
+# ARGV[1] prefix, ARGV[2] id or "", ARGV[3] timestamp, ARGV[4] create date,
+# ARGV[5] history limit, ARGV[6] player id, ARGV[7...] hash field/value pairs
+SAVE_SCRIPT = cache.register_script(
+    ENSURE_UNREAD
+    + """
+    ensure_unread(ARGV[1], ARGV[6])
+
+    local id = ARGV[2]
+    if id == '' then
+        id = tostring(redis.call('INCR', KEYS[3]))
+    end
+
+    local key = ARGV[1] .. ':' .. id
+    local created = redis.call('EXISTS', key) == 0
+    local hash = {'id', id}
+    for i = 7, #ARGV do
+        hash[#hash + 1] = ARGV[i]
+    end
+    if created then
+        hash[#hash + 1] = 'create_date'
+        hash[#hash + 1] = ARGV[4]
+    end
+    redis.call('HSET', key, unpack(hash))
+
+    if not created then
+        return {id, 0}
+    end
+
+    redis.call('ZADD', KEYS[1], ARGV[3], id)
+    if redis.call('HEXISTS', key, 'read_date') == 0 then
+        redis.call('INCR', KEYS[2])
+    end
+"""
+    + TRIM_HISTORY
+    + """
+    return {id, 1}
+    """
+)
+
+# Adds a reference to an existing (system) notification to a player history,
+# counting it on the notification `refs` field.
+# Same keys and arguments as the save script, but with no auto id counter,
+# create date and hash fields.
+ADD_REFERENCE_SCRIPT = cache.register_script(
+    ENSURE_UNREAD
+    + """
+    ensure_unread(ARGV[1], ARGV[6])
+
+    if redis.call('ZADD', KEYS[1], ARGV[3], ARGV[2]) == 1 then
+        redis.call('INCR', KEYS[2])
+        redis.call('HINCRBY', ARGV[1] .. ':' .. ARGV[2], 'refs', 1)
+    end
+"""
+    + TRIM_HISTORY
+)
+
+# Drops a reference to a system notification (KEYS[1]), deleting it and its
+# read dates (KEYS[2]) when there are no references left.
+RELEASE_REFERENCE_SCRIPT = cache.register_script(
+    """
+    if redis.call('HINCRBY', KEYS[1], 'refs', -1) <= 0 then
+        redis.call('DEL', KEYS[1], KEYS[2])
+    end
+"""
+)
+
+# Marks notifications as read, all notifications from the player history when
+# no ids are given, and returns how many weren't read before.
+# Read dates aren't overwritten.
+#
+# KEYS[1] player history zset, KEYS[2] player unread counter
+# ARGV[1] prefix, ARGV[2] player id, ARGV[3] read date, ARGV[4...] ids
+MARK_AS_READ_SCRIPT = cache.register_script(
+    ENSURE_UNREAD
+    + """
+    ensure_unread(ARGV[1], ARGV[2])
+
+    local ids = {}
+    for i = 4, #ARGV do
+        ids[#ids + 1] = ARGV[i]
+    end
+    if #ids == 0 then
+        ids = redis.call('ZRANGE', KEYS[1], 0, -1)
+    end
+
+    local unread = 0
+    for _, id in ipairs(ids) do
+        local key = ARGV[1] .. ':' .. id
+        if redis.call('HEXISTS', key, 'system') == 1 then
+            unread = unread + redis.call('HSETNX', key .. ':read', ARGV[2], ARGV[3])
+        elseif redis.call('EXISTS', key) == 1 then
+            unread = unread + redis.call('HSETNX', key, 'read_date', ARGV[3])
+        end
+    end
+"""
+    + DECR_UNREAD
+    + """
+    return unread
+    """
+)
+
+
+# Returns the player unread counter, rebuilding it first when missing.
+#
+# KEYS[1] player history zset, KEYS[2] player unread counter
+# ARGV[1] prefix, ARGV[2] player id
+UNREAD_COUNT_SCRIPT = cache.register_script(
+    ENSURE_UNREAD
+    + """
+    ensure_unread(ARGV[1], ARGV[2])
+    return tonumber(redis.call('GET', KEYS[2]))
+    """
+)
+
 
 class NotificationError(Exception):
     pass
@@ -43,6 +220,11 @@ class Notification(BaseModel):
     This model represents the notifications on Redis cache db.
     We store `MAX_NOTIFICATIONS_HISTORY` notifications per user.
 
+    System notifications are stored once, flagged with `system`, and only their
+    ids are added to each recipient history. The recipient and read date are
+    resolved when reading, from the `read` hash. They keep count of the histories
+    referencing them (`refs`), so they're deleted once evicted from all of them.
+
     The Redis db keys from this model are described below:
 
     [key]   __mm:notifications:auto_id int
@@ -55,40 +237,49 @@ class Notification(BaseModel):
         create_date: timezone.datetime
         read_date: timezone.datetime
         avatar: str
+        system: bool
+        refs: int
+    }>
+    [hash]  __mm:notifications:[id]:read <{
+        [user_id]: timezone.datetime
     }>
     """
 
     id: int
-    to_user_id: int
+    to_user_id: int = None
     content: str
     avatar: str
     from_user_id: int = None
+    create_date: timezone.datetime = None
     read_date: timezone.datetime = None
+    system: bool = False
 
     class Config:
         CACHE_PREFIX: str = '__mm:notifications'
+        FANOUT_BATCH_SIZE: int = 1000
 
     @property
     def cache_key(self) -> str:
         return f'{Notification.Config.CACHE_PREFIX}:{self.id}'
 
     @property
-    def create_date(self) -> timezone.datetime:
-        return str_to_timezone(cache.hget(self.cache_key, 'create_date'))
-
-    def save(self) -> bool:
-        existing_entry = cache.hgetall(self.cache_key)
-        now = timezone.now()
-        if not existing_entry:
-            create_date = now.isoformat()
-        else:
-            create_date = existing_entry.get('create_date')
+    def read_cache_key(self) -> str:
+        return f'{self.cache_key}:read'
 
+    @staticmethod
+    def get_player_keys(user_id: int) -> List[str]:
+        """
+        Player history and unread counter keys, as expected by the Lua scripts.
+        """
+        return [
+            f'{Notification.Config.CACHE_PREFIX}:player:{user_id}',
+            f'{Notification.Config.CACHE_PREFIX}:player:{user_id}:unread',
+        ]
+
+    def to_hash(self) -> dict:
         hash = {
-            'id': self.id,
             'to_user_id': self.to_user_id,
             'content': self.content,
-            'create_date': create_date,
             'avatar': self.avatar,
         }
 
@@ -98,34 +289,75 @@ class Notification(BaseModel):
         if self.read_date:
             hash.update({'read_date': self.read_date.isoformat()})
 
-        cache.hmset(
-            self.cache_key,
-            hash,
-        )
+        return hash
 
-        if not existing_entry:
-            notifications_count = cache.zcount(
-                f'__mm:notifications:player:{self.to_user_id}', '-inf', '+inf'
-            )
-
-            if notifications_count >= notification_limit():
-                popped = cache.zpopmin(
-                    f'__mm:notifications:player:{self.to_user_id}', 1
-                )
-                notification = Notification.get_by_id(popped[0][0])
-                cache.delete(notification.cache_key)
+    def save(self) -> Tuple[bool, Notification]:
+        """
+        Run the save script, that writes the notification hash and, for new entries,
+        adds it to the player history evicting the oldest ones above the limit.
+        The notification id is allocated by the script if there is none.
+        """
+        now = timezone.now()
+        args = [
+            Notification.Config.CACHE_PREFIX,
+            self.id or '',
+            now.timestamp(),
+            now.isoformat(),
+            notification_limit(),
+            self.to_user_id,
+        ]
+        for field, value in self.to_hash().items():
+            args.extend([field, value])
+
+        id, created = SAVE_SCRIPT(
+            keys=[
+                *Notification.get_player_keys(self.to_user_id),
+                f'{Notification.Config.CACHE_PREFIX}:auto_id',
+            ],
+            args=args,
+        )
 
-            cache.zadd(
-                f'__mm:notifications:player:{self.to_user_id}',
-                {self.id: now.timestamp()},
-            )
+        self.id = int(id)
+        if created:
+            self.create_date = now
 
-        created = not existing_entry
-        return (created, self)
+        return (bool(created), self)
 
     def mark_as_read(self):
         self.read_date = timezone.now()
-        self.save()
+        Notification.mark_many_as_read(self.to_user_id, [self.id], self.read_date)
+
+    @staticmethod
+    def mark_many_as_read(
+        user_id: int,
+        ids: List[int] = None,
+        read_date: timezone.datetime = None,
+    ) -> int:
+        """
+        Mark notifications from a user as read, in a single round-trip.
+
+        :params ids list: Notification ids, or `None` to mark all user notifications.
+        :return: How many notifications weren't read before.
+        """
+        read_date = read_date or timezone.now()
+        return MARK_AS_READ_SCRIPT(
+            keys=Notification.get_player_keys(user_id),
+            args=[
+                Notification.Config.CACHE_PREFIX,
+                user_id,
+                read_date.isoformat(),
+                *(ids or []),
+            ],
+        )
+
+    @staticmethod
+    def get_unread_count(user_id: int) -> int:
+        return int(
+            UNREAD_COUNT_SCRIPT(
+                keys=Notification.get_player_keys(user_id),
+                args=[Notification.Config.CACHE_PREFIX, user_id],
+            )
+        )
 
     @staticmethod
     def incr_auto_id() -> int:
@@ -137,17 +369,62 @@ class Notification(BaseModel):
         return int(count) if count else 0
 
     @staticmethod
-    def create_system_notifications(
+    def create_system_notification(
         content: str,
         avatar: str,
         to_user_ids: List[int],
-    ) -> List[Notification]:
-        notifications = list()
-        for to_id in to_user_ids:
-            n = Notification.create(content, avatar, to_id)
-            notifications.append(n)
+    ) -> Notification:
+        """
+        Store a system notification once and add it to each recipient history,
+        pipelining the references in batches. The notification holds a reference
+        of its own while the references are added, so it isn't deleted midway by
+        an eviction (or kept with no recipients).
+
+        :return: The shared notification, with no `to_user_id`.
+        """
+        now = timezone.now()
+        notification = Notification(
+            id=Notification.incr_auto_id(),
+            content=content,
+            avatar=avatar,
+            create_date=now,
+            system=True,
+        )
+        cache.hset(
+            notification.cache_key,
+            mapping={
+                'id': notification.id,
+                'content': content,
+                'avatar': avatar,
+                'create_date': now.isoformat(),
+                'system': 1,
+                'refs': 1,
+            },
+        )
 
-        return notifications
+        limit = notification_limit()
+        batch_size = Notification.Config.FANOUT_BATCH_SIZE
+        for index in range(0, len(to_user_ids), batch_size):
+            with cache.pipeline(transaction=False) as pipe:
+                for to_user_id in to_user_ids[index:index + batch_size]:
+                    ADD_REFERENCE_SCRIPT(
+                        keys=Notification.get_player_keys(to_user_id),
+                        args=[
+                            Notification.Config.CACHE_PREFIX,
+                            notification.id,
+                            now.timestamp(),
+                            '',
+                            limit,
+                            to_user_id,
+                        ],
+                        client=pipe,
+                    )
+                pipe.execute()
+
+        RELEASE_REFERENCE_SCRIPT(
+            keys=[notification.cache_key, notification.read_cache_key]
+        )
+        return notification
 
     @staticmethod
     def create(
@@ -156,9 +433,8 @@ class Notification(BaseModel):
         to_user_id: int,
         from_user_id: int = None,
     ) -> Notification:
-        auto_id = Notification.incr_auto_id()
         notification = Notification(
-            id=auto_id,
+            id=0,
             from_user_id=from_user_id,
             to_user_id=to_user_id,
             content=content,
@@ -169,40 +445,66 @@ class Notification(BaseModel):
 
     @staticmethod
     def get_all_by_user_id(user_id: int) -> List[Notification]:
-        results = cache.zrange(f'__mm:notifications:player:{user_id}', 0, -1)
-        return [Notification.get_by_id(result) for result in results]
+        """
+        Fetch a user notifications history, with all hashes (and system notifications
+        read dates) loaded in a single pipeline.
+        """
+        ids = cache.zrange(Notification.get_player_keys(user_id)[0], 0, -1)
+        if not ids:
+            return []
+
+        with cache.pipeline(transaction=False) as pipe:
+            for id in ids:
+                pipe.hgetall(f'{Notification.Config.CACHE_PREFIX}:{id}')
+                pipe.hget(f'{Notification.Config.CACHE_PREFIX}:{id}:read', user_id)
+            results = pipe.execute()
+
+        return [
+            Notification.from_hash(result, user_id, read_date)
+            for result, read_date in zip(results[::2], results[1::2])
+            if result
+        ]
 
     @staticmethod
-    def get_by_id(id: int) -> Notification:
-        result = cache.hgetall(f'__mm:notifications:{id}')
+    def get_by_id(id: int, user_id: int = None) -> Notification:
+        """
+        :params user_id int: The recipient that system notifications are resolved to.
+        """
+        result = cache.hgetall(f'{Notification.Config.CACHE_PREFIX}:{id}')
         if not result:
             raise NotificationError(_('Notification not found.'))
 
+        read_date = None
+        if result.get('system') and user_id:
+            read_date = cache.hget(
+                f'{Notification.Config.CACHE_PREFIX}:{id}:read',
+                user_id,
+            )
+
+        return Notification.from_hash(result, user_id, read_date)
+
+    @staticmethod
+    def from_hash(
+        result: dict,
+        user_id: int = None,
+        read_date: str = None,
+    ) -> Notification:
+        if result.get('system') and user_id:
+            result.update({'to_user_id': user_id, 'read_date': read_date})
+
         return Notification(**result)
 
 
 def system_notification_to_users_changed(sender, instance, action, **kwargs):
-    if action == 'post_add':
-        to_users_ids = list(
-            User.objects.filter(pk__in=kwargs.get('pk_set')).values_list(
-                'pk', flat=True
-            )
+    if action == 'post_add' and kwargs.get('pk_set'):
+        # import here because tasks depends on this module
+        from .tasks import send_system_notification
+
+        send_system_notification.delay(
+            instance.content,
+            SystemNotification.AVATAR,
+            [*kwargs.get('pk_set')],
         )
-        notifications = Notification.create_system_notifications(
-            content=instance.content,
-            avatar=SystemNotification.AVATAR,
-            to_user_ids=to_users_ids,
-        )
-
-        # send websockets here because there is no way to import
-        # ws_send_notification without circular import
-        for notification in notifications:
-            payload = NotificationSchema.from_orm(notification).dict()
-            async_to_sync(ws_send)(
-                'notifications/add',
-                payload,
-                groups=[notification.to_user_id],
-            )
 
 
 m2m_changed.connect(
@@ -0,0 +1,16 @@
+from typing import List
+
+from celery import shared_task
+
+from .models import Notification
+from .websocket import ws_new_system_notification
+
+
+@shared_task
+def send_system_notification(content: str, avatar: str, to_user_ids: List[int]):
+    notification = Notification.create_system_notification(
+        content,
+        avatar,
+        to_user_ids,
+    )
+    ws_new_system_notification(notification, to_user_ids)
@@ -3,7 +3,8 @@ from unittest import mock
 from django.templatetags.static import static
 
 from accounts.tests.mixins import VerifiedAccountsMixin
-from core.tests import TestCase
+from appsettings.models import AppSettings
+from core.tests import TestCase, cache
 from notifications.models import Notification, NotificationError, SystemNotification
 from steam import Steam
 
@@ -40,6 +41,29 @@ class NotificationsNotificationModelTestCase(VerifiedAccountsMixin, TestCase):
         with self.assertRaises(NotificationError):
             Notification.get_by_id(first_created_id)
 
+    def test_create_history_limit(self):
+        AppSettings.objects.create(
+            kind=AppSettings.INTEGER,
+            name='Max Notification Count Per Player',
+            value='3',
+        )
+        created = [
+            Notification.create(
+                content='New notification',
+                avatar=SystemNotification.AVATAR,
+                to_user_id=self.user_2.id,
+            )
+            for _ in range(0, 5)
+        ]
+
+        self.assertEqual(
+            [n.id for n in Notification.get_all_by_user_id(self.user_2.id)],
+            [n.id for n in created[2:]],
+        )
+        self.assertFalse(cache.exists(created[0].cache_key))
+        self.assertFalse(cache.exists(created[1].cache_key))
+        self.assertEqual(Notification.get_auto_id(), 5)
+
     def test_get_all_by_user_id(self):
         Notification.create(
             content='New notification',
@@ -110,25 +134,136 @@ class NotificationsNotificationModelTestCase(VerifiedAccountsMixin, TestCase):
         n.mark_as_read()
         self.assertIsNotNone(n.read_date)
 
-    def test_create_system_notifications(self):
-        notifications = Notification.create_system_notifications(
+    def test_unread_count(self):
+        self.assertEqual(Notification.get_unread_count(self.user_1.id), 0)
+
+        n1 = Notification.create('n1', SystemNotification.AVATAR, self.user_1.id)
+        Notification.create('n2', SystemNotification.AVATAR, self.user_1.id)
+        Notification.create_system_notification(
+            'System notification',
+            SystemNotification.AVATAR,
+            [self.user_1.id, self.user_2.id],
+        )
+        self.assertEqual(Notification.get_unread_count(self.user_1.id), 3)
+        self.assertEqual(Notification.get_unread_count(self.user_2.id), 1)
+
+        n1.mark_as_read()
+        n1.mark_as_read()
+        self.assertEqual(Notification.get_unread_count(self.user_1.id), 2)
+
+        self.assertEqual(Notification.mark_many_as_read(self.user_1.id), 2)
+        self.assertEqual(Notification.get_unread_count(self.user_1.id), 0)
+        self.assertEqual(Notification.get_unread_count(self.user_2.id), 1)
+        self.assertTrue(
+            all(n.read_date for n in Notification.get_all_by_user_id(self.user_1.id))
+        )
+
+    def test_unread_count_rebuild(self):
+        n1 = Notification.create('n1', SystemNotification.AVATAR, self.user_1.id)
+        Notification.create('n2', SystemNotification.AVATAR, self.user_1.id)
+        system = Notification.create_system_notification(
+            'System notification',
+            SystemNotification.AVATAR,
+            [self.user_1.id],
+        )
+        n1.mark_as_read()
+        Notification.get_by_id(system.id, self.user_1.id).mark_as_read()
+
+        # Histories from before the counter existed have no counter key.
+        cache.delete(Notification.get_player_keys(self.user_1.id)[1])
+        self.assertEqual(Notification.get_unread_count(self.user_1.id), 1)
+
+        cache.delete(Notification.get_player_keys(self.user_1.id)[1])
+        Notification.create('n3', SystemNotification.AVATAR, self.user_1.id)
+        self.assertEqual(Notification.get_unread_count(self.user_1.id), 2)
+
+    def test_unread_count_eviction(self):
+        AppSettings.objects.create(
+            kind=AppSettings.INTEGER,
+            name='Max Notification Count Per Player',
+            value='2',
+        )
+        for _ in range(0, 4):
+            Notification.create('n', SystemNotification.AVATAR, self.user_1.id)
+
+        self.assertEqual(Notification.get_unread_count(self.user_1.id), 2)
+
+    def test_create_system_notification(self):
+        notification = Notification.create_system_notification(
             content='System notification',
             avatar=static('icons/broadcast.png'),
             to_user_ids=[self.user_1.id, self.user_2.id, self.user_4.id],
         )
-        self.assertEqual(len(notifications), 3)
+        self.assertTrue(notification.system)
+        self.assertIsNone(notification.to_user_id)
+        self.assertEqual(Notification.get_auto_id(), 1)
+
+        for user in [self.user_1, self.user_2, self.user_4]:
+            n = Notification.get_all_by_user_id(user.id)[0]
+            self.assertEqual(n.id, notification.id)
+            self.assertEqual(n.to_user_id, user.id)
+            self.assertEqual(n.content, 'System notification')
+            self.assertIsNone(n.read_date)
+
+        self.assertEqual(Notification.get_all_by_user_id(self.user_3.id), [])
+
+    def test_mark_system_notification_as_read(self):
+        notification = Notification.create_system_notification(
+            content='System notification',
+            avatar=static('icons/broadcast.png'),
+            to_user_ids=[self.user_1.id, self.user_2.id],
+        )
+        Notification.get_by_id(notification.id, self.user_1.id).mark_as_read()
 
-        n1 = notifications[0]
-        n2 = notifications[1]
-        n3 = notifications[2]
+        n1 = Notification.get_by_id(notification.id, self.user_1.id)
+        n2 = Notification.get_by_id(notification.id, self.user_2.id)
+        self.assertIsNotNone(n1.read_date)
+        self.assertIsNone(n2.read_date)
 
-        self.assertEqual(n1.to_user_id, self.user_1.id)
-        self.assertEqual(n2.to_user_id, self.user_2.id)
-        self.assertEqual(n3.to_user_id, self.user_4.id)
+    def test_system_notification_eviction(self):
+        AppSettings.objects.create(
+            kind=AppSettings.INTEGER,
+            name='Max Notification Count Per Player',
+            value='1',
+        )
+        notification = Notification.create_system_notification(
+            content='System notification',
+            avatar=static('icons/broadcast.png'),
+            to_user_ids=[self.user_1.id, self.user_2.id],
+        )
+        Notification.create(
+            content='New notification',
+            avatar=SystemNotification.AVATAR,
+            to_user_id=self.user_1.id,
+        )
+
+        self.assertEqual(len(Notification.get_all_by_user_id(self.user_1.id)), 1)
+        self.assertTrue(cache.exists(notification.cache_key))
+        self.assertEqual(
+            Notification.get_all_by_user_id(self.user_2.id)[0].id,
+            notification.id,
+        )
+
+        Notification.get_by_id(notification.id, self.user_2.id).mark_as_read()
+        Notification.create(
+            content='New notification',
+            avatar=SystemNotification.AVATAR,
+            to_user_id=self.user_2.id,
+        )
+        self.assertFalse(cache.exists(notification.cache_key))
+        self.assertFalse(cache.exists(notification.read_cache_key))
+
+    def test_create_system_notification_no_recipients(self):
+        notification = Notification.create_system_notification(
+            content='System notification',
+            avatar=static('icons/broadcast.png'),
+            to_user_ids=[],
+        )
+        self.assertFalse(cache.exists(notification.cache_key))
 
 
 class NotificationsSystemNotificationModelTestCase(VerifiedAccountsMixin, TestCase):
-    @mock.patch('notifications.models.ws_send')
+    @mock.patch('notifications.websocket.ws_send')
     def test_system_notification_to_users_changed_signal(self, mock_ws_send):
         n = SystemNotification(content='Sys Notification')
         n.save()
@@ -139,4 +274,9 @@ class NotificationsSystemNotificationModelTestCase(VerifiedAccountsMixin, TestCa
 
         self.assertEqual(len(user1_notifications), 1)
         self.assertEqual(len(user2_notifications), 1)
-        self.assertEqual(mock_ws_send.call_count, 2)
+        self.assertEqual(user1_notifications[0].id, user2_notifications[0].id)
+        self.assertEqual(mock_ws_send.call_count, 1)
+        self.assertCountEqual(
+            mock_ws_send.call_args[1]['groups'],
+            [self.user_1.id, self.user_2.id],
+        )
@@ -68,3 +68,14 @@ class NotificationsRoutesTestCase(VerifiedAccountsMixin, TestCase):
             item.read_date is not None for item in self.user_1.account.notifications
         )
         assert all(item.get('read_date') is not None for item in r.json())
+
+    def test_unread_count(self):
+        r = self.api.call('get', '/unread-count', token=self.user_1.auth.token)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json(), {'count': 0})
+
+        Notification.create(
+            'notification 1', static('icons/broadcast.png'), self.user_1.id
+        )
+        r = self.api.call('get', '/unread-count', token=self.user_1.auth.token)
+        self.assertEqual(r.json(), {'count': 1})
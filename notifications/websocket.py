@@ -1,3 +1,5 @@
+from typing import List
+
 from asgiref.sync import async_to_sync
 
 from websocket.utils import ws_send
@@ -27,3 +29,30 @@ def ws_new_notification(notification: Notification):
         payload,
         groups=[notification.to_user_id],
     )
+
+
+def ws_new_system_notification(notification: Notification, to_user_ids: List[int]):
+    """
+    Triggered when a system notification is sent to users. The same message is
+    broadcasted to all recipients groups, in batches, with no `to_user_id`.
+
+    Cases:
+    - An admin sends a system notification.
+
+    Payload:
+    notifications.api.schemas.NotificationSchema: object
+
+    Actions:
+    - notifications/add
+    """
+    payload = NotificationSchema.from_orm(notification).dict()
+
+    batch_size = Notification.Config.FANOUT_BATCH_SIZE
+    for index in range(0, len(to_user_ids), batch_size):
+        async_to_sync(ws_send)(
+            'notifications/add',
+            payload,
+            groups=to_user_ids[index:index + batch_size],
+        )
+
+    return payload
@@ -190,6 +190,30 @@ class PreMatch(BaseModel):
             raise PreMatchException(_('PreMatch not found.'))
         return PreMatch(id=id)
 
+    @staticmethod
+    def get_by_team_ids(team_ids: list) -> dict:
+        """
+        Get the pre match of each given team with a single MGET.
+        Returns a dict of team id to pre match, without the teams that aren't on any.
+        """
+        team_ids = list(set(team_ids))
+        if not team_ids:
+            return {}
+
+        pre_match_ids = cache.mget(
+            [f'{Team(id=team_id).cache_key}:pre_match' for team_id in team_ids]
+        )
+        pre_matches = {
+            team_id: PreMatch.get_by_id(pre_match_id, fail_silently=True)
+            for team_id, pre_match_id in zip(team_ids, pre_match_ids)
+            if pre_match_id
+        }
+        return {
+            team_id: pre_match
+            for team_id, pre_match in pre_matches.items()
+            if pre_match
+        }
+
     @staticmethod
     def get_by_team_id(team1_id: str, team2_id: str = None):
         keys = list(cache.scan_keys(f'{PreMatch.Config.CACHE_PREFIX}*'))
@@ -31,6 +31,7 @@ class TeamConfig:
     """
 
     CACHE_PREFIX: str = "__mm:team:"
+    LOBBY_CACHE_PREFIX: str = "__mm:lobby_team:"
     ID_SIZE: int = 16
 
 
@@ -52,6 +53,10 @@ class Team(BaseModel):
     [key] __mm:team:[team_id]:pre_match <pre_match_id>
     Stores a pre_match that team is on. It should not exists
     if team isn't in any pre_match.
+
+    [key] __mm:lobby_team:[lobby_id] <team_id>
+    Stores the team a lobby is on, so teams can be found by lobby
+    without scanning all teams.
     """
 
     id: str = None
@@ -219,6 +224,42 @@ class Team(BaseModel):
 
         return team
 
+    @staticmethod
+    def get_lobby_key(lobby_id: int) -> str:
+        return f"{TeamConfig.LOBBY_CACHE_PREFIX}{lobby_id}"
+
+    @staticmethod
+    def get_by_lobby_ids(lobbies_ids: list) -> dict:
+        """
+        Get the team of each given lobby with a single MGET on the lobby index.
+        Returns a dict of lobby id to team, without the lobbies that aren't on any.
+
+        Queued lobbies missing on the index (eg. teams made before it existed)
+        fall back to `get_by_lobby_id`.
+        """
+        lobbies_ids = list(set(lobbies_ids))
+        if not lobbies_ids:
+            return {}
+
+        team_ids = cache.mget([Team.get_lobby_key(id) for id in lobbies_ids])
+        teams = {
+            lobby_id: Team(id=team_id)
+            for lobby_id, team_id in zip(lobbies_ids, team_ids)
+            if team_id
+        }
+
+        not_indexed = [id for id in lobbies_ids if id not in teams]
+        if not_indexed:
+            queues = cache.mget(
+                [f"{Lobby(owner_id=id).cache_key}:queue" for id in not_indexed]
+            )
+            for lobby_id, queue in zip(not_indexed, queues):
+                team = queue and Team.get_by_lobby_id(lobby_id, fail_silently=True)
+                if team:
+                    teams[lobby_id] = team
+
+        return teams
+
     @staticmethod
     def get_by_id(id: str, raise_error: bool = False) -> Team:
         """
@@ -257,7 +298,12 @@ class Team(BaseModel):
             raise TeamException(_("Lobbies not queued"))
 
         team_id = secrets.token_urlsafe(TeamConfig.ID_SIZE)
-        cache.sadd(f"{TeamConfig.CACHE_PREFIX}{team_id}", *lobbies_ids)
+        with cache.pipeline() as pipe:
+            pipe.sadd(f"{TeamConfig.CACHE_PREFIX}{team_id}", *lobbies_ids)
+            for lobby_id in lobbies_ids:
+                pipe.set(Team.get_lobby_key(lobby_id), team_id)
+            pipe.execute()
+
         return Team.get_by_id(team_id)
 
     def delete(self):
@@ -265,6 +311,7 @@ class Team(BaseModel):
         Delete team from Redis db.
         """
         keys = list(cache.scan_keys(f"{self.cache_key}:*"))
+        keys += [Team.get_lobby_key(lobby_id) for lobby_id in self.lobbies_ids]
         if keys:
             cache.delete(*keys)
 
@@ -283,6 +330,7 @@ class Team(BaseModel):
             if self.ready:
                 raise TeamException(_("Team is full. Can't add a lobby."))
             pipe.sadd(self.cache_key, lobby_id)
+            pipe.set(Team.get_lobby_key(lobby_id), self.id)
 
         cache.protected_handler(
             transaction_operations,
@@ -304,6 +352,7 @@ class Team(BaseModel):
             if self.pre_match_id:
                 raise TeamException(_("Can't remove a lobby while in pre_match."))
             cache.srem(self.cache_key, lobby_id)
+            cache.delete(Team.get_lobby_key(lobby_id))
 
         cache.protected_handler(
             transaction_operations,
@@ -208,6 +208,30 @@ class TeamModelTestCase(VerifiedAccountsMixin, TestCase):
         with self.assertRaises(TeamException):
             Team.get_by_lobby_id("unknown_lobby_id")
 
+    def test_get_by_lobby_ids(self):
+        self.lobby1.start_queue()
+        self.lobby2.start_queue()
+        self.lobby3.start_queue()
+        team = Team.create(
+            lobbies_ids=[self.lobby1.id, self.lobby2.id, self.lobby3.id]
+        )
+
+        teams = Team.get_by_lobby_ids([self.lobby1.id, self.lobby2.id, self.lobby4.id])
+        self.assertEqual(teams, {self.lobby1.id: team, self.lobby2.id: team})
+
+        team.remove_lobby(self.lobby2.id)
+        self.assertEqual(
+            Team.get_by_lobby_ids([self.lobby1.id, self.lobby2.id]),
+            {self.lobby1.id: team},
+        )
+
+        # Teams made before the lobby index existed.
+        cache.delete(Team.get_lobby_key(self.lobby1.id))
+        self.assertEqual(Team.get_by_lobby_ids([self.lobby1.id]), {self.lobby1.id: team})
+
+        team.delete()
+        self.assertEqual(Team.get_by_lobby_ids([self.lobby1.id]), {})
+
     def test_delete(self):
         self.lobby1.start_queue()
         team = Team.create(lobbies_ids=[self.lobby1.id])
@@ -516,6 +540,19 @@ class PreMatchModelTestCase(VerifiedAccountsMixin, TestCase):
         result3 = PreMatch.get_by_team_id(self.team1.id, self.team2.id)
         self.assertEqual(pre_match, result3)
 
+    def test_get_by_team_ids(self):
+        self.assertEqual(PreMatch.get_by_team_ids([self.team1.id]), {})
+
+        pre_match = PreMatch.create(
+            self.team1.id,
+            self.team2.id,
+            self.team1.mode,
+        )
+        self.assertEqual(
+            PreMatch.get_by_team_ids([self.team1.id, self.team2.id, 'unknown']),
+            {self.team1.id: pre_match, self.team2.id: pre_match},
+        )
+
     def test_delete_all_keys(self):
         pre_match = PreMatch.create(
             self.team1.id,
@@ -1,9 +1,11 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Case, Value, When
 from django.shortcuts import get_object_or_404
 
 from accounts.models import Account
-from friends.api.schemas import FriendSchema
+from friends.api.schemas import FriendSchema, prefetch_friends
 
 from . import schemas
 
@@ -38,11 +40,46 @@ def update(user: User, payload: schemas.ProfileUpdateSchema):
     return user.account
 
 
-def search(query: str):
-    qs = Account.objects.filter(
-        Q(username__contains=query) | Q(user__email__contains=query),
-        user__is_active=True,
-        is_verified=True,
-        user__is_staff=False,
+def search_queryset(query: str):
+    """
+    Verified accounts whose username or email contains the query, ranked by exact
+    username, username prefix and then trigram similarity.
+
+    Each column is matched on its own subquery, so each one is served by its trigram
+    index (`accounts_username_trgm_idx` and `accounts_user_email_trgm_idx`), instead
+    of an OR across the accounts and users join that no index can serve.
+    """
+    matching_ids = (
+        Account.objects.filter(username__icontains=query)
+        .values('id')
+        .union(Account.objects.filter(user__email__icontains=query).values('id'))
+    )
+    return (
+        Account.objects.filter(
+            id__in=matching_ids,
+            user__is_active=True,
+            is_verified=True,
+            user__is_staff=False,
+        )
+        .annotate(
+            match_rank=Case(
+                When(username__iexact=query, then=Value(0)),
+                When(username__istartswith=query, then=Value(1)),
+                default=Value(2),
+            ),
+            similarity=TrigramSimilarity('username', query),
+        )
+        .order_by('match_rank', '-similarity', 'username', 'id')
+        .select_related('user')
     )
-    return [FriendSchema.from_orm(account) for account in qs]
+
+
+def search(query: str, page: int = 1, page_size: int = None):
+    """
+    Search verified accounts by username or email (see `search_queryset`),
+    serializing only the requested page.
+    """
+    page_size = page_size or settings.PROFILES_SEARCH_PAGE_SIZE
+    offset = (max(page, 1) - 1) * page_size
+    qs = search_queryset(query)[offset:offset + page_size]
+    return [FriendSchema.from_orm(account) for account in prefetch_friends(qs)]
@@ -28,5 +28,5 @@ def update(request, payload: ProfileUpdateSchema):
 
 
 @router.get("/search", auth=VerifiedRequiredAuth(), response={200: List[FriendSchema]})
-def search(request, query: str):
-    return controller.search(query)
+def search(request, query: str, page: int = 1):
+    return controller.search(query, page)
@@ -5,10 +5,11 @@ from ninja import ModelSchema
 
 from accounts.models import Account
 from core.utils import get_full_file_path
-from matches.api.schemas import MatchPlayerStatsSchema
-from matches.models import Match, MatchPlayerStats
+from matches.models import MatchPlayerStats
 from store.models import Item
 
+from .. import services
+
 User = get_user_model()
 
 
@@ -75,68 +76,43 @@ class ProfileSchema(ModelSchema):
     def resolve_avatar(obj):
         return obj.avatar_dict
 
+    @staticmethod
+    def get_summary(obj) -> dict:
+        # Computed once per serialization and shared by the resolvers below.
+        # ModelSchema can't override `from_orm` (its metaclass recreates the class,
+        # so `super` can't be used in the body).
+        if not hasattr(obj, '_profile_summary'):
+            obj._profile_summary = services.get_profile_summary(obj)
+
+        return obj._profile_summary
+
     @staticmethod
     def resolve_matches_played(obj):
-        return obj.get_matches_played_count()
+        return ProfileSchema.get_summary(obj)['matches_played']
+
+    @staticmethod
+    def resolve_matches_won(obj):
+        return ProfileSchema.get_summary(obj)['matches_won']
+
+    @staticmethod
+    def resolve_highest_win_streak(obj):
+        return ProfileSchema.get_summary(obj)['highest_win_streak']
 
     @staticmethod
     def resolve_latest_matches_results(obj):
-        return obj.get_latest_matches_results()
+        return ProfileSchema.get_summary(obj)['latest_matches_results']
 
     @staticmethod
     def resolve_stats(obj):
-        match_players_stats = [
-            MatchPlayerStatsSchema.from_orm(stat).dict()
-            for stat in MatchPlayerStats.objects.filter(
-                player__user__id=obj.user.id,
-                player__team__match__status=Match.Status.FINISHED,
-            )
-        ]
-
-        aggregated_stats = {}
-
-        for stats in match_players_stats:
-            for key, value in stats.items():
-                if key not in aggregated_stats:
-                    aggregated_stats[key] = value
-                else:
-                    aggregated_stats[key] += value
-
-        if aggregated_stats:
-            for key in MatchPlayerStats.RATIO_STATS:
-                aggregated_stats[key] = (
-                    '{:.2f}'.format(
-                        float(aggregated_stats[key]) / len(match_players_stats)
-                    )
-                    if len(match_players_stats) > 0
-                    else '{:.2f}'.format(0.0)
-                )
-
-            for key in MatchPlayerStats.PERCENTAGE_STATS:
-                aggregated_stats[key] = (
-                    int(aggregated_stats[key] / len(match_players_stats))
-                    if len(match_players_stats) > 0
-                    else 0
-                )
-
-            for key, stat in MatchPlayerStats.ROUND_STATS:
-                aggregated_stats[key] = (
-                    '{:.2f}'.format(
-                        aggregated_stats[stat] / aggregated_stats['rounds_played']
-                    )
-                    if aggregated_stats.get('rounds_played') > 0
-                    else '{:.2f}'.format(0.0)
-                )
-
-        return aggregated_stats
+        return ProfileSchema.get_summary(obj)['stats']
 
     @staticmethod
     def resolve_most_kills_in_a_match(obj):
-        return obj.get_most_stat_in_match('kills')
+        return ProfileSchema.get_summary(obj)['most_kills_in_a_match']
 
     @staticmethod
     def resolve_most_damage_in_a_match(obj):
-        return obj.get_most_stat_in_match('damage')
+        return ProfileSchema.get_summary(obj)['most_damage_in_a_match']
 
     @staticmethod
     def resolve_date_joined(obj):
@@ -167,17 +143,7 @@ class ProfileSchema(ModelSchema):
 
     @staticmethod
     def resolve_ranking_pos(obj):
-        ids = (
-            Account.verified_objects.all()
-            .order_by('-level', '-level_points')
-            .values_list('id', flat=True)
-        )
-        pos = 1
-        for idx, id in enumerate(ids):
-            if id == obj.id:
-                pos = idx + 1
-
-        return pos
+        return ProfileSchema.get_summary(obj)['ranking_pos']
 
 
 class ProfileUpdateSchema(ModelSchema):
@@ -0,0 +1,396 @@
+from typing import Dict, List
+
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    F,
+    Max,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Floor, Round
+
+from accounts.models import Account
+from matches.models import (
+    ArchivedMatchPlayer,
+    ArchivedMatchTeam,
+    ArchivedPlayerSummary,
+    Match,
+    MatchPlayer,
+    MatchPlayerStats,
+    MatchTeam,
+)
+
+STATS_FIELDS = [
+    'kills',
+    'deaths',
+    'assists',
+    'damage',
+    'hs_kills',
+    'afk',
+    'plants',
+    'defuses',
+    'double_kills',
+    'triple_kills',
+    'quadra_kills',
+    'aces',
+    'clutch_v1',
+    'clutch_v2',
+    'clutch_v3',
+    'clutch_v4',
+    'clutch_v5',
+    'firstkills',
+    'shots_fired',
+    'head_shots',
+    'chest_shots',
+    'other_shots',
+]
+
+# Totals kept by their highest value (instead of summed) when merging.
+MAX_TOTALS = ['most_kills_in_a_match', 'most_damage_in_a_match']
+
+SHOTS_HIT = F('head_shots') + F('chest_shots') + F('other_shots')
+
+
+def _decimal(expression):
+    return Cast(expression, DecimalField(max_digits=20, decimal_places=10))
+
+
+def _when_positive(lookup: str, then, default=Value(0)):
+    return Case(
+        When(**{f'{lookup}__gt': 0}, then=then),
+        default=default,
+        output_field=DecimalField(),
+    )
+
+
+def _ratio(dividend, divisor: str, default=Value(0)):
+    """
+    Per match ratio rounded to 2 decimal places,
+    just like `MatchPlayerStats` ratio properties.
+    """
+    return _when_positive(
+        divisor,
+        Round(_decimal(dividend) / F(divisor), 2),
+        default=default,
+    )
+
+
+def _percentage(part, total, lookup: str, rounding=Round):
+    """
+    Per match percentage, just like `MatchPlayerStats` percentage properties.
+    """
+    return _when_positive(lookup, rounding(_decimal(part) * 100 / total))
+
+
+def match_rounds_subquery(match_ref: str, team_model=MatchTeam) -> Subquery:
+    """
+    How many rounds were played on the referenced match (see `Match.rounds`).
+    """
+    return Subquery(
+        team_model.objects.filter(match_id=OuterRef(match_ref))
+        .order_by()
+        .values('match_id')
+        .annotate(total=Sum('score'))
+        .values('total')
+    )
+
+
+def opponent_score_subquery(
+    team_ref: str, match_ref: str, team_model=MatchTeam
+) -> Subquery:
+    """
+    The score of the team facing the referenced team.
+    """
+    return Subquery(
+        team_model.objects.filter(match_id=OuterRef(match_ref))
+        .exclude(id=OuterRef(team_ref))
+        .values('score')[:1]
+    )
+
+
+def get_totals_aggregates() -> dict:
+    """
+    Aggregates of a player finished matches, summed up so totals
+    from different sets of matches can be merged (see `merge_totals`).
+    """
+    aggregates = {field: Sum(field) for field in STATS_FIELDS}
+    aggregates.update(
+        {
+            'matches_played': Count('id'),
+            'matches_won': Count(
+                'id',
+                filter=Q(player__team__score__gt=F('opponent_score')),
+            ),
+            'most_kills_in_a_match': Max('kills'),
+            'most_damage_in_a_match': Max('damage'),
+            'rounds_played': Sum(F('match_rounds') - F('afk')),
+            'kdr': Sum(_ratio(F('kills'), 'deaths', default=F('kills'))),
+            'kda': Sum(
+                _ratio(
+                    F('kills') + F('assists'),
+                    'deaths',
+                    default=F('kills') + F('assists'),
+                )
+            ),
+            'ahk': Sum(_ratio(F('hs_kills'), 'shots_fired')),
+            'ahr': Sum(_ratio(F('head_shots'), 'match_rounds')),
+            'hsk': Sum(_percentage(F('hs_kills'), F('kills'), 'kills')),
+            'accuracy': Sum(
+                _percentage(SHOTS_HIT, F('shots_fired'), 'shots_fired', Floor)
+            ),
+            'head_accuracy': Sum(
+                _percentage(F('head_shots'), F('hit_shots'), 'hit_shots', Floor)
+            ),
+            'chest_accuracy': Sum(
+                _percentage(F('chest_shots'), F('hit_shots'), 'hit_shots')
+            ),
+            'others_accuracy': Sum(
+                _percentage(F('other_shots'), F('hit_shots'), 'hit_shots')
+            ),
+        }
+    )
+    return aggregates
+
+
+def annotate_totals(stats: QuerySet, team_model=MatchTeam) -> QuerySet:
+    """
+    Per match values the `get_totals_aggregates` need, on a `MatchPlayerStats`
+    (or `ArchivedMatchPlayerStats`) queryset.
+    """
+    return stats.annotate(
+        match_rounds=Coalesce(
+            match_rounds_subquery('player__team__match_id', team_model), Value(0)
+        ),
+        opponent_score=opponent_score_subquery(
+            'player__team_id', 'player__team__match_id', team_model
+        ),
+        hit_shots=SHOTS_HIT,
+    )
+
+
+def merge_totals(totals: dict, other: dict) -> dict:
+    """
+    Add up two `get_totals` results, eg. the hot and archived ones of a player.
+    """
+    merged = {}
+    for key in totals.keys() | other.keys():
+        values = [
+            value for value in (totals.get(key), other.get(key)) if value is not None
+        ]
+        if not values:
+            merged[key] = None
+        else:
+            merged[key] = max(values) if key in MAX_TOTALS else sum(values)
+
+    return merged
+
+
+def get_totals(user_id: int, archived: ArchivedPlayerSummary = None) -> dict:
+    """
+    Raw aggregates of all finished matches from a player: the hot ones with a
+    single query, added to the archived ones kept on their `ArchivedPlayerSummary`.
+    """
+    totals = annotate_totals(
+        MatchPlayerStats.objects.filter(
+            player__user_id=user_id,
+            player__team__match__status=Match.Status.FINISHED,
+        )
+    ).aggregate(**get_totals_aggregates())
+
+    archived = archived or ArchivedPlayerSummary.get_by_user_id(user_id)
+    return merge_totals(totals, archived.get_totals())
+
+
+def get_totals_by_user(match_ids: List[int]) -> Dict[int, dict]:
+    """
+    Raw aggregates of each player on the given (hot) matches, grouped with a
+    single query. Used to keep `ArchivedPlayerSummary` totals when archiving.
+    """
+    # Annotations can't be named after fields (eg. `kills`), unlike aggregates.
+    aggregates = get_totals_aggregates()
+    rows = (
+        annotate_totals(
+            MatchPlayerStats.objects.filter(player__team__match_id__in=match_ids)
+        )
+        .values('player__user_id')
+        .annotate(**{f'total_{key}': value for key, value in aggregates.items()})
+        .order_by()
+    )
+    return {
+        row['player__user_id']: {key: row[f'total_{key}'] for key in aggregates}
+        for row in rows
+    }
+
+
+def get_stats(user_id: int, archived: ArchivedPlayerSummary = None) -> dict:
+    """
+    Aggregate all finished matches stats from a player (see `get_totals`).
+
+    The output follows the former Python aggregation of `MatchPlayerStatsSchema`:
+    totals for every counter, ratios averaged by match, percentages
+    averaged and truncated by match and round stats over all rounds played.
+    Per match values are rounded by the database (half away from zero), unlike
+    the `MatchPlayerStats` properties that use Python `round` (half to even),
+    so a tie like 1 hs kill out of 8 shots counts as 0.13 instead of 0.12.
+
+    :return: A dict with the `stats` (empty if the player has no finished matches),
+    `matches_played`, `matches_won`, `most_kills_in_a_match` and
+    `most_damage_in_a_match` entries.
+    """
+    totals = get_totals(user_id, archived)
+    matches_played = totals.pop('matches_played')
+    summary = {
+        'matches_played': matches_played,
+        'matches_won': totals.pop('matches_won'),
+        'most_kills_in_a_match': totals.pop('most_kills_in_a_match'),
+        'most_damage_in_a_match': totals.pop('most_damage_in_a_match'),
+        'stats': {},
+    }
+
+    if not matches_played:
+        return summary
+
+    stats = {field: totals[field] for field in STATS_FIELDS}
+    stats['rounds_played'] = totals['rounds_played']
+    stats['clutches'] = sum(stats[f'clutch_v{n}'] for n in range(1, 6))
+    stats['shots_hit'] = sum(
+        stats[field] for field in ['head_shots', 'chest_shots', 'other_shots']
+    )
+
+    for key in MatchPlayerStats.RATIO_STATS:
+        stats[key] = '{:.2f}'.format(float(totals[key]) / matches_played)
+
+    for key in MatchPlayerStats.PERCENTAGE_STATS:
+        stats[key] = int(totals[key] / matches_played)
+
+    for key, stat in MatchPlayerStats.ROUND_STATS:
+        stats[key] = (
+            '{:.2f}'.format(stats[stat] / stats['rounds_played'])
+            if stats['rounds_played'] > 0
+            else '{:.2f}'.format(0.0)
+        )
+
+    summary['stats'] = stats
+    return summary
+
+
+def get_results(
+    user_id: int,
+    latest: int = None,
+    player_model=MatchPlayer,
+    team_model=MatchTeam,
+) -> List[bool]:
+    """
+    Whether the player won each of their finished matches (or only the `latest`
+    ones), from the oldest to the latest one. Only the scores are fetched, so no
+    match or team is loaded.
+    """
+    scores = (
+        player_model.objects.filter(
+            user_id=user_id,
+            team__match__status=Match.Status.FINISHED,
+        )
+        .annotate(
+            opponent_score=opponent_score_subquery(
+                'team_id', 'team__match_id', team_model
+            ),
+        )
+        .order_by('-team__match__end_date')
+        .values_list('team__score', 'opponent_score')
+    )
+    if latest is not None:
+        scores = scores[:latest]
+
+    return [
+        own_score is not None
+        and opponent_score is not None
+        and own_score > opponent_score
+        for own_score, opponent_score in reversed(list(scores))
+    ]
+
+
+def get_highest_win_streak(results: List[bool], current_streak: int = 0) -> int:
+    """
+    The highest win streak on `results`, carrying on from a `current_streak`
+    (eg. the one of the player archived matches).
+    """
+    max_streak = 0
+    for won in results:
+        current_streak = current_streak + 1 if won else 0
+        max_streak = max(max_streak, current_streak)
+
+    return max_streak
+
+
+def get_latest_matches_results(results: List[bool], amount: int = 5) -> List[str]:
+    """
+    Same output as `Account.get_latest_matches_results`, from `get_results`.
+    """
+    played_results = [
+        Account.MatchResults.WIN if won else Account.MatchResults.DEFEAT
+        for won in reversed(results[-amount:])
+    ]
+    not_available_count = max(0, amount - len(played_results))
+    return played_results + [Account.MatchResults.NOT_AVAILABLE] * not_available_count
+
+
+def get_ranking_pos(account: Account) -> int:
+    """
+    Position of the account on the verified accounts ranking,
+    counting who is ahead of it instead of walking through the whole ranking.
+    Ties are broken by id, like `ranking.api.controller.RankingList`.
+    """
+    return (
+        Account.verified_objects.filter(
+            Q(level__gt=account.level)
+            | Q(level=account.level, level_points__gt=account.level_points)
+            | Q(
+                level=account.level,
+                level_points=account.level_points,
+                id__lt=account.id,
+            )
+        ).count()
+        + 1
+    )
+
+
+def get_profile_summary(account: Account) -> dict:
+    """
+    All computed data a profile shows, with a fixed amount of queries
+    no matter how many matches the player has played. Archived matches count
+    through the player `ArchivedPlayerSummary`, and are only queried when the
+    player has fewer hot matches than the latest results shown.
+    """
+    archived = ArchivedPlayerSummary.get_by_user_id(account.user_id)
+    summary = get_stats(account.user_id, archived)
+    results = get_results(account.user_id)
+    latest_results = results[-5:]
+    if len(latest_results) < 5 and archived.matches_played:
+        latest_results = (
+            get_results(
+                account.user_id,
+                latest=5 - len(latest_results),
+                player_model=ArchivedMatchPlayer,
+                team_model=ArchivedMatchTeam,
+            )
+            + latest_results
+        )
+
+    summary.update(
+        {
+            'highest_win_streak': max(
+                archived.highest_win_streak,
+                get_highest_win_streak(results, archived.win_streak),
+            ),
+            'latest_matches_results': get_latest_matches_results(latest_results),
+            'ranking_pos': get_ranking_pos(account),
+        }
+    )
+    return summary
@@ -1,3 +1,5 @@
+from django.db import connection
+
 from accounts.tests.mixins import VerifiedAccountsMixin
 from core.tests import TestCase
 from friends.api.schemas import FriendSchema
@@ -42,10 +44,15 @@ class ProfilesControllerTestCase(VerifiedAccountsMixin, TestCase):
         result = controller.search(self.user_1.account.username)
         self.assertEqual(result, [FriendSchema.from_orm(self.user_1.account)])
 
-        result = controller.search('user_')
-        self.assertEqual(len(result), 25)
+        result = controller.search(self.user_1.account.username.upper())
+        self.assertEqual(result, [FriendSchema.from_orm(self.user_1.account)])
+
+        result = controller.search('user_', page_size=20)
+        self.assertEqual(len(result), 20)
+        result = controller.search('user_', page=2, page_size=20)
+        self.assertEqual(len(result), 5)
 
-        result = controller.search('@example')
+        result = controller.search('@example', page_size=30)
         self.assertEqual(len(result), 26)
 
         result = controller.search('offline_verified_user')
@@ -53,3 +60,27 @@ class ProfilesControllerTestCase(VerifiedAccountsMixin, TestCase):
             result,
             [FriendSchema.from_orm(self.offline_verified_user.account)],
         )
+
+    def test_search_queryset_plan(self):
+        # Test tables are tiny, so seq scans are disabled to see which indexes
+        # the planner can use at all.
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+        plan = controller.search_queryset('user_').explain()
+        self.assertIn('accounts_username_trgm_idx', plan)
+        self.assertIn('accounts_user_email_trgm_idx', plan)
+
+    def test_search_ranking(self):
+        self.user_2.account.username = 'reload'
+        self.user_2.account.save()
+        self.user_3.account.username = 'reloaded'
+        self.user_3.account.save()
+        self.user_4.account.username = 'the_reload_fan'
+        self.user_4.account.save()
+
+        result = controller.search('reload')
+        self.assertEqual(
+            [item.user_id for item in result],
+            [self.user_2.id, self.user_3.id, self.user_4.id],
+        )
@@ -50,7 +50,7 @@ class ProfilesSchemasTestCase(TeamsMixin, TestCase):
 
         all_user_ids = (
             Account.verified_objects.all()
-            .order_by('-level', '-level_points')
+            .order_by('-level', '-level_points', 'id')
             .values_list('id', flat=True)
         )
         ranking_pos = 1
@@ -0,0 +1,120 @@
+from django.utils import timezone
+from model_bakery import baker
+
+from accounts.models import Account
+from core.tests import TestCase
+from matches.models import Match, MatchPlayer, Server
+from pre_matches.tests.mixins import TeamsMixin
+from profiles import services
+
+
+class ProfilesServicesTestCase(TeamsMixin, TestCase):
+    def create_match(self, user, score, opponent_score, **stats):
+        match = baker.make(
+            Match,
+            server=self.server,
+            status=Match.Status.FINISHED,
+            end_date=timezone.now(),
+        )
+        team = match.matchteam_set.create(name=self.team1.name, score=score, side=1)
+        match.matchteam_set.create(
+            name=self.team2.name,
+            score=opponent_score,
+            side=2,
+        )
+        match_player = baker.make(MatchPlayer, team=team, user=user)
+        for key, value in stats.items():
+            setattr(match_player.stats, key, value)
+        match_player.stats.save()
+        return match
+
+    def setUp(self):
+        super().setUp()
+        self.server = baker.make(Server)
+
+    def test_get_stats(self):
+        summary = services.get_stats(self.user_1.id)
+        self.assertEqual(summary['matches_played'], 0)
+        self.assertEqual(summary['stats'], {})
+
+        self.create_match(
+            self.user_1,
+            10,
+            6,
+            kills=10,
+            deaths=4,
+            hs_kills=5,
+            damage=100,
+            shots_fired=20,
+            head_shots=3,
+            chest_shots=1,
+        )
+        self.create_match(self.user_1, 4, 10, kills=15, damage=200, afk=2)
+
+        summary = services.get_stats(self.user_1.id)
+        self.assertEqual(summary['matches_played'], 2)
+        self.assertEqual(summary['matches_won'], 1)
+        self.assertEqual(summary['most_kills_in_a_match'], 15)
+        self.assertEqual(summary['most_damage_in_a_match'], 200)
+
+        stats = summary['stats']
+        self.assertEqual(stats['kills'], 25)
+        self.assertEqual(stats['rounds_played'], 28)
+        self.assertEqual(stats['shots_hit'], 4)
+        self.assertEqual(stats['adr'], '10.71')
+        self.assertEqual(stats['kdr'], '8.75')
+        self.assertEqual(stats['ahk'], '0.12')
+        self.assertEqual(stats['hsk'], 25)
+        self.assertEqual(stats['accuracy'], 10)
+        self.assertEqual(stats['head_accuracy'], 37)
+        self.assertEqual(stats['chest_accuracy'], 12)
+
+    def test_get_stats_rounding(self):
+        # Per match values are rounded half away from zero by the database.
+        self.create_match(self.user_1, 10, 6, kills=8, hs_kills=1, shots_fired=8)
+
+        stats = services.get_stats(self.user_1.id)['stats']
+        self.assertEqual(stats['ahk'], '0.13')
+        self.assertEqual(stats['hsk'], 13)
+
+    def test_get_profile_summary(self):
+        for score, opponent_score in [(10, 6), (10, 8), (5, 10), (10, 2), (7, 7)]:
+            self.create_match(self.user_1, score, opponent_score)
+
+        summary = services.get_profile_summary(self.user_1.account)
+        self.assertEqual(summary['highest_win_streak'], 2)
+        self.assertEqual(
+            summary['latest_matches_results'],
+            [
+                Account.MatchResults.DEFEAT,
+                Account.MatchResults.WIN,
+                Account.MatchResults.DEFEAT,
+                Account.MatchResults.WIN,
+                Account.MatchResults.WIN,
+            ],
+        )
+
+    def test_get_ranking_pos(self):
+        self.user_2.account.level = 10
+        self.user_2.account.save()
+        self.user_3.account.level = 5
+        self.user_3.account.level_points = 50
+        self.user_3.account.save()
+        self.user_1.account.level = 5
+        self.user_1.account.level_points = 20
+        self.user_1.account.save()
+
+        self.assertEqual(services.get_ranking_pos(self.user_1.account), 3)
+
+    def test_get_ranking_pos_tie(self):
+        for user in [self.user_1, self.user_2]:
+            user.account.level = 5
+            user.account.level_points = 20
+            user.account.save()
+
+        first, second = sorted(
+            [self.user_1.account, self.user_2.account],
+            key=lambda account: account.id,
+        )
+        self.assertEqual(services.get_ranking_pos(first), 1)
+        self.assertEqual(services.get_ranking_pos(second), 2)
@@ -2,44 +2,120 @@ from typing import Dict, List
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
 
-from accounts.models import Account
-from matches.models import Match
+from accounts.models import Account, SteamUser
+from matches.models import ArchivedPlayerSummary, Match, MatchPlayer
 
 User = get_user_model()
 
 
-def ranking_list() -> List[Dict]:
-    ranking_list = []
+class RankingList:
+    """
+    Lazy, page-aware ranking. Paginators only take its length and slice it,
+    so only accounts on the requested page are loaded, with their steam users on
+    a single pipelined round-trip and their matches counted with a single grouped
+    query.
+    """
 
-    accounts = (
-        Account.verified_objects.all()
-        .only("level", "level_points", "username", "user")
-        .order_by("-level", "-level_points")[: settings.RANKING_LIMIT]
-    )
+    def __init__(self, limit: int = None):
+        self.limit = limit if limit is not None else settings.RANKING_LIMIT
+        self.accounts = (
+            Account.verified_objects.all()
+            .select_related("user")
+            .only("level", "level_points", "username", "user")
+            .order_by("-level", "-level_points", "id")
+        )
+        self._count = None
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = min(self.limit, self.accounts.count())
+
+        return self._count
+
+    def __iter__(self):
+        return iter(self[0:self.limit])
+
+    def __getitem__(self, key) -> List[Dict]:
+        if not isinstance(key, slice):
+            index = key + len(self) if key < 0 else key
+            items = self[index:index + 1] if index >= 0 else []
+            if not items:
+                raise IndexError('Ranking index out of range.')
+
+            return items[0]
+
+        if key.step not in (None, 1):
+            raise ValueError('Ranking slices do not support steps.')
+
+        if any(value is not None and value < 0 for value in (key.start, key.stop)):
+            key = slice(*key.indices(len(self))[:2])
 
-    finished_matches = Match.objects.filter(status=Match.Status.FINISHED).values_list(
-        "id", flat=True
-    )
+        start = key.start or 0
+        stop = self.limit if key.stop is None else min(key.stop, self.limit)
+        if start >= stop:
+            return []
 
-    for idx, account in enumerate(accounts):
-        matches = account.user.matchplayer_set.filter(
-            team__match__id__in=finished_matches
+        return self.hydrate(list(self.accounts[start:stop]), offset=start)
+
+    @staticmethod
+    def get_matches_counts(user_ids: List[int]) -> Dict[int, dict]:
+        rows = (
+            MatchPlayer.objects.filter(
+                user_id__in=user_ids,
+                team__match__status=Match.Status.FINISHED,
+            )
+            .values("user_id")
+            .annotate(
+                matches_played=Count("id"),
+                matches_won=Count(
+                    "id",
+                    filter=Q(team__score=settings.MATCH_ROUNDS_TO_WIN),
+                ),
+            )
+            .order_by()
         )
-        ranking_list.append(
-            {
-                "level": account.level,
-                "level_points": account.level_points,
-                "username": account.username,
-                "user_id": account.user.id,
-                "avatar": account.avatar_dict,
-                "ranking_pos": idx + 1,
-                "steam_url": account.user.steam_user.profileurl,
-                "matches_played": matches.count(),
-                "matches_won": matches.filter(
-                    team__score=settings.MATCH_ROUNDS_TO_WIN,
-                ).count(),
-            }
+        counts = {row.pop("user_id"): row for row in rows}
+
+        archived = ArchivedPlayerSummary.objects.filter(user_id__in=user_ids).values(
+            "user_id", "matches_played", "matches_won"
         )
+        for row in archived:
+            user_counts = counts.setdefault(
+                row["user_id"], {"matches_played": 0, "matches_won": 0}
+            )
+            user_counts["matches_played"] += row["matches_played"]
+            user_counts["matches_won"] += row["matches_won"]
+
+        return counts
+
+    def hydrate(self, accounts: List[Account], offset: int = 0) -> List[Dict]:
+        user_ids = [account.user_id for account in accounts]
+        counts = self.get_matches_counts(user_ids)
+        steam_users = SteamUser.load_many(user_ids)
+
+        ranking = []
+        for idx, account in enumerate(accounts):
+            steam_user = steam_users.get(account.user_id) or account.user.steam_user
+            ranking.append(
+                {
+                    "level": account.level,
+                    "level_points": account.level_points,
+                    "username": account.username,
+                    "user_id": account.user_id,
+                    "avatar": Account.build_avatar_dict(steam_user.avatarhash),
+                    "ranking_pos": offset + idx + 1,
+                    "steam_url": steam_user.profileurl,
+                    **counts.get(
+                        account.user_id,
+                        {"matches_played": 0, "matches_won": 0},
+                    ),
+                }
+            )
+
+        return ranking
+
 
-    return ranking_list
+def ranking_list() -> RankingList:
+    return RankingList()
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.test import override_settings
+from model_bakery import baker
+
+from accounts.models import Account
+from accounts.tests.mixins import VerifiedAccountsMixin
+from core.tests import TestCase
+from matches.models import ArchivedPlayerSummary, Match, MatchPlayer
+from ranking.api import controller
+
+
+class RankingControllerTestCase(VerifiedAccountsMixin, TestCase):
+    def test_ranking_list(self):
+        self.user_2.account.level = 10
+        self.user_2.account.save()
+        match = baker.make(Match, status=Match.Status.FINISHED)
+        team = match.matchteam_set.create(
+            name='team_a',
+            score=settings.MATCH_ROUNDS_TO_WIN,
+            side=1,
+        )
+        match.matchteam_set.create(name='team_b', score=3, side=2)
+        baker.make(MatchPlayer, team=team, user=self.user_2)
+
+        ranking = controller.ranking_list()
+        ids = list(
+            Account.verified_objects.order_by('-level', '-level_points', 'id')
+            .values_list('user_id', flat=True)[:settings.RANKING_LIMIT]
+        )
+        self.assertEqual(len(ranking), len(ids))
+
+        page = ranking[10:20]
+
+        self.assertEqual([item['user_id'] for item in page], ids[10:20])
+        self.assertEqual([item['ranking_pos'] for item in page], list(range(11, 21)))
+
+        first = ranking[0]
+        self.assertEqual(first['user_id'], self.user_2.id)
+        self.assertEqual(first['matches_played'], 1)
+        self.assertEqual(first['matches_won'], 1)
+        self.assertEqual(first['steam_url'], self.user_2.steam_user.profileurl)
+
+    def test_ranking_list_archived_matches(self):
+        ArchivedPlayerSummary.objects.create(
+            user=self.user_1,
+            matches_played=4,
+            matches_won=3,
+        )
+        match = baker.make(Match, status=Match.Status.FINISHED)
+        team = match.matchteam_set.create(name='team_a', score=3, side=1)
+        match.matchteam_set.create(
+            name='team_b',
+            score=settings.MATCH_ROUNDS_TO_WIN,
+            side=2,
+        )
+        baker.make(MatchPlayer, team=team, user=self.user_1)
+
+        counts = controller.RankingList.get_matches_counts([self.user_1.id])
+        self.assertEqual(
+            counts[self.user_1.id],
+            {'matches_played': 5, 'matches_won': 3},
+        )
+
+    @override_settings(RANKING_LIMIT=5)
+    def test_ranking_list_limit(self):
+        ranking = controller.ranking_list()
+        self.assertEqual(len(ranking), 5)
+        self.assertEqual(ranking[3:10], ranking[3:5])
+        self.assertEqual(ranking[10:20], [])
+
+    @override_settings(RANKING_LIMIT=5)
+    def test_ranking_list_negative_index(self):
+        ranking = controller.ranking_list()
+        self.assertEqual(ranking[-1], ranking[4])
+        self.assertEqual(ranking[-2:], ranking[3:5])
+        with self.assertRaises(IndexError):
+            ranking[-6]
+        with self.assertRaises(IndexError):
+            ranking[5]
@@ -1,47 +1,59 @@
-from typing import List
-
 from django.contrib.auth import get_user_model
 
-from accounts.models import Auth
-from accounts.tasks import watch_user_status_change
+from accounts.models import Auth, Presence
+from core.redis import async_redis_client
 from core.utils import get_url_param
 
 User = get_user_model()
 
 
-class WSAuthConfig:
-    CHECK_OFFLINE_COUNTDOWN: int = 15
-
-
-def check_and_fetch_user(userq_qs: List[User]) -> User:
-    if userq_qs.exists():
-        if hasattr(userq_qs[0], 'account') and userq_qs[0].account.is_verified:
-            return userq_qs[0]
-
-
-def authenticate(scope: dict) -> User:
+async def authenticate(scope: dict) -> User:
     """
     This is middleware to authenticate users on each websocket new connection.
     It checks if there is any existing user for the given auth token and increment
     that user session on Redis everytime he connects connects (e.g. multiple open browsers/tabs).
 
+    This runs natively on the event loop (asyncio Redis client and async ORM), so
+    concurrent handshakes don't queue behind the sync thread executor.
+
     :params scope dict: The websocket connection context.
     """
     token = get_url_param(scope.get('query_string'), 'token')
-    auth = Auth.load(token)
-    if not auth:
+    if not token:
         return None
 
-    user_qs = User.objects.filter(id=auth.user_id, is_active=True)
-    user = check_and_fetch_user(user_qs)
-    if user and user.auth.sessions_ttl > -1:
-        user.add_session()
-        user.auth.persist_session()
+    cache = async_redis_client()
+    token_cache_key = f'{Auth.Config.TOKEN_PREFIX}{token}'
+    user_id = await cache.get(token_cache_key)
+    if not user_id:
+        return None
+
+    await cache.expire(token_cache_key, Auth.Config.SESSION_TTL)
+
+    user = await (
+        User.objects.filter(id=user_id, is_active=True, account__is_verified=True)
+        .select_related('account')
+        .afirst()
+    )
+    if not user:
+        return None
+
+    sessions_cache_key = f'{Auth.Config.SESSION_PREFIX}{user.id}'
+    if await cache.ttl(sessions_cache_key) > -1:
+        async with cache.pipeline(transaction=True) as pipe:
+            pipe.incr(sessions_cache_key)
+            pipe.persist(sessions_cache_key)
+            sessions, _ = await pipe.execute()
+
+        if sessions == 1:
+            async with cache.pipeline(transaction=False) as pipe:
+                Presence.set_many([user.id], User.Status.ONLINE, pipe=pipe)
+                await pipe.execute()
 
     return user
 
 
-def disconnect(user):
+async def disconnect(user: User):
     """
     This is middleware to disconnect users on each websocket connection close.
     It decrements user sessions count on Redis cache db. If this count became 0
@@ -49,17 +61,20 @@ def disconnect(user):
     the page, the connection will close when the refresh starts and open again when
     the refresh is done (considering that the user has the auth rights). So, while the
     user is refreshing, he has 0 sessions but he is not offline. A user is considered
-    offline if there is no sesion entries for his `id` on Redis.
+    offline if there is no sesion entries for his `id` on Redis. Users that reach
+    0 sessions are flagged as disconnected, so the periodic sweeper can check
+    them after a grace period.
 
     :params user User: The user who will have his sessions count decreased.
     """
-    if user.auth.sessions and user.auth.sessions > 0:
-        user.auth.remove_session()
-        if user.auth.sessions == 0:
-            user.auth.expire_session()
-            if hasattr(user, 'account') and user.account.is_verified:
-                watch_user_status_change.apply_async(
-                    (user.id,),
-                    countdown=WSAuthConfig.CHECK_OFFLINE_COUNTDOWN,
-                    serializer='json',
-                )
+    cache = async_redis_client()
+    sessions_cache_key = f'{Auth.Config.SESSION_PREFIX}{user.id}'
+    sessions = await cache.get(sessions_cache_key)
+    if sessions and int(sessions) > 0:
+        sessions = await cache.decr(sessions_cache_key)
+        if sessions == 0:
+            async with cache.pipeline(transaction=False) as pipe:
+                pipe.expire(sessions_cache_key, Auth.Config.SESSION_GAP_TTL)
+                if hasattr(user, 'account') and user.account.is_verified:
+                    Presence.add_disconnected([user.id], pipe=pipe)
+                await pipe.execute()
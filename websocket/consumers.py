@@ -1,7 +1,8 @@
-from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.conf import settings
 
+from core.utils import json_dumps
+
 from . import auth
 
 
@@ -16,7 +17,7 @@ class JsonAuthWebsocketConsumer(AsyncJsonWebsocketConsumer):
         It tries to authenticate the user and closes the connect if can't.
         """
 
-        self.user = await sync_to_async(auth.authenticate)(self.scope)
+        self.user = await auth.authenticate(self.scope)
         if not self.user:
             return await self.close()
 
@@ -24,9 +25,37 @@ class JsonAuthWebsocketConsumer(AsyncJsonWebsocketConsumer):
         global_group_name = f'{settings.GROUP_NAME_PREFIX}.global'
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.channel_layer.group_add(global_group_name, self.channel_name)
+
+        # Staff users aren't listed as friends, so they're kept out of the
+        # broadcasts meant for players (see `friends.websocket`).
+        if not self.user.is_staff and not self.user.is_superuser:
+            await self.channel_layer.group_add(
+                self.verified_group_name,
+                self.channel_name,
+            )
+
         await super().accept()
 
+    @property
+    def verified_group_name(self) -> str:
+        return f'{settings.GROUP_NAME_PREFIX}.verified'
+
+    @classmethod
+    async def encode_json(cls, content):
+        return json_dumps(content).decode()
+
     async def send_payload(self, event):
+        """
+        Forward a group broadcast to the client. Messages from `ws_send` come already
+        encoded, so they're sent as-is instead of being encoded again by each consumer.
+        Users listed on `exclude` don't get the message.
+        """
+        if self.user.id in event.get('exclude', []):
+            return
+
+        if 'text' in event:
+            return await self.send(text_data=event['text'])
+
         await self.send_json(
             {'meta': event.get('meta'), 'payload': event.get('payload')}
         )
@@ -38,6 +67,10 @@ class JsonAuthWebsocketConsumer(AsyncJsonWebsocketConsumer):
         one session with a unique token in cache.
         """
         if self.user:
-            await sync_to_async(auth.disconnect)(self.user)
+            await auth.disconnect(self.user)
 
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        await self.channel_layer.group_discard(
+            self.verified_group_name,
+            self.channel_name,
+        )
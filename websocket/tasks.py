@@ -1,8 +1,19 @@
+from asgiref.sync import async_to_sync
 from celery import shared_task
 
 from core.websocket import ws_ping
 
+from .utils import ws_publish
+
 
 @shared_task
 def keep_alive():
     ws_ping()
+
+
+@shared_task
+def publish(message: dict, groups: list):
+    """
+    Publish a message encoded by `websocket.utils.ws_send_nowait`.
+    """
+    async_to_sync(ws_publish)(message, groups)
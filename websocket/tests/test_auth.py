@@ -1,4 +1,7 @@
+from unittest import mock
+
 from accounts.models.auth import Auth
+from accounts.models.presence import Presence
 from accounts.tests.mixins import AccountOneMixin
 from core.tests import TestCase
 from websocket import auth
@@ -11,42 +14,51 @@ class WSAuthTestCase(AccountOneMixin, TestCase):
         self.user.account.save()
         self.user.auth.create_token()
 
-    def test_authenticate(self):
+    async def test_authenticate(self):
         scope = {'query_string': f'anyurl.com/?token={self.user.auth.token}'}
-        user = auth.authenticate(scope)
+        user = await auth.authenticate(scope)
         self.assertEqual(self.user.id, user.id)
 
-    def test_authenticate_fail(self):
+    async def test_authenticate_fail(self):
         scope = {'query_string': '?token=any_token'}
-        user = auth.authenticate(scope)
+        user = await auth.authenticate(scope)
         self.assertIsNone(user)
 
-    def test_authenticate_unverified(self):
+    async def test_authenticate_unverified(self):
         self.user.account.is_verified = False
-        self.user.account.save()
+        await self.user.account.asave()
 
         scope = {'query_string': f'anyurl.com/?token={self.user.auth.token}'}
-        user = auth.authenticate(scope)
+        user = await auth.authenticate(scope)
         self.assertIsNone(user)
 
-    def test_authenticate_no_account(self):
-        self.user.account.delete()
-        self.user.refresh_from_db()
+    async def test_authenticate_no_account(self):
+        await self.user.account.adelete()
 
         scope = {'query_string': f'anyurl.com/?token={self.user.auth.token}'}
-        user = auth.authenticate(scope)
+        user = await auth.authenticate(scope)
         self.assertIsNone(user)
 
-    def test_disconnect(self):
+    async def test_disconnect(self):
         self.user.add_session()
-        auth.disconnect(self.user)
+        await auth.disconnect(self.user)
         self.assertEqual(self.user.auth.sessions_ttl, Auth.Config.SESSION_GAP_TTL)
 
         self.user.logout()
         self.user.add_session()
         self.user.add_session()
-        auth.disconnect(self.user)
+        await auth.disconnect(self.user)
         self.assertEqual(self.user.auth.sessions, 1)
 
-        auth.disconnect(self.user)
+        await auth.disconnect(self.user)
         self.assertEqual(self.user.auth.sessions, 0)
+
+    async def test_disconnect_flag_disconnected(self):
+        self.user.add_session()
+        self.user.add_session()
+        await auth.disconnect(self.user)
+        self.assertEqual(Presence.pop_disconnected(), [])
+
+        await auth.disconnect(self.user)
+        with mock.patch.object(Presence.Config, 'DISCONNECT_GRACE_PERIOD', 0):
+            self.assertEqual(Presence.pop_disconnected(), [self.user.id])
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from channels.testing import WebsocketCommunicator
 
 from accounts.tests.mixins import VerifiedAccountMixin
@@ -20,6 +22,16 @@ class WSConsumerTestCase(VerifiedAccountMixin, TestCase):
         assert connected
         await communicator.disconnect()
 
+    async def test_send_payload_exclude(self):
+        consumer = JsonAuthWebsocketConsumer()
+        consumer.user = self.user
+        with mock.patch.object(consumer, 'send') as mock_send:
+            await consumer.send_payload({'text': '{}', 'exclude': [self.user.id]})
+            mock_send.assert_not_called()
+
+            await consumer.send_payload({'text': '{}', 'exclude': [self.user.id + 1]})
+            mock_send.assert_called_once_with(text_data='{}')
+
     # TODO: Review this test to make it work (https://github.com/3C-gg/reload-backend/issues/384).
     # async def test_consumer(self):
     #     communicator = self.__create_ws_comm()
@@ -1,5 +1,7 @@
 import asyncio
+import json
 from threading import Thread
+from unittest import mock
 
 from channels.layers import get_channel_layer
 from django.conf import settings
@@ -17,6 +19,7 @@ class WSUtilsTestCase(AccountOneMixin, TestCase):
         channel_layer = get_channel_layer()
         message = await channel_layer.receive(f'{settings.GROUP_NAME_PREFIX}.group1')
         assert message['type'] == 'send_payload'
+        message = json.loads(message['text'])
         assert message['payload'] == {'content': 'test'}
         assert message['meta']['action'] == 'ws_Test'
         assert 'timestamp' in message['meta']
@@ -25,6 +28,7 @@ class WSUtilsTestCase(AccountOneMixin, TestCase):
         channel_layer = get_channel_layer()
         message = await channel_layer.receive(f'{settings.GROUP_NAME_PREFIX}.group2')
         assert message['type'] == 'send_payload'
+        message = json.loads(message['text'])
         assert message['payload'] == {'content': 'test'}
         assert message['meta']['action'] == 'ws_Test'
         assert 'timestamp' in message['meta']
@@ -46,3 +50,22 @@ class WSUtilsTestCase(AccountOneMixin, TestCase):
         )
 
         await channel_layer.flush()
+
+    @mock.patch('websocket.utils.channel_layer.group_send')
+    async def test_ws_send_multicast(self, mock_group_send):
+        await utils.ws_send('ws_Test', {'content': 'test'}, [1, 2, 2, 3])
+        self.assertEqual(
+            [call.args[0] for call in mock_group_send.call_args_list],
+            [f'{settings.GROUP_NAME_PREFIX}.{group}' for group in [1, 2, 3]],
+        )
+        message = mock_group_send.call_args_list[0].args[1]
+        self.assertEqual(message['type'], 'send_payload')
+        self.assertEqual(json.loads(message['text'])['payload'], {'content': 'test'})
+
+    @mock.patch('websocket.utils.channel_layer.group_send')
+    def test_ws_send_nowait(self, mock_group_send):
+        data = utils.ws_send_nowait('ws_Test', {'content': 'test'}, [1, 2])
+        self.assertEqual(data['meta']['action'], 'ws_Test')
+        self.assertEqual(mock_group_send.call_count, 2)
+        message = mock_group_send.call_args_list[0].args[1]
+        self.assertEqual(json.loads(message['text'])['payload'], {'content': 'test'})
@@ -1,19 +1,85 @@
+import asyncio
+
 from channels.layers import get_channel_layer
 from django.conf import settings
 from django.utils import timezone
 
+from core.utils import json_dumps
+
 channel_layer = get_channel_layer()
 
 
-async def ws_send(action, payload, groups=['global']):
+def build_message(action, payload, exclude=None) -> tuple:
     """
-    Helper method that send data over websockets.
+    Encode a websocket message once, so it can be published to many groups.
+
+    :return: The message data (as returned by `ws_send`) and the channel layer
+    message, with the encoded text that consumers forward as-is.
     """
     meta = {'action': action, 'timestamp': str(timezone.now())}
     data = {'type': 'send_payload', 'payload': payload, 'meta': meta}
+    message = {
+        'type': 'send_payload',
+        'text': json_dumps({'meta': meta, 'payload': payload}).decode(),
+    }
+    if exclude:
+        message['exclude'] = list(exclude)
+
+    return data, message
+
+
+async def ws_publish(message, groups):
+    """
+    Publish an encoded message (see `build_message`) to all groups concurrently,
+    so the fan-out takes roughly one round-trip no matter how many groups there are.
+    """
+    group_names = dict.fromkeys(
+        f'{settings.GROUP_NAME_PREFIX}.{group}' for group in groups
+    )
+    await asyncio.gather(
+        *[channel_layer.group_send(group_name, message) for group_name in group_names]
+    )
+
+
+async def ws_send(action, payload, groups=['global'], exclude=None):
+    """
+    Helper method that send data over websockets.
 
-    for group in groups:
-        group_name = f'{settings.GROUP_NAME_PREFIX}.{group}'
-        await channel_layer.group_send(group_name, data)
+    The message is encoded once and published to all groups concurrently.
 
+    :params exclude list: Ids of users that should not get the message,
+    even if they are on one of the groups.
+    """
+    data, message = build_message(action, payload, exclude)
+    await ws_publish(message, groups)
+    return data
+
+
+def ws_send_nowait(action, payload, groups=['global'], exclude=None):
+    """
+    Helper method for sync code that sends data over websockets without waiting
+    for the delivery. The payload is encoded right away and the fan-out runs on
+    a Celery task, so the caller only pays for encoding and enqueueing it.
+    There is no ordering guarantee with messages sent by `ws_send`.
+    """
+    # import here because tasks depends on this module
+    from .tasks import publish
+
+    data, message = build_message(action, payload, exclude)
+    publish.delay(message, list(groups))
     return data
+
+
+async def ws_send_many(action, payloads):
+    """
+    Helper method that send a different payload to each group, concurrently.
+
+    :params payloads dict | list: Payloads mapped by the group they should be sent to,
+    or a list of (group, payload) pairs when a group should get more than one.
+    """
+    if isinstance(payloads, dict):
+        payloads = payloads.items()
+
+    return await asyncio.gather(
+        *[ws_send(action, payload, groups=[group]) for group, payload in payloads]
+    )
@@ -9,6 +9,8 @@ from matches import websocket as matches_websocket
 from notifications import websocket as notifications_websocket
 from pre_matches import websocket as pre_matches_websocket
 
+WS_HELPERS = ('ws_publish', 'ws_send', 'ws_send_many', 'ws_send_nowait')
+
 
 def get_schema(name):
     components = name.split('.')
@@ -61,7 +63,7 @@ def docs(request):
                 'methods': [
                     {'name': method, 'doc': generate_docs(accounts_websocket, method)}
                     for method in dir(accounts_websocket)
-                    if method.startswith('ws_') and method != 'ws_send'
+                    if method.startswith('ws_') and method not in WS_HELPERS
                 ],
             },
             {
@@ -72,7 +74,7 @@ def docs(request):
                         'doc': generate_docs(core_websocket, method),
                     }
                     for method in dir(core_websocket)
-                    if method.startswith('ws_') and method != 'ws_send'
+                    if method.startswith('ws_') and method not in WS_HELPERS
                 ],
             },
             {
@@ -80,7 +82,7 @@ def docs(request):
                 'methods': [
                     {'name': method, 'doc': generate_docs(friends_websocket, method)}
                     for method in dir(friends_websocket)
-                    if method.startswith('ws_') and method != 'ws_send'
+                    if method.startswith('ws_') and method not in WS_HELPERS
                 ],
             },
             {
@@ -88,7 +90,7 @@ def docs(request):
                 'methods': [
                     {'name': method, 'doc': generate_docs(lobbies_websocket, method)}
                     for method in dir(lobbies_websocket)
-                    if method.startswith('ws_') and method != 'ws_send'
+                    if method.startswith('ws_') and method not in WS_HELPERS
                 ],
             },
             {
@@ -99,7 +101,7 @@ def docs(request):
                         'doc': generate_docs(matches_websocket, method),
                     }
                     for method in dir(matches_websocket)
-                    if method.startswith('ws_') and method != 'ws_send'
+                    if method.startswith('ws_') and method not in WS_HELPERS
                 ],
             },
             {
@@ -110,7 +112,7 @@ def docs(request):
                         'doc': generate_docs(notifications_websocket, method),
                     }
                     for method in dir(notifications_websocket)
-                    if method.startswith('ws_') and method != 'ws_send'
+                    if method.startswith('ws_') and method not in WS_HELPERS
                 ],
             },
             {
@@ -121,7 +123,7 @@ def docs(request):
                         'doc': generate_docs(pre_matches_websocket, method),
                     }
                     for method in dir(pre_matches_websocket)
-                    if method.startswith('ws_') and method != 'ws_send'
+                    if method.startswith('ws_') and method not in WS_HELPERS
                 ],
             },
         ]